@@ -0,0 +1,32 @@
+-- ============================================
+-- GA4 증분 수집 워터마크
+-- DB: factcheck_db @ galddae-user (Cloud SQL)
+--
+-- 변경 사항:
+-- - 기존: 매 실행마다 최근 3일 집계를 오늘 날짜 한 행으로 덮어씀
+-- - 신규: property별 확정 날짜(finalized_through) 이후만 일별로 수집,
+--         GA4가 아직 수정할 수 있는 최근 며칠만 재수집
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS ga4_collection_state (
+    property_id TEXT PRIMARY KEY,         -- GA4 Property ID
+
+    -- 이 날짜까지의 데이터는 GA4에서 더 이상 바뀌지 않음 (재수집 불필요)
+    finalized_through DATE NOT NULL,
+
+    -- 타임스탬프
+    last_run_at TIMESTAMPTZ DEFAULT NOW(),
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- 코멘트
+COMMENT ON TABLE ga4_collection_state IS 'GA4 증분 수집 워터마크 - property별 확정 날짜';
+COMMENT ON COLUMN ga4_collection_state.finalized_through IS '이 날짜까지 일별 article_metrics 확정 (이후 날짜와 수정 가능 구간만 재수집)';
+
+-- ============================================
+-- 완료 메시지
+-- ============================================
+DO $$
+BEGIN
+    RAISE NOTICE 'GA4 증분 수집 마이그레이션 완료: ga4_collection_state 테이블 생성';
+END $$;
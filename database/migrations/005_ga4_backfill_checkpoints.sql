@@ -0,0 +1,33 @@
+-- ============================================
+-- GA4 과거 데이터 백필 체크포인트
+-- DB: factcheck_db @ galddae-user (Cloud SQL)
+--
+-- functions/ga4_collector/backfill.py가 완료한 샤드(일/주 단위 기간)를 기록.
+-- 중단된 백필을 같은 명령으로 재실행하면 완료된 샤드는 건너뜀.
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS ga4_backfill_checkpoints (
+    property_id TEXT NOT NULL,            -- GA4 Property ID
+    shard_start DATE NOT NULL,            -- 샤드 시작일 (포함)
+    shard_end DATE NOT NULL,              -- 샤드 종료일 (포함)
+
+    -- 적재 결과
+    rows_inserted INT DEFAULT 0,
+    rows_updated INT DEFAULT 0,
+
+    -- 타임스탬프
+    completed_at TIMESTAMPTZ DEFAULT NOW(),
+
+    PRIMARY KEY (property_id, shard_start, shard_end)
+);
+
+-- 코멘트
+COMMENT ON TABLE ga4_backfill_checkpoints IS 'GA4 백필 완료 샤드 - 재실행 시 이어서 진행';
+
+-- ============================================
+-- 완료 메시지
+-- ============================================
+DO $$
+BEGIN
+    RAISE NOTICE 'GA4 백필 마이그레이션 완료: ga4_backfill_checkpoints 테이블 생성';
+END $$;
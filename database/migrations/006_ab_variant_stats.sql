@@ -0,0 +1,100 @@
+-- ============================================
+-- A/B 테스트 변형별 누적 통계 (충분통계량)
+-- DB: factcheck_db @ galddae-user (Cloud SQL)
+--
+-- 변경 사항:
+-- - 기존: 평가 때마다 article_metrics를 ARRAY_AGG로 다시 읽어 평균/분산 계산
+-- - 신규: GA4 수집(save_metrics) 시점에 (테스트, 버전)별 n, 합, 제곱합,
+--         pageviews를 증분 갱신 → 평가는 테스트 기간과 무관하게 O(1)
+--
+-- 집계 범위: 테스트 시작일(started_at::date) 이후의 일별 article_metrics 행
+-- 재수집으로 기존 행이 바뀌면 (새 값 - 이전 값) 차이만 반영합니다.
+-- NUMERIC 합계는 정확하므로 더하고 빼도 오차가 누적되지 않습니다.
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS ab_variant_stats (
+    test_id UUID NOT NULL REFERENCES ab_tests(id) ON DELETE CASCADE,
+    variant_version TEXT NOT NULL,        -- 'A', 'B'
+
+    -- engagement_score 충분통계량 (NULL 점수 제외)
+    n BIGINT NOT NULL DEFAULT 0,          -- 관측 수 (일별 행)
+    sum NUMERIC NOT NULL DEFAULT 0,       -- Σx
+    sum_sq NUMERIC NOT NULL DEFAULT 0,    -- Σx²
+
+    -- 샘플 크기 판단용
+    pageviews BIGINT NOT NULL DEFAULT 0,
+
+    -- 타임스탬프
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+
+    PRIMARY KEY (test_id, variant_version)
+);
+
+-- ============================================
+-- 통계 재계산 함수 (테스트 시작 / 초기 적재용)
+-- ============================================
+CREATE OR REPLACE FUNCTION rebuild_ab_variant_stats(p_test_id UUID)
+RETURNS VOID AS $$
+BEGIN
+    DELETE FROM ab_variant_stats WHERE test_id = p_test_id;
+
+    INSERT INTO ab_variant_stats (test_id, variant_version, n, sum, sum_sq, pageviews)
+    SELECT
+        t.id,
+        v.version,
+        COUNT(m.engagement_score),
+        COALESCE(SUM(m.engagement_score), 0),
+        COALESCE(SUM(m.engagement_score * m.engagement_score), 0),
+        COALESCE(SUM(m.pageviews), 0)
+    FROM ab_tests t
+    CROSS JOIN LATERAL (VALUES (t.control_version), (t.variant_version)) AS v(version)
+    LEFT JOIN article_metrics m
+        ON m.article_slug = t.article_slug
+        AND m.article_version = v.version
+        AND m.date >= t.started_at::date
+    WHERE t.id = p_test_id
+    GROUP BY t.id, v.version;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 테스트가 running이 되거나 시작일이 바뀌면 기존 메트릭으로 통계를 다시 채움
+-- (이후 증분은 GA4 수집이 반영)
+CREATE OR REPLACE FUNCTION seed_ab_variant_stats()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.status = 'running' AND NEW.started_at IS NOT NULL AND (
+        TG_OP = 'INSERT'
+        OR OLD.status IS DISTINCT FROM NEW.status
+        OR OLD.started_at IS DISTINCT FROM NEW.started_at
+        OR OLD.control_version IS DISTINCT FROM NEW.control_version
+        OR OLD.variant_version IS DISTINCT FROM NEW.variant_version
+    ) THEN
+        PERFORM rebuild_ab_variant_stats(NEW.id);
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS seed_ab_variant_stats ON ab_tests;
+CREATE TRIGGER seed_ab_variant_stats
+    AFTER INSERT OR UPDATE OF status, started_at, control_version, variant_version ON ab_tests
+    FOR EACH ROW
+    EXECUTE FUNCTION seed_ab_variant_stats();
+
+-- 진행 중인 테스트 초기 적재
+SELECT rebuild_ab_variant_stats(id)
+FROM ab_tests
+WHERE status = 'running' AND started_at IS NOT NULL;
+
+-- 코멘트
+COMMENT ON TABLE ab_variant_stats IS 'A/B 테스트 변형별 engagement_score 누적 통계 - GA4 수집 시 증분 갱신';
+COMMENT ON COLUMN ab_variant_stats.n IS 'engagement_score가 있는 일별 article_metrics 행 수 (started_at 이후)';
+COMMENT ON COLUMN ab_variant_stats.sum_sq IS 'engagement_score 제곱합 - 분산 = (n·Σx² - (Σx)²) / (n·(n-1))';
+
+-- ============================================
+-- 완료 메시지
+-- ============================================
+DO $$
+BEGIN
+    RAISE NOTICE 'A/B 누적 통계 마이그레이션 완료: ab_variant_stats 테이블, seed_ab_variant_stats 트리거 생성';
+END $$;
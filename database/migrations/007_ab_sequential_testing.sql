@@ -0,0 +1,36 @@
+-- ============================================
+-- A/B 테스트 순차 검정 (mSPRT, always-valid p-value)
+-- DB: factcheck_db @ galddae-user (Cloud SQL)
+--
+-- 변경 사항:
+-- - 기존: 수집 때마다 고정 표본 Welch t-test (p < 0.15)를 반복 → 엿보기로 거짓 양성 증가
+-- - 신규: 테스트별로 검정 방식을 저장
+--   - fixed: 기존 Welch t-test
+--   - msprt: 혼합 순차 확률비 검정. 매 평가마다 always-valid p-value를 갱신하고
+--            sequential_alpha 아래로 내려가는 즉시 종료해도 1종 오류가 유지됨
+-- ============================================
+
+ALTER TABLE ab_tests
+    ADD COLUMN IF NOT EXISTS sequential_method TEXT NOT NULL DEFAULT 'fixed',  -- fixed, msprt
+    ADD COLUMN IF NOT EXISTS msprt_tau DECIMAL(6,2) DEFAULT 5.0,               -- 효과 크기 혼합분포 표준편차 (engagement_score 단위)
+    ADD COLUMN IF NOT EXISTS sequential_alpha DECIMAL(4,3) DEFAULT 0.05,      -- 유의수준
+    ADD COLUMN IF NOT EXISTS always_valid_p DECIMAL(6,5);                     -- 지금까지의 always-valid p-value (단조 감소)
+
+ALTER TABLE ab_tests
+    DROP CONSTRAINT IF EXISTS ab_tests_sequential_method_check;
+ALTER TABLE ab_tests
+    ADD CONSTRAINT ab_tests_sequential_method_check CHECK (sequential_method IN ('fixed', 'msprt'));
+
+-- 코멘트
+COMMENT ON COLUMN ab_tests.sequential_method IS '검정 방식 - fixed: Welch t-test, msprt: 순차 검정 (언제 멈춰도 유효)';
+COMMENT ON COLUMN ab_tests.msprt_tau IS 'mSPRT 효과 크기 혼합분포 N(0, τ²)의 τ - 기대 효과 크기 수준으로 설정';
+COMMENT ON COLUMN ab_tests.sequential_alpha IS 'mSPRT 유의수준 - always_valid_p가 이 값보다 작으면 종료';
+COMMENT ON COLUMN ab_tests.always_valid_p IS 'mSPRT always-valid p-value - 평가마다 min(이전 값, 1/Λ)로 갱신';
+
+-- ============================================
+-- 완료 메시지
+-- ============================================
+DO $$
+BEGIN
+    RAISE NOTICE 'A/B 순차 검정 마이그레이션 완료: ab_tests에 sequential_method, msprt_tau, sequential_alpha, always_valid_p 추가';
+END $$;
@@ -0,0 +1,38 @@
+-- ============================================
+-- LLM 응답 캐시 (content_analyzer)
+-- DB: factcheck_db @ galddae-user (Cloud SQL)
+--
+-- 변경 사항:
+-- - 기존: 같은 프롬프트로 재시도/재실행해도 매번 Claude CLI 호출 (1~3분)
+-- - 신규: (시스템 프롬프트, 사용자 프롬프트, 모델/CLI 버전) sha256 키로 응답 저장
+--         LLM_CACHE_BACKEND=postgres 일 때 사용 (Cloud Run 인스턴스 간 공유)
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS llm_response_cache (
+    cache_key TEXT PRIMARY KEY,           -- sha256(system, user, model)
+
+    response TEXT NOT NULL,               -- Claude 응답 원문
+    elapsed_seconds DECIMAL(8,2),         -- 생성에 걸린 CLI 시간 (hit 시 절약 시간)
+    size_bytes INT NOT NULL,              -- LRU 크기 상한 계산용
+    hit_count INT DEFAULT 0,
+
+    -- 타임스탬프
+    created_at TIMESTAMPTZ DEFAULT NOW(),       -- TTL 기준
+    last_accessed_at TIMESTAMPTZ DEFAULT NOW()  -- LRU 기준
+);
+
+-- 인덱스
+CREATE INDEX IF NOT EXISTS idx_llm_response_cache_accessed ON llm_response_cache(last_accessed_at DESC);
+CREATE INDEX IF NOT EXISTS idx_llm_response_cache_created ON llm_response_cache(created_at);
+
+-- 코멘트
+COMMENT ON TABLE llm_response_cache IS 'content_analyzer Claude 응답 캐시 - TTL + 크기 기반 LRU 삭제';
+COMMENT ON COLUMN llm_response_cache.cache_key IS 'sha256([system_prompt, user_prompt, model/CLI 버전])';
+
+-- ============================================
+-- 완료 메시지
+-- ============================================
+DO $$
+BEGIN
+    RAISE NOTICE 'LLM 응답 캐시 마이그레이션 완료: llm_response_cache 테이블 생성';
+END $$;
@@ -0,0 +1,58 @@
+-- ============================================
+-- Content Analyzer 비동기 작업 (jobs)
+-- DB: factcheck_db @ galddae-user (Cloud SQL)
+--
+-- 변경 사항:
+-- - 기존: /analyze, /analyze-experiments가 HTTP 요청 안에서 DB 조회 + Claude 분석 + 저장까지
+--         수행 → Cloud Scheduler / ga4_collector(60초 타임아웃)가 먼저 끊김
+-- - 신규: POST는 작업을 등록하고 202 + job id를 즉시 반환,
+--         분석은 백그라운드 실행기에서 수행하며 진행 상황/결과를 이 테이블에 기록
+--         GET /jobs/<id>로 조회
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS analyzer_jobs (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    job_type TEXT NOT NULL,               -- analyze_tests, analyze_experiments
+
+    -- 상태
+    status TEXT NOT NULL DEFAULT 'queued',  -- queued, running, succeeded, failed
+    params JSONB DEFAULT '{}',              -- 요청 파라미터 (no_cache 등)
+
+    -- 진행 상황
+    total_items INT,                      -- 분석 대상 수 (조회 후 기록)
+    completed_items INT DEFAULT 0,        -- 처리 완료 수 (성공 + 실패)
+    results JSONB DEFAULT '[]',           -- 테스트/실험별 결과 (처리 순서대로 추가)
+    summary JSONB,                        -- 최종 응답 (기존 동기 응답과 같은 형식)
+    error TEXT,
+
+    -- 타임스탬프
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    started_at TIMESTAMPTZ,
+    finished_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+
+    CONSTRAINT analyzer_jobs_status_check CHECK (status IN ('queued', 'running', 'succeeded', 'failed'))
+);
+
+-- 같은 종류의 작업은 동시에 하나만 (스케줄러 중복 호출 시 기존 작업 id 반환)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_analyzer_jobs_active
+    ON analyzer_jobs(job_type) WHERE status IN ('queued', 'running');
+CREATE INDEX IF NOT EXISTS idx_analyzer_jobs_created ON analyzer_jobs(created_at DESC);
+
+DROP TRIGGER IF EXISTS update_analyzer_jobs_updated_at ON analyzer_jobs;
+CREATE TRIGGER update_analyzer_jobs_updated_at
+    BEFORE UPDATE ON analyzer_jobs
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
+-- 코멘트
+COMMENT ON TABLE analyzer_jobs IS 'content_analyzer 비동기 분석 작업 - 상태, 진행 상황, 결과';
+COMMENT ON COLUMN analyzer_jobs.results IS '항목별 결과 배열 - 처리될 때마다 추가되므로 진행 중에도 조회 가능';
+
+-- ============================================
+-- 완료 메시지
+-- ============================================
+DO $$
+BEGIN
+    RAISE NOTICE 'Analyzer 작업 마이그레이션 완료: analyzer_jobs 테이블 생성';
+END $$;
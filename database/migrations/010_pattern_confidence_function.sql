@@ -0,0 +1,39 @@
+-- ============================================
+-- 패턴 신뢰도 SQL 함수 (set-based 패턴 upsert)
+-- DB: factcheck_db @ galddae-user (Cloud SQL)
+--
+-- 변경 사항:
+-- - 기존: content_analyzer update_patterns가 패턴마다 SELECT 후 UPDATE/INSERT,
+--         신뢰도 레벨은 Python(determine_confidence_level)에서 계산
+--         → 패턴 수만큼 왕복, 동시 분석 시 SELECT-INSERT 경합
+-- - 신규: INSERT ... ON CONFLICT (name, category) DO UPDATE 한 문장으로 처리하고,
+--         test_count / win_rate / avg_lift / confidence_level을 SQL에서 계산
+--         신뢰도 기준은 아래 함수 하나로 관리
+-- ============================================
+
+-- 신뢰도 레벨 (PLANNING_v2.md 기준)
+-- - EXPERIMENTAL: 1-2회 테스트
+-- - LOW: 3-5회, 승률 55%+
+-- - MEDIUM: 6-10회, 승률 60%+
+-- - HIGH: 11회+, 승률 65%+
+CREATE OR REPLACE FUNCTION pattern_confidence_level(p_test_count INT, p_win_rate NUMERIC)
+RETURNS TEXT AS $$
+    SELECT CASE
+        WHEN p_test_count >= 11 AND p_win_rate >= 65 THEN 'HIGH'
+        WHEN p_test_count >= 6 AND p_win_rate >= 60 THEN 'MEDIUM'
+        WHEN p_test_count >= 3 AND p_win_rate >= 55 THEN 'LOW'
+        ELSE 'EXPERIMENTAL'
+    END
+$$ LANGUAGE sql IMMUTABLE;
+
+-- 코멘트
+COMMENT ON FUNCTION pattern_confidence_level(INT, NUMERIC) IS
+    '패턴 신뢰도 레벨 - EXPERIMENTAL(1-2회) < LOW(3-5회,55%+) < MEDIUM(6-10회,60%+) < HIGH(11+회,65%+)';
+
+-- ============================================
+-- 완료 메시지
+-- ============================================
+DO $$
+BEGIN
+    RAISE NOTICE '패턴 신뢰도 함수 마이그레이션 완료: pattern_confidence_level() 생성';
+END $$;
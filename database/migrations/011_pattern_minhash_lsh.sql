@@ -0,0 +1,32 @@
+-- ============================================
+-- 패턴 유사 중복 병합 (MinHash + LSH)
+-- DB: factcheck_db @ galddae-user (Cloud SQL)
+--
+-- 변경 사항:
+-- - 기존: patterns는 (name, category) 완전 일치로만 병합
+--         → "질문형 도입부", "질문으로 시작하는 도입부" 같은 표현 차이가 각각 test_count=1 행으로 쌓임
+-- - 신규: content_analyzer가 패턴 텍스트의 MinHash 서명과 LSH 버킷을 저장하고,
+--         새 패턴은 버킷이 겹치는 후보(GIN 인덱스) 중 가장 유사한 기존 패턴에 병합
+--         (서명 계산: functions/content_analyzer/pattern_dedup.py)
+--
+-- 기존 행의 서명은 다음 분석 실행 시 content_analyzer가 채웁니다 (backfill_pattern_signatures).
+-- ============================================
+
+ALTER TABLE patterns
+    ADD COLUMN IF NOT EXISTS minhash_signature BIGINT[],
+    ADD COLUMN IF NOT EXISTS lsh_buckets BIGINT[];
+
+-- 후보 조회: lsh_buckets && ARRAY[...]
+CREATE INDEX IF NOT EXISTS idx_patterns_lsh_buckets ON patterns USING GIN (lsh_buckets);
+
+-- 코멘트
+COMMENT ON COLUMN patterns.minhash_signature IS '패턴 텍스트(name+description+prompt_instruction) 음절 bigram의 MinHash 서명';
+COMMENT ON COLUMN patterns.lsh_buckets IS 'MinHash 서명의 LSH 밴드별 버킷 해시 - 겹치면 유사 패턴 후보';
+
+-- ============================================
+-- 완료 메시지
+-- ============================================
+DO $$
+BEGIN
+    RAISE NOTICE '패턴 MinHash/LSH 마이그레이션 완료: minhash_signature, lsh_buckets 컬럼 및 GIN 인덱스 추가';
+END $$;
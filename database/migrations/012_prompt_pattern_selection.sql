@@ -0,0 +1,29 @@
+-- ============================================
+-- 프롬프트 패턴 지침 선택 기록
+-- DB: factcheck_db @ galddae-user (Cloud SQL)
+--
+-- 변경 사항:
+-- - 기존: 새 프롬프트 버전에 활성 패턴을 전부 넣음 (LOW만 최대 3개)
+--         → HIGH/MEDIUM 패턴이 쌓일수록 글 생성 프롬프트가 계속 길어짐
+-- - 신규: content_analyzer prompt_updater가 신뢰도 등급, 승률, 평균 lift, 최근성으로 점수를 매겨
+--         카테고리별 상한과 토큰 예산 안에서만 포함
+--         applied_patterns: 포함된 패턴 / dropped_patterns: 제외된 패턴
+--         pattern_selection: 패턴별 점수, 추정 토큰, 제외 사유
+-- ============================================
+
+ALTER TABLE prompt_versions
+    ADD COLUMN IF NOT EXISTS dropped_patterns UUID[],
+    ADD COLUMN IF NOT EXISTS pattern_selection JSONB;
+
+-- 코멘트
+COMMENT ON COLUMN prompt_versions.applied_patterns IS '이 버전의 프롬프트에 포함된 패턴 ID 목록';
+COMMENT ON COLUMN prompt_versions.dropped_patterns IS '선택 과정에서 제외된 패턴 ID 목록 (카테고리 상한, 토큰 예산, LOW 개수 제한)';
+COMMENT ON COLUMN prompt_versions.pattern_selection IS '패턴 선택 상세 - {token_budget, estimated_tokens, patterns: [{id, name, confidence_level, score, included, reason}]}';
+
+-- ============================================
+-- 완료 메시지
+-- ============================================
+DO $$
+BEGIN
+    RAISE NOTICE '프롬프트 패턴 선택 마이그레이션 완료: dropped_patterns, pattern_selection 컬럼 추가';
+END $$;
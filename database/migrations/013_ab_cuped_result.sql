@@ -0,0 +1,23 @@
+-- ============================================
+-- A/B 테스트 CUPED 결과 저장
+-- DB: factcheck_db @ galddae-user (Cloud SQL)
+--
+-- 변경 사항:
+-- - 기존: ga4_collector가 평가마다 CUPED 보정 결과를 계산하지만 로그로만 출력
+-- - 신규: 최근 평가의 CUPED 결과(p_value, lift, theta, variance_reduction, n_a, n_b 등)를
+--         ab_tests.cuped_result에 저장 (관측 부족으로 계산하지 못하면 이전 값 유지)
+-- ============================================
+
+ALTER TABLE ab_tests
+    ADD COLUMN IF NOT EXISTS cuped_result JSONB;  -- 최근 평가의 CUPED 보정 Welch t-test 결과
+
+-- 코멘트
+COMMENT ON COLUMN ab_tests.cuped_result IS 'CUPED 보정 결과 - {p_value, lift, theta, variance_reduction, a_score, b_score, n_a, n_b}';
+
+-- ============================================
+-- 완료 메시지
+-- ============================================
+DO $$
+BEGIN
+    RAISE NOTICE 'A/B CUPED 결과 마이그레이션 완료: ab_tests에 cuped_result 추가';
+END $$;
@@ -0,0 +1,37 @@
+-- ============================================
+-- 패턴 서명 재계산 (어절 단위 n-gram) + 누락 서명 부분 인덱스
+-- DB: factcheck_db @ galddae-user (Cloud SQL)
+--
+-- 변경 사항:
+-- - 기존: 공백을 지운 전체 텍스트의 음절 bigram으로 서명 계산, 병합은 서명 추정 유사도로 판단
+--         → "질문형 도입부" / "질문으로 시작하는 도입부"가 약 0.28로 추정되어 병합되지 않음
+-- - 신규: 어절별로 조사/어미를 뗀 뒤 bigram 계산 (pattern_dedup.shingles),
+--         병합은 LSH 후보의 정확한 Jaccard 유사도로 판단 (임계값 0.28)
+--         → n-gram이 달라졌으므로 기존 서명/버킷을 비우고 다시 계산
+-- - content_analyzer는 update_patterns에서 프로세스당 한 번만 누락 서명을 확인하며,
+--   그 조회는 아래 부분 인덱스를 사용합니다
+--
+-- 적용 후 실행: python functions/content_analyzer/pattern_dedup.py backfill
+-- (실행하지 않아도 다음 분석 실행 시 content_analyzer가 채웁니다)
+-- ============================================
+
+UPDATE patterns
+SET minhash_signature = NULL,
+    lsh_buckets = NULL
+WHERE minhash_signature IS NOT NULL;
+
+-- 서명 누락 패턴 조회 (backfill_pattern_signatures) - 평소에는 빈 인덱스
+CREATE INDEX IF NOT EXISTS idx_patterns_minhash_missing
+    ON patterns (id)
+    WHERE minhash_signature IS NULL AND category <> 'topic';
+
+-- 코멘트
+COMMENT ON COLUMN patterns.minhash_signature IS '패턴 텍스트(name+description+prompt_instruction) 어절별(조사/어미 제거) 음절 bigram의 MinHash 서명';
+
+-- ============================================
+-- 완료 메시지
+-- ============================================
+DO $$
+BEGIN
+    RAISE NOTICE '패턴 서명 재계산 마이그레이션 완료: minhash_signature/lsh_buckets 초기화, idx_patterns_minhash_missing 추가';
+END $$;
@@ -0,0 +1,34 @@
+-- ============================================
+-- 패턴 서명 재계산 (이름 핵심어 기준 LSH, 밴드 32 × 3행)
+-- DB: factcheck_db @ galddae-user (Cloud SQL)
+--
+-- 변경 사항:
+-- - 기존: 전체 텍스트 n-gram으로 서명 계산, 밴드 48 × 2행, 병합 임계값 Jaccard 0.28
+--         → "시작", "도입부", "첫 문장", "독자" 같은 틀 단어가 유사도를 좌우해
+--           "질문으로 시작하는 도입부" / "통계로 시작하는 도입부"(0.43)처럼 다른 패턴이 병합됨
+--         → 유사도 0.05인 쌍도 약 11% 확률로 후보가 되어 후보 수가 패턴 수에 비례해 증가
+-- - 신규: 틀 단어(pattern_dedup.TEMPLATE_WORDS)를 제외하고,
+--         유사도 = 0.5 · 이름 Jaccard + 0.5 · 전체 텍스트 Jaccard (임계값 0.3)
+--         서명은 이름 핵심어 n-gram으로 계산, 밴드 32 × 3행 (0.05 → 0.4%, 0.5 → 98.6%)
+--         → 서명 입력과 밴드 수가 달라졌으므로 기존 서명/버킷을 비우고 다시 계산
+--
+-- 적용 후 실행: python functions/content_analyzer/pattern_dedup.py backfill
+-- (실행하지 않아도 다음 분석 실행 시 content_analyzer가 채웁니다)
+-- ============================================
+
+UPDATE patterns
+SET minhash_signature = NULL,
+    lsh_buckets = NULL
+WHERE minhash_signature IS NOT NULL;
+
+-- 코멘트
+COMMENT ON COLUMN patterns.minhash_signature IS '패턴 이름 핵심어(틀 단어 제외, 어절별 조사/어미 제거) 음절 bigram의 MinHash 서명';
+COMMENT ON COLUMN patterns.lsh_buckets IS 'MinHash 서명의 LSH 밴드별 버킷 해시 (32 밴드 × 3행) - 겹치면 유사 패턴 후보';
+
+-- ============================================
+-- 완료 메시지
+-- ============================================
+DO $$
+BEGIN
+    RAISE NOTICE '패턴 서명 재계산 마이그레이션 완료: 이름 기준 minhash_signature/lsh_buckets 초기화';
+END $$;
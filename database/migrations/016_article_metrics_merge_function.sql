@@ -0,0 +1,145 @@
+-- ============================================
+-- article_metrics 적재 병합 함수 (스테이징 → article_metrics → ab_variant_stats)
+-- DB: factcheck_db @ galddae-user (Cloud SQL)
+--
+-- 변경 사항:
+-- - 기존: ga4_collector(bulk_upsert_metrics)와 scripts/fetch_ga_metrics.py(upsert_metrics_bulk)가
+--         같은 병합 CTE를 각자 들고 있어, 한쪽만 바뀌면 ab_variant_stats 증분이 어긋날 수 있음
+-- - 신규: 스테이징 테이블 생성과 병합을 DB 함수 하나씩으로 통일
+--   1. SELECT create_article_metrics_staging()  - 트랜잭션 임시 테이블 생성 (ON COMMIT DROP)
+--   2. COPY article_metrics_staging (seq, ...) FROM STDIN
+--   3. SELECT * FROM merge_article_metrics_staging()  - (삽입 수, 업데이트 수)
+--
+-- 병합 규칙:
+-- - 같은 (slug, version, date)가 여러 번 오면 seq가 가장 큰 행이 이김
+-- - 스크롤 컬럼이 NULL인 행(스크롤 리포트가 없는 적재 경로)은 기존 스크롤 값을 유지
+-- - 기존 행과 새 행의 차이를 진행 중인 A/B 테스트의 ab_variant_stats(006)에 같은 문장에서 반영
+-- - 적재끼리는 advisory lock으로 직렬화 (동시에 돌면 같은 prev로 같은 차이를 두 번 더할 수 있음)
+-- ============================================
+
+-- ============================================
+-- 스테이징 테이블 (호출한 트랜잭션이 끝나면 삭제)
+-- ============================================
+CREATE OR REPLACE FUNCTION create_article_metrics_staging()
+RETURNS VOID AS $$
+BEGIN
+    CREATE TEMP TABLE article_metrics_staging (
+        seq BIGINT NOT NULL,
+        article_slug TEXT NOT NULL,
+        article_version TEXT NOT NULL,
+        date DATE NOT NULL,
+        pageviews INT,
+        unique_visitors INT,
+        avg_time_on_page DECIMAL(10,2),
+        bounce_rate DECIMAL(5,2),
+        scroll_depth_avg DECIMAL(5,2),
+        scroll_25_pct INT,
+        scroll_50_pct INT,
+        scroll_75_pct INT,
+        scroll_100_pct INT,
+        engagement_score DECIMAL(5,2)
+    ) ON COMMIT DROP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================
+-- 병합 (스테이징 → article_metrics + ab_variant_stats 증분)
+-- ============================================
+-- plpgsql은 문장마다 새 스냅샷을 잡으므로(READ COMMITTED) 락을 얻은 뒤의 병합 문장은
+-- 앞선 적재의 커밋 결과를 봅니다. WITH 안의 문장들은 같은 스냅샷이라 prev는 UPSERT 이전 값입니다.
+CREATE OR REPLACE FUNCTION merge_article_metrics_staging()
+RETURNS TABLE (inserted_count BIGINT, updated_count BIGINT) AS $$
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('article_metrics_ingest'));
+
+    RETURN QUERY
+    WITH staged AS (
+        SELECT DISTINCT ON (s.article_slug, s.article_version, s.date) s.*
+        FROM article_metrics_staging s
+        ORDER BY s.article_slug, s.article_version, s.date, s.seq DESC
+    ),
+    prev AS (
+        SELECT m.article_slug, m.article_version, m.date, m.engagement_score, m.pageviews
+        FROM article_metrics m
+        JOIN staged s USING (article_slug, article_version, date)
+    ),
+    upserted AS (
+        INSERT INTO article_metrics AS m (
+            article_slug, article_version, date,
+            pageviews, unique_visitors,
+            avg_time_on_page, bounce_rate,
+            scroll_depth_avg, scroll_25_pct, scroll_50_pct, scroll_75_pct, scroll_100_pct,
+            engagement_score
+        )
+        SELECT
+            s.article_slug, s.article_version, s.date,
+            s.pageviews, s.unique_visitors,
+            s.avg_time_on_page, s.bounce_rate,
+            s.scroll_depth_avg, s.scroll_25_pct, s.scroll_50_pct, s.scroll_75_pct, s.scroll_100_pct,
+            s.engagement_score
+        FROM staged s
+        ON CONFLICT (article_slug, article_version, date)
+        DO UPDATE SET
+            pageviews = EXCLUDED.pageviews,
+            unique_visitors = EXCLUDED.unique_visitors,
+            avg_time_on_page = EXCLUDED.avg_time_on_page,
+            bounce_rate = EXCLUDED.bounce_rate,
+            scroll_depth_avg = COALESCE(EXCLUDED.scroll_depth_avg, m.scroll_depth_avg),
+            scroll_25_pct = COALESCE(EXCLUDED.scroll_25_pct, m.scroll_25_pct),
+            scroll_50_pct = COALESCE(EXCLUDED.scroll_50_pct, m.scroll_50_pct),
+            scroll_75_pct = COALESCE(EXCLUDED.scroll_75_pct, m.scroll_75_pct),
+            scroll_100_pct = COALESCE(EXCLUDED.scroll_100_pct, m.scroll_100_pct),
+            engagement_score = EXCLUDED.engagement_score
+        RETURNING m.article_slug, m.article_version, m.date, m.engagement_score, m.pageviews,
+                  (m.xmax = 0) AS inserted
+    ),
+    variant_deltas AS (
+        SELECT
+            t.id AS test_id,
+            u.article_version AS variant_version,
+            SUM((u.engagement_score IS NOT NULL)::INT - (p.engagement_score IS NOT NULL)::INT) AS n,
+            SUM(COALESCE(u.engagement_score, 0) - COALESCE(p.engagement_score, 0)) AS sum,
+            SUM(COALESCE(u.engagement_score * u.engagement_score, 0)
+                - COALESCE(p.engagement_score * p.engagement_score, 0)) AS sum_sq,
+            SUM(COALESCE(u.pageviews, 0) - COALESCE(p.pageviews, 0)) AS pageviews
+        FROM upserted u
+        JOIN ab_tests t
+            ON t.article_slug = u.article_slug
+            AND u.article_version IN (t.control_version, t.variant_version)
+            AND t.status = 'running'
+            AND u.date >= t.started_at::date
+        LEFT JOIN prev p
+            ON p.article_slug = u.article_slug
+            AND p.article_version = u.article_version
+            AND p.date = u.date
+        GROUP BY t.id, u.article_version
+    ),
+    stats_updated AS (
+        INSERT INTO ab_variant_stats AS v (test_id, variant_version, n, sum, sum_sq, pageviews)
+        SELECT d.test_id, d.variant_version, d.n, d.sum, d.sum_sq, d.pageviews FROM variant_deltas d
+        ON CONFLICT (test_id, variant_version)
+        DO UPDATE SET
+            n = v.n + EXCLUDED.n,
+            sum = v.sum + EXCLUDED.sum,
+            sum_sq = v.sum_sq + EXCLUDED.sum_sq,
+            pageviews = v.pageviews + EXCLUDED.pageviews,
+            updated_at = NOW()
+    )
+    SELECT
+        COUNT(*) FILTER (WHERE u.inserted),
+        COUNT(*) FILTER (WHERE NOT u.inserted)
+    FROM upserted u;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 코멘트
+COMMENT ON FUNCTION create_article_metrics_staging() IS 'article_metrics 적재용 트랜잭션 임시 테이블 생성 (ON COMMIT DROP)';
+COMMENT ON FUNCTION merge_article_metrics_staging() IS 'article_metrics_staging을 article_metrics에 병합하고 진행 중인 A/B 테스트의 ab_variant_stats에 차이 반영 - (삽입 수, 업데이트 수)';
+
+-- ============================================
+-- 완료 메시지
+-- ============================================
+DO $$
+BEGIN
+    RAISE NOTICE 'article_metrics 병합 함수 마이그레이션 완료: create_article_metrics_staging, merge_article_metrics_staging 생성';
+END $$;
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Claude CLI 호출 오버헤드 벤치마크: 호출마다 새 프로세스 vs 미리 기동한 워커 풀
+
+실행: python benchmark_llm_worker.py [호출 수]
+기본: 10회 (CLAUDE_CODE_OAUTH_TOKEN 필요, 구독 사용량이 소모됨)
+
+아주 짧은 프롬프트로 호출하여 모델 응답 시간보다 프로세스 기동/인증 비용이
+두드러지게 합니다. 워커 풀은 미리 띄운(prewarm) 뒤 측정합니다.
+풀 워커는 1건만 처리하고 교체되므로 두 가지로 측정합니다.
+- pool: 호출 사이에 SETTLE_SECONDS만큼 쉼 (측정에서 제외) - 요청 간격이 교체 워커 기동보다 긴 경우
+- pool-burst: 쉬지 않고 연속 호출 - 교체 워커 기동을 기다리는 시간이 그대로 포함되는 경우
+  (밀린 분석을 연속으로 처리할 때는 이쪽이 실제 절감에 가까움)
+"""
+
+import os
+import sys
+import time
+import statistics
+
+from llm_worker import ClaudeWorkerPool, run_claude_oneshot
+
+DEFAULT_CALLS = 10
+PROMPT = "Reply with exactly: OK"
+TIMEOUT_SECONDS = 120
+SETTLE_SECONDS = 5.0  # 풀 호출 사이 간격 (교체 워커 기동 시간, 측정 제외)
+
+
+def measure(call, calls: int, settle: float = 0.0) -> list:
+    durations = []
+    for i in range(calls):
+        time.sleep(settle)
+        started = time.perf_counter()
+        call(f"{PROMPT} ({i})")
+        durations.append(time.perf_counter() - started)
+    return durations
+
+
+def summarize(label: str, durations: list):
+    print(f"{label:<10} | 평균 {statistics.mean(durations):6.2f}s | "
+          f"중앙값 {statistics.median(durations):6.2f}s | "
+          f"최소 {min(durations):6.2f}s | 최대 {max(durations):6.2f}s")
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_CALLS
+    env = dict(os.environ)
+
+    if not env.get("CLAUDE_CODE_OAUTH_TOKEN"):
+        print("CLAUDE_CODE_OAUTH_TOKEN 환경 변수가 필요합니다.")
+        sys.exit(1)
+
+    print(f"🚀 Claude CLI 호출 오버헤드 벤치마크 ({calls}회)")
+    print("-" * 72)
+
+    oneshot = measure(lambda prompt: run_claude_oneshot(prompt, TIMEOUT_SECONDS, env), calls)
+    summarize("oneshot", oneshot)
+
+    pool = ClaudeWorkerPool(size=1, env=env)
+    try:
+        # 기동 시간은 측정에서 제외 (서버에서는 시작 시 prewarm)
+        started = time.perf_counter()
+        pool.run(PROMPT, TIMEOUT_SECONDS)
+        print(f"{'warmup':<10} | 워커 기동 + 첫 응답 {time.perf_counter() - started:6.2f}s")
+
+        pooled = measure(lambda prompt: pool.run(prompt, TIMEOUT_SECONDS), calls, settle=SETTLE_SECONDS)
+        summarize("pool", pooled)
+
+        burst = measure(lambda prompt: pool.run(prompt, TIMEOUT_SECONDS), calls)
+        summarize("pool-burst", burst)
+    finally:
+        pool.close()
+
+    print("-" * 72)
+    for label, durations in (("pool", pooled), ("pool-burst", burst)):
+        saved = statistics.mean(oneshot) - statistics.mean(durations)
+        print(f"호출당 절감 ({label}): {saved:.2f}s ({saved / statistics.mean(oneshot) * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""
+PostgreSQL 연결 풀 (content_analyzer 공용)
+
+요청마다 원격 Cloud SQL에 새 TCP + TLS 연결을 맺는 대신 프로세스 전체에서
+연결을 재사용합니다. main.py, prompt_updater.py, jobs.py, llm_cache.py가 함께 씁니다.
+
+- get_db_connection()은 풀에서 연결을 빌려 오고, conn.close()는 실제로 닫지 않고 반납합니다
+  (기존 호출 코드 그대로 사용)
+- 반납 시 열린 트랜잭션은 롤백
+- 오래 쉬던 연결은 빌려 줄 때 SELECT 1로 상태 확인, 실패하면 새로 연결
+- 최대 크기 초과 시 반납될 때까지 대기 (DB_POOL_CHECKOUT_TIMEOUT 초)
+- 유휴 시간이 DB_POOL_MAX_IDLE_SECONDS를 넘은 연결은 DB_POOL_MIN_SIZE개만 남기고 정리
+- stats(): 대기 시간, 대여 시간 등 모니터링 지표 (/health)
+"""
+
+import os
+import time
+import threading
+from collections import deque
+from typing import Dict
+
+import pg8000
+
+
+# ============================================
+# 설정
+# ============================================
+
+DB_CONFIG = {
+    "host": os.environ.get("DB_HOST", "34.64.111.186"),
+    "port": int(os.environ.get("DB_PORT", "5432")),
+    "user": os.environ.get("DB_USER", "admin"),
+    "password": os.environ.get("DB_PASSWORD", "galddae-password"),
+    "database": os.environ.get("DB_NAME", "factcheck_db"),
+}
+
+DB_POOL_MIN_SIZE = int(os.environ.get("DB_POOL_MIN_SIZE", "1"))
+DB_POOL_MAX_SIZE = int(os.environ.get("DB_POOL_MAX_SIZE", "10"))
+DB_POOL_MAX_IDLE_SECONDS = float(os.environ.get("DB_POOL_MAX_IDLE_SECONDS", "300"))
+DB_POOL_HEALTH_CHECK_AFTER_SECONDS = float(os.environ.get("DB_POOL_HEALTH_CHECK_AFTER_SECONDS", "10"))
+DB_POOL_CHECKOUT_TIMEOUT = float(os.environ.get("DB_POOL_CHECKOUT_TIMEOUT", "30"))
+
+
+def connect():
+    """PostgreSQL 새 연결 (풀 내부용)"""
+    return pg8000.connect(
+        host=DB_CONFIG["host"],
+        port=DB_CONFIG["port"],
+        user=DB_CONFIG["user"],
+        password=DB_CONFIG["password"],
+        database=DB_CONFIG["database"],
+    )
+
+
+class PooledConnection:
+    """
+    풀에서 빌린 연결
+
+    pg8000 연결의 메서드(cursor, commit, rollback ...)를 그대로 위임하고,
+    close()는 연결을 닫지 않고 풀에 반납합니다. 두 번 반납해도 안전합니다.
+    """
+
+    def __init__(self, pool: "ConnectionPool", raw):
+        self._pool = pool
+        self._raw = raw
+        self._checked_out_at = time.monotonic()
+
+    def __getattr__(self, name):
+        if self._raw is None:
+            raise RuntimeError("이미 반납된 연결입니다")
+        return getattr(self._raw, name)
+
+    def close(self):
+        if self._raw is None:
+            return
+        raw, self._raw = self._raw, None
+        self._pool._release(raw, time.monotonic() - self._checked_out_at)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ConnectionPool:
+    """스레드 안전 pg8000 연결 풀"""
+
+    def __init__(
+        self,
+        min_size: int = DB_POOL_MIN_SIZE,
+        max_size: int = DB_POOL_MAX_SIZE,
+        max_idle_seconds: float = DB_POOL_MAX_IDLE_SECONDS,
+        health_check_after: float = DB_POOL_HEALTH_CHECK_AFTER_SECONDS,
+        checkout_timeout: float = DB_POOL_CHECKOUT_TIMEOUT,
+    ):
+        self.min_size = min_size
+        self.max_size = max(1, max_size)
+        self.max_idle_seconds = max_idle_seconds
+        self.health_check_after = health_check_after
+        self.checkout_timeout = checkout_timeout
+
+        self._idle = deque()  # (raw, 반납 시각) - 오른쪽이 최근
+        self._size = 0  # 대여 중 + 유휴 + 연결 중
+        self._waiting = 0
+        self._cond = threading.Condition()
+        self._stats = {
+            "checkouts": 0, "created": 0, "closed": 0,
+            "health_check_failures": 0, "timeouts": 0,
+            "wait_seconds_total": 0.0, "wait_seconds_max": 0.0,
+            "checkout_seconds_total": 0.0, "checkout_seconds_max": 0.0,
+        }
+
+    def getconn(self) -> PooledConnection:
+        """연결 대여 (최대 크기면 반납될 때까지 대기)"""
+        started = time.monotonic()
+        deadline = started + self.checkout_timeout
+
+        while True:
+            raw, idle_since = None, None
+            with self._cond:
+                self._evict_idle_locked()
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise TimeoutError(
+                            f"DB 연결 풀 대기 타임아웃 ({self.checkout_timeout:.0f}초, 최대 {self.max_size}개)"
+                        )
+                    self._waiting += 1
+                    self._cond.wait(remaining)
+                    self._waiting -= 1
+
+                if self._idle:
+                    raw, idle_since = self._idle.pop()  # 가장 최근에 쓴 연결 (살아 있을 확률이 높음)
+                else:
+                    self._size += 1  # 슬롯 예약 후 잠금 밖에서 연결
+
+            if raw is None:
+                try:
+                    raw = connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._stats["created"] += 1
+
+            elif time.monotonic() - idle_since > self.health_check_after and not self._is_healthy(raw):
+                self._discard(raw)
+                with self._cond:
+                    self._stats["health_check_failures"] += 1
+                continue
+
+            waited = time.monotonic() - started
+            with self._cond:
+                self._stats["checkouts"] += 1
+                self._stats["wait_seconds_total"] += waited
+                self._stats["wait_seconds_max"] = max(self._stats["wait_seconds_max"], waited)
+            return PooledConnection(self, raw)
+
+    @staticmethod
+    def _is_healthy(raw) -> bool:
+        try:
+            cursor = raw.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            raw.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _release(self, raw, held_seconds: float):
+        """반납 (PooledConnection.close에서 호출)"""
+        try:
+            # 커밋하지 않은 트랜잭션은 롤백 (pg8000은 트랜잭션 상태를 알고 있어 불필요한 왕복 생략)
+            if getattr(raw, "_in_transaction", True):
+                raw.rollback()
+        except Exception:
+            self._discard(raw)
+            return
+
+        with self._cond:
+            self._stats["checkout_seconds_total"] += held_seconds
+            self._stats["checkout_seconds_max"] = max(self._stats["checkout_seconds_max"], held_seconds)
+            self._idle.append((raw, time.monotonic()))
+            self._cond.notify()
+
+    def _discard(self, raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._size -= 1
+            self._stats["closed"] += 1
+            self._cond.notify()
+
+    def _evict_idle_locked(self):
+        """오래 쉰 연결 정리 (잠금 보유 상태에서 호출, 가장 오래된 것부터)"""
+        now = time.monotonic()
+        while (
+            self._idle
+            and self._size > self.min_size
+            and now - self._idle[0][1] > self.max_idle_seconds
+        ):
+            raw, _ = self._idle.popleft()
+            self._size -= 1
+            self._stats["closed"] += 1
+            try:
+                raw.close()
+            except Exception:
+                pass
+
+    def stats(self) -> Dict:
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "waiting": self._waiting,
+                "max_size": self.max_size,
+            })
+        checkouts = stats["checkouts"]
+        stats["wait_seconds_avg"] = round(stats["wait_seconds_total"] / checkouts, 4) if checkouts else 0
+        for key in ("wait_seconds_total", "wait_seconds_max", "checkout_seconds_total", "checkout_seconds_max"):
+            stats[key] = round(stats[key], 4)
+        return stats
+
+    def close(self):
+        """유휴 연결 모두 닫기"""
+        with self._cond:
+            while self._idle:
+                raw, _ = self._idle.popleft()
+                self._size -= 1
+                try:
+                    raw.close()
+                except Exception:
+                    pass
+
+
+# 프로세스 전역 풀 (연결은 처음 빌릴 때 생성)
+pool = ConnectionPool()
+
+
+def get_db_connection() -> PooledConnection:
+    """풀에서 PostgreSQL 연결 대여 - 사용 후 conn.close()로 반납"""
+    return pool.getconn()
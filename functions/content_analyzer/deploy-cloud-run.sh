@@ -37,6 +37,7 @@ gcloud run deploy ${SERVICE_NAME} \
     --allow-unauthenticated \
     --memory 1Gi \
     --timeout 300 \
+    --no-cpu-throttling \
     --set-env-vars "DB_HOST=34.64.111.186,DB_PORT=5432,DB_USER=admin,DB_NAME=factcheck_db" \
     --set-secrets "DB_PASSWORD=db-password:latest,CLAUDE_CODE_OAUTH_TOKEN=claude-oauth-token:latest"
 
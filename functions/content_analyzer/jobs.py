@@ -0,0 +1,203 @@
+"""
+Content Analyzer 비동기 작업
+
+POST /analyze, /analyze-experiments는 analyzer_jobs에 작업을 등록하고 바로 202를 반환합니다.
+실제 분석은 프로세스 내 백그라운드 실행기(JobRunner)에서 수행하며,
+진행 상황과 항목별 결과를 analyzer_jobs에 기록합니다 (GET /jobs/<id>).
+
+주의: Cloud Run은 응답 후에도 CPU가 할당되도록 --no-cpu-throttling 으로 배포해야 합니다.
+"""
+
+import os
+import json
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+
+
+# ============================================
+# 설정
+# ============================================
+
+ANALYZER_JOB_WORKERS = int(os.environ.get("ANALYZER_JOB_WORKERS", "2"))
+
+# 이 시간 동안 갱신이 없는 queued/running 작업은 인스턴스 종료로 중단된 것으로 보고 실패 처리
+STALE_JOB_MINUTES = int(os.environ.get("ANALYZER_STALE_JOB_MINUTES", "30"))
+
+
+# ============================================
+# 작업 테이블
+# ============================================
+
+def create_job(conn, job_type: str, params: Dict) -> Tuple[str, bool]:
+    """
+    작업 등록
+
+    같은 종류의 작업이 이미 대기/실행 중이면 새로 만들지 않고 그 작업을 반환합니다.
+
+    Returns:
+        Tuple[str, bool]: (job_id, 새로 생성 여부)
+    """
+    cursor = conn.cursor()
+
+    cursor.execute("""
+        UPDATE analyzer_jobs
+        SET status = 'failed', error = '갱신 없이 중단됨 (인스턴스 종료 추정)', finished_at = NOW()
+        WHERE status IN ('queued', 'running')
+          AND updated_at < NOW() - (%s || ' minutes')::INTERVAL
+    """, (str(STALE_JOB_MINUTES),))
+
+    cursor.execute("""
+        INSERT INTO analyzer_jobs (job_type, params)
+        VALUES (%s, %s)
+        ON CONFLICT (job_type) WHERE status IN ('queued', 'running') DO NOTHING
+        RETURNING id
+    """, (job_type, json.dumps(params)))
+    row = cursor.fetchone()
+
+    if row:
+        conn.commit()
+        return str(row[0]), True
+
+    cursor.execute("""
+        SELECT id FROM analyzer_jobs
+        WHERE job_type = %s AND status IN ('queued', 'running')
+    """, (job_type,))
+    row = cursor.fetchone()
+    conn.commit()
+    return str(row[0]), False
+
+
+def get_job(conn, job_id: str) -> Optional[Dict]:
+    """작업 조회 (UUID 형식이 아닌 id는 없는 작업으로 취급)"""
+    try:
+        job_id = str(uuid.UUID(job_id))
+    except ValueError:
+        return None
+
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT
+            id, job_type, status, params,
+            total_items, completed_items, results, summary, error,
+            created_at, started_at, finished_at, updated_at
+        FROM analyzer_jobs
+        WHERE id = %s::UUID
+    """, (job_id,))
+
+    row = cursor.fetchone()
+    if not row:
+        return None
+
+    def to_iso(value):
+        return value.isoformat() if value else None
+
+    return {
+        "job_id": str(row[0]),
+        "job_type": row[1],
+        "status": row[2],
+        "params": row[3] or {},
+        "progress": {"total": row[4], "completed": row[5] or 0},
+        "results": row[6] or [],
+        "summary": row[7],
+        "error": row[8],
+        "created_at": to_iso(row[9]),
+        "started_at": to_iso(row[10]),
+        "finished_at": to_iso(row[11]),
+        "updated_at": to_iso(row[12]),
+    }
+
+
+class JobContext:
+    """
+    실행 중인 작업의 진행 상황 기록
+
+    분석 연결과 트랜잭션이 섞이지 않도록 작업 상태는 별도 연결로 기록합니다.
+    """
+
+    def __init__(self, job_id: str, connect: Callable):
+        self.job_id = job_id
+        self.connect = connect
+
+    def _execute(self, sql: str, params: tuple):
+        conn = self.connect()
+        try:
+            conn.cursor().execute(sql, params)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def set_total(self, total: int):
+        self._execute("""
+            UPDATE analyzer_jobs SET total_items = %s WHERE id = %s::UUID
+        """, (total, self.job_id))
+
+    def add_result(self, result: Dict):
+        """항목 1개 처리 완료 (성공/실패 결과 추가)"""
+        self._execute("""
+            UPDATE analyzer_jobs
+            SET results = results || %s::JSONB,
+                completed_items = completed_items + 1
+            WHERE id = %s::UUID
+        """, (json.dumps([result], ensure_ascii=False, default=str), self.job_id))
+
+
+# ============================================
+# 실행기
+# ============================================
+
+class JobRunner:
+    """프로세스 내 백그라운드 작업 실행기"""
+
+    def __init__(self, connect: Callable, max_workers: int = ANALYZER_JOB_WORKERS):
+        self.connect = connect
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analyzer-job")
+
+    def submit(self, job_type: str, params: Dict, fn: Callable[[JobContext], Dict]) -> Tuple[str, bool]:
+        """
+        작업 등록 후 백그라운드 실행
+
+        Args:
+            fn: JobContext를 받아 최종 요약(summary)을 반환하는 함수
+
+        Returns:
+            Tuple[str, bool]: (job_id, 새로 생성 여부) - 이미 실행 중이면 기존 작업 id
+        """
+        conn = self.connect()
+        try:
+            job_id, created = create_job(conn, job_type, params)
+        finally:
+            conn.close()
+
+        if created:
+            self.executor.submit(self._run, job_id, job_type, fn)
+        return job_id, created
+
+    def _run(self, job_id: str, job_type: str, fn: Callable[[JobContext], Dict]):
+        context = JobContext(job_id, self.connect)
+        context._execute("""
+            UPDATE analyzer_jobs SET status = 'running', started_at = NOW() WHERE id = %s::UUID
+        """, (job_id,))
+        print(f"[Analyzer] 작업 시작: {job_type} ({job_id})")
+
+        try:
+            summary = fn(context)
+            context._execute("""
+                UPDATE analyzer_jobs
+                SET status = 'succeeded', summary = %s::JSONB, finished_at = NOW()
+                WHERE id = %s::UUID
+            """, (json.dumps(summary, ensure_ascii=False, default=str), job_id))
+            print(f"[Analyzer] 작업 완료: {job_type} ({job_id})")
+
+        except Exception as e:
+            print(f"[Analyzer] 작업 실패: {job_type} ({job_id}): {e}")
+            print(traceback.format_exc())
+            try:
+                context._execute("""
+                    UPDATE analyzer_jobs
+                    SET status = 'failed', error = %s, finished_at = NOW()
+                    WHERE id = %s::UUID
+                """, (str(e), job_id))
+            except Exception as update_error:
+                print(f"[Analyzer] 작업 상태 기록 실패 ({job_id}): {update_error}")
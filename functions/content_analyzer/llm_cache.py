@@ -0,0 +1,285 @@
+"""
+LLM 응답 캐시
+
+(시스템 프롬프트, 사용자 프롬프트, 모델/CLI 버전) 해시를 키로 Claude 응답을 저장하여
+크래시 후 재시도, /analyze-experiments 재실행, 로컬 디버깅에서 같은 프롬프트의
+CLI 호출 시간을 다시 쓰지 않도록 합니다.
+
+백엔드:
+- disk: 로컬 디렉토리 (파일 1개 = 항목 1개, mtime으로 LRU)
+- postgres: llm_response_cache 테이블 (인스턴스 간 공유, 마이그레이션 008)
+- none: 캐시 사용 안 함
+
+공통: TTL 만료, 전체 크기 상한 초과 시 오래 안 쓴 항목부터 삭제(LRU),
+hit/miss 카운터와 절약한 CLI 시간(초) 집계.
+캐시 오류는 분석을 막지 않도록 경고만 남기고 miss로 처리합니다.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+
+# ============================================
+# 설정
+# ============================================
+
+LLM_CACHE_BACKEND = os.environ.get("LLM_CACHE_BACKEND", "disk")  # disk, postgres, none
+LLM_CACHE_DIR = os.environ.get("LLM_CACHE_DIR", "/tmp/llm_cache")
+LLM_CACHE_TTL_SECONDS = int(os.environ.get("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_BYTES = int(os.environ.get("LLM_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+
+
+def make_cache_key(system_prompt: str, user_prompt: str, model: str) -> str:
+    """캐시 키 (sha256) - 프롬프트나 모델/CLI 버전이 한 글자라도 다르면 다른 키"""
+    payload = json.dumps([system_prompt, user_prompt, model], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ============================================
+# 백엔드
+# ============================================
+
+class DiskCacheBackend:
+    """
+    로컬 디스크 캐시
+
+    항목마다 <key>.json 파일 하나. 조회 시 mtime을 갱신하고,
+    전체 크기가 max_bytes를 넘으면 mtime이 오래된 파일부터 삭제합니다.
+    """
+
+    def __init__(self, directory: str, ttl_seconds: int, max_bytes: int):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+
+        if time.time() - entry["created_at"] > self.ttl_seconds:
+            self._remove(path)
+            return None
+
+        os.utime(path)  # LRU: 최근 사용 표시
+        return entry["response"], entry["elapsed_seconds"]
+
+    def put(self, key: str, response: str, elapsed_seconds: float):
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "created_at": time.time(),
+                "elapsed_seconds": elapsed_seconds,
+                "response": response,
+            }, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self):
+        """TTL 만료 항목 삭제 후 크기 상한까지 LRU 삭제"""
+        with self._lock:
+            now = time.time()
+            entries = []
+            for name in os.listdir(self.directory):
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(self.directory, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+
+            # mtime은 조회 때마다 갱신되므로 TTL은 생성 시각 기준으로 get에서 확인하고,
+            # 여기서는 TTL 이상 한 번도 쓰이지 않은 파일만 정리
+            total = 0
+            for mtime, size, path in sorted(entries, reverse=True):
+                if now - mtime > self.ttl_seconds or total + size > self.max_bytes:
+                    self._remove(path)
+                else:
+                    total += size
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+class PostgresCacheBackend:
+    """
+    Postgres 캐시 (llm_response_cache 테이블)
+
+    Cloud Run 인스턴스가 바뀌어도 유지됩니다. 연결은 connect()로 작업마다 얻습니다.
+    """
+
+    def __init__(self, connect: Callable, ttl_seconds: int, max_bytes: int):
+        self.connect = connect
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        conn = self.connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                UPDATE llm_response_cache
+                SET last_accessed_at = NOW(), hit_count = hit_count + 1
+                WHERE cache_key = %s
+                  AND created_at > NOW() - make_interval(secs => %s)
+                RETURNING response, elapsed_seconds
+            """, (key, self.ttl_seconds))
+            row = cursor.fetchone()
+            conn.commit()
+        finally:
+            conn.close()
+
+        if not row:
+            return None
+        return row[0], float(row[1] or 0)
+
+    def put(self, key: str, response: str, elapsed_seconds: float):
+        conn = self.connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO llm_response_cache (cache_key, response, elapsed_seconds, size_bytes)
+                VALUES (%s, %s, %s, %s)
+                ON CONFLICT (cache_key) DO UPDATE SET
+                    response = EXCLUDED.response,
+                    elapsed_seconds = EXCLUDED.elapsed_seconds,
+                    size_bytes = EXCLUDED.size_bytes,
+                    created_at = NOW(),
+                    last_accessed_at = NOW()
+            """, (key, response, elapsed_seconds, len(response.encode("utf-8"))))
+
+            # TTL 만료 + 크기 상한 초과분(최근 사용 순으로 누적) 삭제
+            cursor.execute("""
+                DELETE FROM llm_response_cache
+                WHERE created_at <= NOW() - make_interval(secs => %s)
+                   OR cache_key IN (
+                        SELECT cache_key FROM (
+                            SELECT
+                                cache_key,
+                                SUM(size_bytes) OVER (ORDER BY last_accessed_at DESC, cache_key) AS cumulative
+                            FROM llm_response_cache
+                        ) ranked
+                        WHERE cumulative > %s
+                   )
+            """, (self.ttl_seconds, self.max_bytes))
+            conn.commit()
+        finally:
+            conn.close()
+
+
+# ============================================
+# 캐시
+# ============================================
+
+class LLMCache:
+    """
+    백엔드 + hit/miss 통계 (스레드 안전)
+
+    사용:
+        text = llm_cache.get_or_compute(system, user, model, lambda: run_cli(...))
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "bypassed": 0, "errors": 0,
+                       "seconds_saved": 0.0, "seconds_spent": 0.0}
+
+    def _count(self, **increments):
+        with self._lock:
+            for name, value in increments.items():
+                self._stats[name] += value
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else None
+        stats["seconds_saved"] = round(stats["seconds_saved"], 2)
+        stats["seconds_spent"] = round(stats["seconds_spent"], 2)
+        stats["backend"] = type(self.backend).__name__ if self.backend else None
+        return stats
+
+    def get_or_compute(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        model: str,
+        compute: Callable[[], str],
+        validate: Optional[Callable[[str], object]] = None,
+        bypass: bool = False,
+    ) -> Tuple[str, bool]:
+        """
+        캐시 조회 후 없으면 compute()로 생성하여 저장
+
+        Args:
+            compute: 응답 텍스트를 반환하는 함수 (CLI 호출)
+            validate: 저장 전 검증 (예외가 나면 저장하지 않음 - 파싱 불가 응답 캐시 방지)
+            bypass: True면 캐시를 읽지 않고 새로 생성 (결과는 저장)
+
+        Returns:
+            Tuple[str, bool]: (응답 텍스트, 캐시 hit 여부)
+        """
+        key = make_cache_key(system_prompt, user_prompt, model)
+
+        if self.backend and not bypass:
+            try:
+                cached = self.backend.get(key)
+            except Exception as e:
+                print(f"[LLMCache] 조회 실패 (무시): {e}")
+                self._count(errors=1)
+                cached = None
+
+            if cached:
+                response, elapsed = cached
+                self._count(hits=1, seconds_saved=elapsed)
+                return response, True
+
+            self._count(misses=1)
+        elif bypass:
+            self._count(bypassed=1)
+
+        started = time.perf_counter()
+        response = compute()
+        elapsed = time.perf_counter() - started
+        self._count(seconds_spent=elapsed)
+
+        if validate:
+            validate(response)
+
+        if self.backend:
+            try:
+                self.backend.put(key, response, elapsed)
+            except Exception as e:
+                print(f"[LLMCache] 저장 실패 (무시): {e}")
+                self._count(errors=1)
+
+        return response, False
+
+
+def create_llm_cache(connect: Optional[Callable] = None) -> LLMCache:
+    """환경 변수(LLM_CACHE_BACKEND)에 따라 캐시 생성"""
+    if LLM_CACHE_BACKEND == "postgres" and connect:
+        return LLMCache(PostgresCacheBackend(connect, LLM_CACHE_TTL_SECONDS, LLM_CACHE_MAX_BYTES))
+    if LLM_CACHE_BACKEND == "disk":
+        return LLMCache(DiskCacheBackend(LLM_CACHE_DIR, LLM_CACHE_TTL_SECONDS, LLM_CACHE_MAX_BYTES))
+    return LLMCache(None)
@@ -0,0 +1,309 @@
+"""
+Claude Code CLI 워커 풀 (미리 기동)
+
+분석마다 `claude -p <prompt>` 프로세스를 새로 띄우면 매번 Node 기동 + 인증 비용을 내고,
+프롬프트 전체가 argv로 전달되어 ARG_MAX에 걸릴 수 있습니다.
+
+이 모듈은 스트리밍 JSON 모드의 CLI 프로세스를 미리 띄워 둡니다.
+    claude -p --input-format stream-json --output-format stream-json --verbose
+
+- 프롬프트는 stdin으로 한 줄짜리 user 메시지 JSON으로 전달 (argv 길이 제한 없음)
+- 응답은 stdout 이벤트 중 {"type": "result"} 줄의 result 필드
+- --include-partial-messages로 텍스트 조각(text_delta)도 받아 on_text 콜백에 넘기므로,
+  호출자는 필요한 JSON이 완성되는 즉시 응답을 받거나 형식 오류로 바로 중단할 수 있습니다.
+- 프로세스 1개 = 세션 1개 = 프롬프트 1건. 같은 프로세스에 두 번째 프롬프트를 보내면
+  이전 테스트의 프롬프트/응답이 컨텍스트에 남아 분석이 서로 독립적이지 않게 되고,
+  프롬프트만으로 키를 만드는 응답 캐시(llm_cache)에 숨은 맥락에 의존한 결과가 저장됩니다.
+  그래서 워커는 1건을 처리하면 바로 종료하고, 다음 요청용 프로세스는 백그라운드에서
+  미리 띄워 둡니다 (prewarm) - 재사용 대신 기동을 요청 경로 밖으로 옮기는 방식입니다.
+"""
+
+import os
+import json
+import time
+import queue
+import threading
+import subprocess
+from collections import deque
+from typing import Callable, Dict, Optional
+
+
+# ============================================
+# 설정
+# ============================================
+
+CLAUDE_WORKER_COMMAND = [
+    "claude", "-p",
+    "--input-format", "stream-json",
+    "--output-format", "stream-json",
+    "--verbose",
+    "--include-partial-messages",
+]
+
+_STDOUT_CLOSED = object()
+
+
+def _event_text(event: Dict, saw_delta: bool) -> str:
+    """
+    스트리밍 이벤트에서 응답 텍스트 조각 추출
+
+    text_delta(부분 메시지)를 우선 사용하고, 부분 메시지를 받지 못한 경우에만
+    완성된 assistant 메시지의 텍스트를 사용합니다 (같은 텍스트 중복 방지).
+    """
+    event_type = event.get("type")
+
+    if event_type == "stream_event":
+        inner = event.get("event") or {}
+        delta = inner.get("delta") or {}
+        if inner.get("type") == "content_block_delta" and delta.get("type") == "text_delta":
+            return delta.get("text", "")
+
+    elif event_type == "assistant" and not saw_delta:
+        content = (event.get("message") or {}).get("content") or []
+        return "".join(block.get("text", "") for block in content if block.get("type") == "text")
+
+    return ""
+
+
+class ClaudeWorker:
+    """
+    스트리밍 JSON 모드 Claude CLI 프로세스 1개
+
+    stdout은 리더 스레드가 줄 단위로 큐에 넣고, ask()는 타임아웃을 두고 큐를 읽습니다.
+    stderr는 마지막 몇 줄만 보관하여 오류 메시지에 사용합니다.
+    """
+
+    def __init__(self, env: Dict[str, str]):
+        self.started_at = time.monotonic()
+        self.used = False  # 프롬프트를 이미 받았는지 (워커당 1건)
+        self.awaiting_result = False  # 조기 반환 후 result 이벤트를 아직 받지 않음
+        self.process = subprocess.Popen(
+            CLAUDE_WORKER_COMMAND,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+            env=env,
+        )
+        self._lines: "queue.Queue" = queue.Queue()
+        self._stderr_tail: deque = deque(maxlen=20)
+
+        threading.Thread(target=self._read_stdout, daemon=True).start()
+        threading.Thread(target=self._read_stderr, daemon=True).start()
+
+    def _read_stdout(self):
+        for line in self.process.stdout:
+            self._lines.put(line)
+        self._lines.put(_STDOUT_CLOSED)
+
+    def _read_stderr(self):
+        for line in self.process.stderr:
+            self._stderr_tail.append(line.rstrip())
+
+    def is_alive(self) -> bool:
+        return self.process.poll() is None
+
+    def ask(self, prompt: str, timeout: float, on_text: Optional[Callable[[str], bool]] = None) -> str:
+        """
+        프롬프트 1건 처리 (워커당 한 번만 호출 가능 - 새 세션에서만 분석)
+
+        Args:
+            on_text: 응답 텍스트 조각마다 호출. True를 반환하면 result를 기다리지 않고
+                     지금까지 받은 텍스트로 바로 반환, 예외를 던지면 그대로 전파 (워커는 폐기 대상)
+
+        Returns:
+            str: 응답 텍스트 (result 이벤트의 result, 조기 반환 시 받은 조각을 이은 텍스트)
+        """
+        if self.used:
+            raise RuntimeError("Claude 워커는 프롬프트 1건만 처리합니다 (세션 재사용 금지)")
+        self.used = True
+
+        message = {
+            "type": "user",
+            "message": {"role": "user", "content": [{"type": "text", "text": prompt}]},
+        }
+        try:
+            self.process.stdin.write(json.dumps(message, ensure_ascii=False) + "\n")
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            raise RuntimeError(f"Claude 워커 입력 실패: {e} {self.stderr_tail()}")
+
+        self.awaiting_result = True
+        deadline = time.monotonic() + timeout
+        saw_delta = False
+        chunks = []
+
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.close()
+                raise RuntimeError(f"Claude CLI 타임아웃 ({timeout:.0f}초 초과)")
+
+            try:
+                line = self._lines.get(timeout=remaining)
+            except queue.Empty:
+                continue
+
+            if line is _STDOUT_CLOSED:
+                raise RuntimeError(f"Claude 워커 종료됨 (exit={self.process.poll()}) {self.stderr_tail()}")
+
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+            if event.get("type") == "result":
+                self.awaiting_result = False
+                if event.get("is_error"):
+                    raise RuntimeError(f"Claude CLI 실행 실패: {event.get('result') or event.get('subtype')}")
+                return event.get("result", "")
+
+            text = _event_text(event, saw_delta)
+            if not text:
+                continue
+            saw_delta = saw_delta or event.get("type") == "stream_event"
+            chunks.append(text)
+            if on_text and on_text(text):
+                return "".join(chunks)
+
+    def stderr_tail(self) -> str:
+        return " | ".join(self._stderr_tail)
+
+    def close(self):
+        if self.process.poll() is not None:
+            return
+        if self.awaiting_result:
+            # 응답 생성 중 (타임아웃/형식 오류로 중단) - 끝날 때까지 기다리지 않음
+            self.process.kill()
+            return
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=5)
+        except Exception:
+            self.process.kill()
+
+
+class ClaudeWorkerPool:
+    """
+    미리 기동한 Claude 워커 풀
+
+    - 최대 size개 프로세스. 빈 워커가 없으면 기동될 때까지 대기
+    - 워커는 프롬프트 1건을 처리하면 종료하고, 그 자리에 새 워커를 백그라운드에서 띄움
+      (분석마다 새 세션 - 이전 분석이 컨텍스트에 남지 않음)
+    - prewarm()으로 서버 시작 시 미리 띄워 첫 요청도 기동 비용 없이 처리
+    """
+
+    def __init__(self, size: int, env: Dict[str, str]):
+        self.size = max(1, size)
+        self.env = env
+        self._idle: "queue.Queue[ClaudeWorker]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._total = 0  # 살아 있거나 기동 중인 워커 수
+        self._stats = {
+            "requests": 0, "spawned": 0, "recycled": 0, "failed": 0,
+            "early_returns": 0, "wait_seconds": 0.0,
+        }
+
+    def _spawn_async(self):
+        """슬롯 하나를 예약하고 백그라운드에서 워커 기동"""
+        with self._lock:
+            if self._total >= self.size:
+                return
+            self._total += 1
+
+        def spawn():
+            try:
+                worker = ClaudeWorker(self.env)
+            except Exception as e:
+                print(f"[LLMWorker] 워커 기동 실패: {e}")
+                with self._lock:
+                    self._total -= 1
+                    self._stats["failed"] += 1
+                return
+            with self._lock:
+                self._stats["spawned"] += 1
+            self._idle.put(worker)
+
+        threading.Thread(target=spawn, daemon=True).start()
+
+    def prewarm(self):
+        """워커를 size개까지 미리 기동"""
+        for _ in range(self.size):
+            self._spawn_async()
+
+    def _retire(self, worker: ClaudeWorker, reason: str):
+        # 종료 대기(최대 5초)가 응답 반환을 늦추지 않도록 백그라운드에서 닫음
+        threading.Thread(target=worker.close, daemon=True).start()
+        with self._lock:
+            self._total -= 1
+            self._stats[reason] += 1
+        self._spawn_async()
+
+    def run(self, prompt: str, timeout: float, on_text: Optional[Callable[[str], bool]] = None) -> str:
+        """빈 워커로 프롬프트 처리 (on_text: ClaudeWorker.ask 참고)"""
+        self._spawn_async()  # 기동된 워커가 부족하면 하나 더 준비
+
+        wait_started = time.monotonic()
+        while True:
+            try:
+                worker = self._idle.get(timeout=timeout)
+            except queue.Empty:
+                raise RuntimeError(f"Claude 워커 대기 타임아웃 ({timeout:.0f}초, 워커 {self.stats()['workers']}개)")
+            if worker.is_alive():
+                break
+            self._retire(worker, "failed")
+        with self._lock:
+            self._stats["wait_seconds"] += time.monotonic() - wait_started
+            self._stats["requests"] += 1
+
+        try:
+            response = worker.ask(prompt, timeout, on_text)
+        except Exception:
+            self._retire(worker, "failed")
+            raise
+
+        if worker.awaiting_result:
+            # 필요한 응답은 이미 받음 - 남은 생성은 기다리지 않고 종료 (close가 kill)
+            with self._lock:
+                self._stats["early_returns"] += 1
+        self._retire(worker, "recycled")
+        return response
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["workers"] = self._total
+        stats["idle"] = self._idle.qsize()
+        stats["wait_seconds"] = round(stats["wait_seconds"], 3)
+        return stats
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+def run_claude_oneshot(
+    prompt: str,
+    timeout: float,
+    env: Dict[str, str],
+    on_text: Optional[Callable[[str], bool]] = None,
+) -> str:
+    """
+    프로세스 1회용 Claude CLI 호출 (워커 풀을 쓰지 않을 때)
+
+    워커 풀과 같은 스트리밍 JSON 프로세스를 1건만 처리하고 종료합니다.
+    프롬프트는 argv 대신 stdin으로 전달합니다.
+
+    Returns:
+        str: 응답 텍스트 (ClaudeWorker.ask 참고)
+    """
+    worker = ClaudeWorker(env)
+    try:
+        return worker.ask(prompt, timeout, on_text)
+    finally:
+        worker.close()
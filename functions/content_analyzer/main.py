@@ -23,17 +23,29 @@ SPEC-003/006: Content Analyzer Cloud Run Service
 
 import os
 import json
-import re
 import subprocess
-from typing import Dict, List, Optional, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Any
 from datetime import datetime
 
-import pg8000
 from flask import Flask, request, jsonify
 
-from prompts import ANALYSIS_SYSTEM_PROMPT, format_analysis_prompt
-from prompts_topic_experiment import TOPIC_EXPERIMENT_SYSTEM_PROMPT, format_topic_experiment_prompt
+from db import get_db_connection, pool as db_pool
+from jobs import JobContext, JobRunner, get_job
+from llm_cache import create_llm_cache
+from llm_worker import ClaudeWorkerPool, run_claude_oneshot
+from pattern_bootstrap import bootstrap_pattern_means, BOOTSTRAP_RESAMPLES, BOOTSTRAP_CONFIDENCE
+from pattern_dedup import array_literal, ensure_pattern_signatures, find_merge_targets
+from prompts import (
+    ANALYSIS_SYSTEM_PROMPT, ANALYSIS_RESPONSE_SCHEMA, ANALYSIS_BATCH_RESPONSE_SCHEMA,
+    format_analysis_prompt, format_batch_analysis_prompt,
+)
+from prompts_topic_experiment import (
+    TOPIC_EXPERIMENT_SYSTEM_PROMPT, TOPIC_EXPERIMENT_RESPONSE_SCHEMA, render_topic_experiment_prompt,
+)
 from prompt_updater import update_prompt_if_needed
+from response_parser import IncrementalJSONExtractor, compile_schema, extract_json_object
 
 
 # ============================================
@@ -57,31 +69,32 @@ TOPIC_PATTERNS = {
 # 로컬에서 `claude setup-token` 명령어로 생성
 CLAUDE_OAUTH_TOKEN = os.environ.get("CLAUDE_CODE_OAUTH_TOKEN")
 
+# 동시에 실행할 Claude CLI 분석 수 (CLI 프로세스당 메모리/구독 rate limit 고려)
+CLAUDE_MAX_CONCURRENCY = max(1, int(os.environ.get("CLAUDE_MAX_CONCURRENCY", "4")))
+
+# 한 번의 Claude 호출로 분석할 A/B 테스트 수 (1이면 테스트마다 개별 호출)
+# 시스템 프롬프트/출력 형식을 테스트마다 반복하지 않아 밀린 테스트가 많을 때 처리량 증가
+CLAUDE_ANALYSIS_BATCH_SIZE = max(1, int(os.environ.get("CLAUDE_ANALYSIS_BATCH_SIZE", "5")))
+
+# Claude CLI 실행 방식 - pool: 미리 기동한 1회용 워커 (CLAUDE_MAX_CONCURRENCY개), oneshot: 호출마다 새 프로세스
+CLAUDE_WORKER_MODE = os.environ.get("CLAUDE_WORKER_MODE", "pool")
+
+# 주제 패턴 실험 프롬프트 토큰 예산 (시스템 프롬프트 포함 추정치, 넘으면 글 목록 축약)
+TOPIC_PROMPT_TOKEN_BUDGET = int(os.environ.get("TOPIC_PROMPT_TOKEN_BUDGET", "8000"))
+
 # Claude 모델 정보 (로깅용)
 CLAUDE_MODEL = "claude-code-cli"
 
-DB_CONFIG = {
-    "host": os.environ.get("DB_HOST", "34.64.111.186"),
-    "port": int(os.environ.get("DB_PORT", "5432")),
-    "user": os.environ.get("DB_USER", "admin"),
-    "password": os.environ.get("DB_PASSWORD", "galddae-password"),
-    "database": os.environ.get("DB_NAME", "factcheck_db"),
-}
-
 
 # ============================================
 # 데이터베이스 연결
 # ============================================
 
-def get_db_connection():
-    """PostgreSQL 연결"""
-    return pg8000.connect(
-        host=DB_CONFIG["host"],
-        port=DB_CONFIG["port"],
-        user=DB_CONFIG["user"],
-        password=DB_CONFIG["password"],
-        database=DB_CONFIG["database"],
-    )
+# get_db_connection(): db.py의 프로세스 전역 연결 풀에서 대여, conn.close()로 반납
+# (DB_POOL_MAX_SIZE 등 풀 설정은 db.py 참고)
+
+# Claude 응답 캐시 (LLM_CACHE_BACKEND: disk / postgres / none)
+llm_cache = create_llm_cache(get_db_connection)
 
 
 # ============================================
@@ -305,6 +318,9 @@ def calculate_pattern_rankings(articles_by_pattern: Dict[str, List[Dict]], prima
     """
     패턴별 성과를 집계하고 순위 계산
 
+    순위는 글 단순 평균 기준이며, 주요 지표의 pageview 가중 평균에 대한
+    부트스트랩 신뢰구간(ci_low/ci_high)과 최고 패턴 확률(prob_best)을 함께 계산합니다.
+
     Returns:
         Dict: 패턴별 성과 및 순위 정보
     """
@@ -357,55 +373,52 @@ def calculate_pattern_rankings(articles_by_pattern: Dict[str, List[Dict]], prima
     for rank, pattern in enumerate(sorted_patterns, 1):
         pattern_stats[pattern]["rank"] = rank
 
+    # 부트스트랩 신뢰구간 / 최고 패턴 확률 (pageview 가중)
+    article_metric_key = {
+        "avg_time_on_page": "avg_time_on_page",
+        "avg_scroll_depth": "avg_scroll_depth",
+    }.get(metric_key, "engagement_score")
+    if primary_metric == "bounce_rate":
+        article_metric_key = "avg_bounce_rate"
+
+    patterns_with_articles = [p for p in articles_by_pattern if p in pattern_stats]
+    bootstrap = bootstrap_pattern_means(
+        {p: [a["metrics"][article_metric_key] for a in articles_by_pattern[p]] for p in patterns_with_articles},
+        {p: [a["metrics"]["total_pageviews"] for a in articles_by_pattern[p]] for p in patterns_with_articles},
+        higher_is_better=primary_metric != "bounce_rate",
+        seed=0,  # 같은 데이터면 같은 결과 → 같은 프롬프트 (LLM 응답 캐시 키 유지)
+    )
+    for pattern, interval in bootstrap.items():
+        pattern_stats[pattern].update(interval)
+
     return {
         "pattern_stats": pattern_stats,
         "ranking": sorted_patterns,
         "winner": sorted_patterns[0] if sorted_patterns else None,
         "primary_metric": primary_metric,
+        "bootstrap": {
+            "metric": article_metric_key,
+            "resamples": BOOTSTRAP_RESAMPLES,
+            "confidence": BOOTSTRAP_CONFIDENCE,
+        },
     }
 
 
-def get_article_by_slug_version(conn, slug: str, version: str) -> Optional[Dict]:
-    """글 조회 (slug + version)"""
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT id, slug, version, title, description, sections, tags
-        FROM articles
-        WHERE slug = %s AND version = %s AND is_active = true
-        LIMIT 1
-    """, (slug, version))
-
-    row = cursor.fetchone()
-    if row:
-        return {
-            "id": str(row[0]),
-            "slug": row[1],
-            "version": row[2],
-            "title": row[3],
-            "description": row[4],
-            "sections": row[5] if row[5] else [],
-            "tags": row[6] if row[6] else [],
-        }
-    return None
-
+def _article_from_row(row) -> Dict:
+    """articles 행 (id, slug, version, title, description, sections, tags) → Dict"""
+    return {
+        "id": str(row[0]),
+        "slug": row[1],
+        "version": row[2],
+        "title": row[3],
+        "description": row[4],
+        "sections": row[5] if row[5] else [],
+        "tags": row[6] if row[6] else [],
+    }
 
-def get_version_metrics(conn, slug: str, version: str) -> Dict:
-    """버전별 메트릭 조회 (최근 7일 평균)"""
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT
-            AVG(avg_time_on_page) as avg_time,
-            AVG(bounce_rate) as bounce_rate,
-            AVG(scroll_75_pct::float / NULLIF(pageviews, 0)) as scroll_75_rate,
-            AVG(engagement_score) as engagement_score,
-            SUM(pageviews) as total_pageviews
-        FROM article_metrics
-        WHERE article_slug = %s
-          AND article_version = %s
-          AND date >= CURRENT_DATE - INTERVAL '7 days'
-    """, (slug, version))
 
-    row = cursor.fetchone()
+def _metrics_from_row(row) -> Dict:
+    """7일 메트릭 집계 행 (avg_time, bounce_rate, scroll_75_rate, engagement_score, total_pageviews) → Dict"""
     if row and row[0] is not None:
         return {
             "avg_time_on_page": float(row[0]) if row[0] else 0,
@@ -424,22 +437,228 @@ def get_version_metrics(conn, slug: str, version: str) -> Dict:
     }
 
 
+def prefetch_test_inputs(conn, tests: List[Dict]) -> Dict:
+    """
+    분석 대상 테스트 전체의 글 / 메트릭 일괄 조회
+
+    테스트마다 두 버전의 글 / 메트릭을 따로 조회(4회 왕복)하는 대신
+    필요한 (slug, version) 쌍을 배열로 넘겨 쿼리 2개로 조회합니다.
+
+    Returns:
+        Dict: {
+            "articles": {(slug, version): 글 Dict},  # 활성 글이 없으면 키 없음
+            "metrics": {(slug, version): 메트릭 Dict},  # 메트릭이 없으면 0으로 채운 Dict
+        }
+    """
+    keys = sorted({
+        (test["article_slug"], version)
+        for test in tests
+        for version in (test["control_version"], test["variant_version"])
+    })
+    if not keys:
+        return {"articles": {}, "metrics": {}}
+
+    slugs = [slug for slug, _ in keys]
+    versions = [version for _, version in keys]
+    cursor = conn.cursor()
+
+    # 1. 글 (같은 slug/version 활성 글이 여러 개면 하나만)
+    cursor.execute("""
+        SELECT DISTINCT ON (a.slug, a.version)
+            a.id, a.slug, a.version, a.title, a.description, a.sections, a.tags
+        FROM articles a
+        JOIN unnest(%s::TEXT[], %s::TEXT[]) AS k(slug, version)
+          ON a.slug = k.slug AND a.version = k.version
+        WHERE a.is_active = true
+        ORDER BY a.slug, a.version
+    """, (slugs, versions))
+    articles = {(row[1], row[2]): _article_from_row(row) for row in cursor.fetchall()}
+
+    # 2. 최근 7일 메트릭 집계
+    cursor.execute("""
+        SELECT
+            m.article_slug,
+            m.article_version,
+            AVG(m.avg_time_on_page) as avg_time,
+            AVG(m.bounce_rate) as bounce_rate,
+            AVG(m.scroll_75_pct::float / NULLIF(m.pageviews, 0)) as scroll_75_rate,
+            AVG(m.engagement_score) as engagement_score,
+            SUM(m.pageviews) as total_pageviews
+        FROM article_metrics m
+        JOIN unnest(%s::TEXT[], %s::TEXT[]) AS k(slug, version)
+          ON m.article_slug = k.slug AND m.article_version = k.version
+        WHERE m.date >= CURRENT_DATE - INTERVAL '7 days'
+        GROUP BY m.article_slug, m.article_version
+    """, (slugs, versions))
+    rows = {(row[0], row[1]): row[2:] for row in cursor.fetchall()}
+    metrics = {key: _metrics_from_row(rows.get(key)) for key in keys}
+
+    return {"articles": articles, "metrics": metrics}
+
+
+# ============================================
+# Claude Code CLI 호출 (공통)
+# ============================================
+
+_claude_cli_version: Optional[str] = None
+_claude_cli_version_lock = threading.Lock()
+
+_claude_worker_pool: Optional[ClaudeWorkerPool] = None
+_claude_worker_pool_lock = threading.Lock()
+
+# 응답 형식 검증 (모듈 로드 시 한 번 컴파일)
+validate_analysis_response = compile_schema(ANALYSIS_RESPONSE_SCHEMA)
+validate_batch_analysis_response = compile_schema(ANALYSIS_BATCH_RESPONSE_SCHEMA)
+validate_topic_experiment_response = compile_schema(TOPIC_EXPERIMENT_RESPONSE_SCHEMA)
+
+
+def get_claude_cli_version() -> str:
+    """Claude CLI 버전 (캐시 키에 포함 - CLI 업데이트 시 캐시 무효화)"""
+    global _claude_cli_version
+    with _claude_cli_version_lock:
+        if _claude_cli_version is None:
+            try:
+                result = subprocess.run(["claude", "--version"], capture_output=True, text=True, timeout=30)
+                _claude_cli_version = result.stdout.strip() or "unknown"
+            except (OSError, subprocess.TimeoutExpired):
+                _claude_cli_version = "unknown"
+        return _claude_cli_version
+
+
+def _claude_env() -> Dict[str, str]:
+    return {**os.environ, "CLAUDE_CODE_OAUTH_TOKEN": CLAUDE_OAUTH_TOKEN or ""}
+
+
+def get_claude_worker_pool() -> Optional[ClaudeWorkerPool]:
+    """미리 기동한 1회용 워커 풀 (CLAUDE_WORKER_MODE=pool 일 때, 지연 생성)"""
+    global _claude_worker_pool
+    if CLAUDE_WORKER_MODE != "pool" or not CLAUDE_OAUTH_TOKEN:
+        return None
+    with _claude_worker_pool_lock:
+        if _claude_worker_pool is None:
+            _claude_worker_pool = ClaudeWorkerPool(CLAUDE_MAX_CONCURRENCY, _claude_env())
+        return _claude_worker_pool
+
+
+def _run_claude_cli(full_prompt: str, timeout: int, on_text: Optional[Callable[[str], bool]] = None) -> str:
+    """
+    Claude Code CLI 호출 (프롬프트는 stdin으로 전달)
+
+    - pool: 미리 기동한 스트리밍 JSON 워커 (1건만 처리 후 교체, 기동은 요청 경로 밖 백그라운드)
+    - oneshot: 호출마다 새 프로세스
+    - on_text: 응답 텍스트 조각마다 호출, True면 남은 출력을 기다리지 않고 반환
+
+    Returns:
+        str: 응답 텍스트 (CLI result 또는 조기 반환 시점까지 받은 텍스트)
+    """
+    pool = get_claude_worker_pool()
+    if pool:
+        response_text = pool.run(full_prompt, timeout, on_text)
+    else:
+        response_text = run_claude_oneshot(full_prompt, timeout, _claude_env(), on_text)
+
+    print(f"[Analyzer] Claude 응답 길이: {len(response_text)}")
+    return response_text
+
+
+def extract_analysis_json(response_text: str, validate: Optional[Callable] = None) -> Dict:
+    """Claude 응답에서 분석 결과 JSON 추출 (첫 번째 JSON 객체) 후 형식 검증"""
+    try:
+        analysis = extract_json_object(response_text)
+        if validate:
+            validate(analysis)
+        return analysis
+    except ValueError as e:
+        print(f"[Analyzer] JSON 파싱 오류: {e}")
+        print(f"[Analyzer] 원본 응답: {response_text[:500]}")
+        raise ValueError(f"Claude 응답에서 JSON 추출 실패: {e}")
+
+
+def run_claude_analysis(
+    system_prompt: str,
+    user_prompt: str,
+    timeout: int,
+    use_cache: bool = True,
+    validate: Optional[Callable] = None,
+) -> Dict:
+    """
+    시스템 + 사용자 프롬프트로 Claude 분석 실행 (응답 캐시 사용)
+
+    응답은 스트리밍으로 받으면서 JSON 객체가 닫히는 즉시 형식을 검증합니다.
+    - 검증 통과: 남은 출력을 기다리지 않고 바로 반환
+    - 검증 실패 / JSON 없이 긴 텍스트: 타임아웃까지 기다리지 않고 즉시 실패
+    JSON을 추출할 수 있는 응답만 캐시에 저장합니다.
+
+    Returns:
+        Dict: 분석 결과 JSON
+    """
+    full_prompt = f"""{system_prompt}
+
+---
+
+{user_prompt}"""
+
+    def compute() -> str:
+        extractor = IncrementalJSONExtractor()
+
+        def on_text(chunk: str) -> bool:
+            analysis = extractor.feed(chunk)
+            if analysis is None:
+                return False
+            if validate:
+                validate(analysis)
+            return True
+
+        return _run_claude_cli(full_prompt, timeout, on_text)
+
+    response_text, cache_hit = llm_cache.get_or_compute(
+        system_prompt,
+        user_prompt,
+        f"{CLAUDE_MODEL}/{get_claude_cli_version()}",
+        compute=compute,
+        validate=lambda text: extract_analysis_json(text, validate),
+        bypass=not use_cache,
+    )
+    if cache_hit:
+        print("[Analyzer] 캐시된 Claude 응답 사용")
+
+    return extract_analysis_json(response_text, validate)
+
+
 # ============================================
 # Claude Code CLI 분석
 # ============================================
 
+def _analysis_prompt_args(test: Dict, article_a: Dict, article_b: Dict, metrics_a: Dict, metrics_b: Dict) -> Dict:
+    """format_analysis_prompt 인자"""
+    return {
+        "test_name": test["name"],
+        "hypothesis": test["hypothesis"],
+        "target_section": test.get("target_section"),
+        "article_a": article_a,
+        "article_b": article_b,
+        "metrics_a": metrics_a,
+        "metrics_b": metrics_b,
+        "winner": test["winner_version"],
+        "p_value": 0.1,  # 실제 p-value 저장 필요
+        "lift": test["actual_lift"],
+    }
+
+
 def analyze_with_claude(
     test: Dict,
     article_a: Dict,
     article_b: Dict,
     metrics_a: Dict,
-    metrics_b: Dict
+    metrics_b: Dict,
+    use_cache: bool = True,
 ) -> Dict:
     """
     Claude Code CLI를 사용하여 A/B 테스트 분석
 
     인증: CLAUDE_CODE_OAUTH_TOKEN 환경변수 (구독 기반)
     비용: $0 (Claude Max/Pro 구독으로 사용)
+    use_cache=False면 캐시된 응답을 무시하고 새로 분석
 
     Returns:
         Dict: 분석 결과 (patterns, recommendations 포함)
@@ -449,78 +668,83 @@ def analyze_with_claude(
                         "로컬에서 'claude setup-token' 명령어로 토큰을 생성하세요.")
 
     # 프롬프트 구성
-    user_prompt = format_analysis_prompt(
-        test_name=test["name"],
-        hypothesis=test["hypothesis"],
-        target_section=test.get("target_section"),
-        article_a=article_a,
-        article_b=article_b,
-        metrics_a=metrics_a,
-        metrics_b=metrics_b,
-        winner=test["winner_version"],
-        p_value=0.1,  # 실제 p-value 저장 필요
-        lift=test["actual_lift"],
+    user_prompt = format_analysis_prompt(**_analysis_prompt_args(test, article_a, article_b, metrics_a, metrics_b))
+
+    print(f"[Analyzer] Claude Code CLI 분석 요청: {test['name']}")
+
+    return run_claude_analysis(
+        ANALYSIS_SYSTEM_PROMPT, user_prompt, timeout=120, use_cache=use_cache,
+        validate=validate_analysis_response,
     )
 
-    # 전체 프롬프트 (시스템 + 사용자)
-    full_prompt = f"""{ANALYSIS_SYSTEM_PROMPT}
 
----
+def analyze_tests_batch_with_claude(batch: List[tuple], use_cache: bool = True) -> List[Any]:
+    """
+    여러 A/B 테스트를 한 번의 Claude 호출로 분석 (일괄 분석 모드)
 
-{user_prompt}"""
+    응답의 analyses[]를 test_key로 테스트에 다시 나누고, 항목별로 형식을 검증합니다.
+    응답에 없거나 형식이 틀린 테스트, 또는 일괄 호출 자체가 실패하면
+    해당 테스트만 analyze_with_claude로 개별 분석합니다.
 
-    print(f"[Analyzer] Claude Code CLI 분석 요청: {test['name']}")
+    Args:
+        batch: [(test, article_a, article_b, metrics_a, metrics_b), ...]
 
-    # Claude Code CLI 호출 (headless mode)
-    try:
-        result = subprocess.run(
-            [
-                "claude",
-                "-p", full_prompt,
-                "--output-format", "json"
-            ],
-            capture_output=True,
-            text=True,
-            timeout=120,  # 2분 타임아웃
-            env={**os.environ, "CLAUDE_CODE_OAUTH_TOKEN": CLAUDE_OAUTH_TOKEN}
-        )
+    Returns:
+        List: 테스트 순서대로 분석 결과 Dict 또는 실패 시 Exception
+    """
+    def analyze_single(item: tuple) -> Any:
+        try:
+            return analyze_with_claude(*item, use_cache)
+        except Exception as e:
+            return e
 
-        if result.returncode != 0:
-            error_msg = result.stderr or result.stdout
-            raise RuntimeError(f"Claude CLI 실행 실패: {error_msg}")
+    if len(batch) == 1:
+        return [analyze_single(batch[0])]
 
-        # Claude CLI JSON 응답 파싱
-        cli_response = json.loads(result.stdout)
-        response_text = cli_response.get("result", "")
+    if not CLAUDE_OAUTH_TOKEN:
+        raise ValueError("CLAUDE_CODE_OAUTH_TOKEN 환경 변수가 설정되지 않았습니다. "
+                        "로컬에서 'claude setup-token' 명령어로 토큰을 생성하세요.")
 
-        print(f"[Analyzer] Claude 응답 길이: {len(response_text)}")
+    keys = [f"T{i}" for i in range(1, len(batch) + 1)]
+    user_prompt = format_batch_analysis_prompt([
+        {"test_key": key, **_analysis_prompt_args(*item)}
+        for key, item in zip(keys, batch)
+    ])
 
-    except subprocess.TimeoutExpired:
-        raise RuntimeError("Claude CLI 타임아웃 (120초 초과)")
-    except json.JSONDecodeError as e:
-        print(f"[Analyzer] CLI 응답 파싱 오류: {e}")
-        print(f"[Analyzer] stdout: {result.stdout[:500]}")
-        raise RuntimeError(f"Claude CLI 응답 파싱 실패: {e}")
+    names = ", ".join(item[0]["name"] for item in batch)
+    print(f"[Analyzer] Claude Code CLI 일괄 분석 요청 ({len(batch)}건): {names}")
 
-    # 분석 결과 JSON 파싱
+    analyses = {}
     try:
-        # JSON 블록 추출
-        json_match = re.search(r'```json\s*([\s\S]*?)\s*```', response_text)
-        if json_match:
-            analysis = json.loads(json_match.group(1))
-        else:
-            # 직접 JSON 파싱 시도
-            json_match = re.search(r'\{[\s\S]*\}', response_text)
-            if json_match:
-                analysis = json.loads(json_match.group())
-            else:
-                raise ValueError("JSON 형식을 찾을 수 없습니다")
-    except json.JSONDecodeError as e:
-        print(f"[Analyzer] JSON 파싱 오류: {e}")
-        print(f"[Analyzer] 원본 응답: {response_text[:500]}")
-        raise ValueError(f"Claude 응답에서 JSON 추출 실패: {e}")
+        # 응답 길이가 테스트 수에 비례하므로 타임아웃도 늘림
+        response = run_claude_analysis(
+            ANALYSIS_SYSTEM_PROMPT, user_prompt, timeout=120 + 60 * (len(batch) - 1),
+            use_cache=use_cache, validate=validate_batch_analysis_response,
+        )
+        for analysis in response["analyses"]:
+            analyses.setdefault(analysis["test_key"], analysis)
+    except Exception as e:
+        print(f"[Analyzer] 일괄 분석 실패, 개별 분석으로 전환: {e}")
+
+    results = []
+    fallback_count = 0
+    for key, item in zip(keys, batch):
+        analysis = analyses.get(key)
+        if analysis is not None:
+            analysis = {k: v for k, v in analysis.items() if k != "test_key"}
+            try:
+                validate_analysis_response(analysis)
+                results.append(analysis)
+                continue
+            except ValueError as e:
+                print(f"[Analyzer] 일괄 분석 항목 형식 오류 ({item[0]['name']}): {e}")
+
+        fallback_count += 1
+        results.append(analyze_single(item))
 
-    return analysis
+    if fallback_count:
+        print(f"[Analyzer] 일괄 분석 {len(batch)}건 중 {fallback_count}건 개별 재분석")
+    return results
 
 
 # ============================================
@@ -531,12 +755,18 @@ def update_patterns(conn, analysis: Dict, test_id: str) -> int:
     """
     분석 결과에서 추출된 패턴을 DB에 저장/업데이트
 
+    패턴 수와 관계없이 INSERT ... ON CONFLICT 한 문장으로 처리합니다.
+    test_count / win_rate / avg_lift / confidence_level은 기존 값을 기준으로 SQL에서 계산하므로
+    여러 분석이 동시에 같은 패턴을 갱신해도 누락되지 않습니다.
+    신뢰도 기준: pattern_confidence_level() (010_pattern_confidence_function.sql)
+    표현만 다른 유사 패턴은 기존 패턴에 병합합니다 (pattern_dedup.py, 011_pattern_minhash_lsh.sql ~ 015_pattern_signature_name.sql).
+
     Returns:
         int: 업데이트된 패턴 수
     """
-    cursor = conn.cursor()
-    updated_count = 0
+    valid_categories = ["intro", "title", "structure", "faq", "visual", "meta", "other"]
 
+    cleaned = []
     for pattern in analysis.get("patterns", []):
         name = pattern.get("name", "").strip()
         category = pattern.get("category", "other").lower()
@@ -545,90 +775,84 @@ def update_patterns(conn, analysis: Dict, test_id: str) -> int:
             continue
 
         # 카테고리 유효성 검사
-        valid_categories = ["intro", "title", "structure", "faq", "visual", "meta", "other"]
         if category not in valid_categories:
             category = "other"
 
-        # 기존 패턴 확인
-        cursor.execute("""
-            SELECT id, test_count, win_count, avg_lift
-            FROM patterns
-            WHERE name = %s AND category = %s
-        """, (name, category))
-
-        existing = cursor.fetchone()
-
-        if existing:
-            # 기존 패턴 업데이트
-            pattern_id = str(existing[0])
-            test_count = int(existing[1]) + 1
-            win_count = int(existing[2]) + 1
-            old_avg_lift = float(existing[3]) if existing[3] else 0
-            new_avg_lift = (old_avg_lift * (test_count - 1) + analysis.get("lift", 0)) / test_count
-
-            win_rate = (win_count / test_count) * 100
-            confidence = determine_confidence_level(test_count, win_rate)
-
-            cursor.execute("""
-                UPDATE patterns
-                SET
-                    test_count = %s,
-                    win_count = %s,
-                    win_rate = %s,
-                    avg_lift = %s,
-                    confidence_level = %s,
-                    source_tests = array_append(source_tests, %s::UUID),
-                    updated_at = NOW()
-                WHERE id = %s
-            """, (test_count, win_count, win_rate, new_avg_lift, confidence, test_id, pattern_id))
+        cleaned.append({
+            "name": name,
+            "category": category,
+            "description": pattern.get("description", ""),
+            "prompt_instruction": pattern.get("prompt_instruction", ""),
+        })
 
-            print(f"[Analyzer] 패턴 업데이트: {name} (test_count={test_count}, confidence={confidence})")
-        else:
-            # 새 패턴 생성
-            cursor.execute("""
-                INSERT INTO patterns (
-                    name, category, description, prompt_instruction,
-                    confidence_level, test_count, win_count, win_rate, avg_lift,
-                    source_tests
-                ) VALUES (
-                    %s, %s, %s, %s,
-                    'EXPERIMENTAL', 1, 1, 100.0, %s,
-                    ARRAY[%s]::UUID[]
-                )
-            """, (
-                name,
-                category,
-                pattern.get("description", ""),
-                pattern.get("prompt_instruction", ""),
-                analysis.get("lift", 0),
-                test_id
-            ))
+    if not cleaned:
+        conn.commit()
+        return 0
 
-            print(f"[Analyzer] 새 패턴 생성: {name} ({category})")
+    # 유사 중복 병합 (MinHash + LSH) - 표현만 다른 패턴은 가장 가까운 기존 패턴 이름으로 저장
+    ensure_pattern_signatures(conn)
+    targets = find_merge_targets(conn, cleaned)
+
+    # (name, category) 기준 중복 제거 - ON CONFLICT는 한 문장에서 같은 행을 두 번 갱신할 수 없음
+    rows = {}
+    for pattern, (name, merged_into, similarity, signature, buckets) in zip(cleaned, targets):
+        if merged_into:
+            print(f"[Analyzer] 유사 패턴 병합: {pattern['name']} → {merged_into} (유사도 {similarity:.2f})")
+        rows.setdefault((name, pattern["category"]), (
+            pattern["description"],
+            pattern["prompt_instruction"],
+            array_literal(signature),
+            array_literal(buckets),
+        ))
 
-        updated_count += 1
+    names = [name for name, _ in rows]
+    categories = [category for _, category in rows]
+    descriptions = [row[0] for row in rows.values()]
+    instructions = [row[1] for row in rows.values()]
+    signatures = [row[2] for row in rows.values()]
+    buckets = [row[3] for row in rows.values()]
 
-    conn.commit()
-    return updated_count
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO patterns (
+            name, category, description, prompt_instruction,
+            confidence_level, test_count, win_count, win_rate, avg_lift,
+            source_tests, minhash_signature, lsh_buckets
+        )
+        SELECT
+            p.name, p.category, p.description, p.prompt_instruction,
+            pattern_confidence_level(1, 100.0), 1, 1, 100.0, %s::NUMERIC,
+            ARRAY[%s::UUID], p.signature::BIGINT[], p.buckets::BIGINT[]
+        FROM unnest(%s::TEXT[], %s::TEXT[], %s::TEXT[], %s::TEXT[], %s::TEXT[], %s::TEXT[])
+            AS p(name, category, description, prompt_instruction, signature, buckets)
+        ON CONFLICT (name, category) DO UPDATE
+        SET
+            test_count = COALESCE(patterns.test_count, 0) + 1,
+            win_count = COALESCE(patterns.win_count, 0) + 1,
+            win_rate = (COALESCE(patterns.win_count, 0) + 1) * 100.0 / (COALESCE(patterns.test_count, 0) + 1),
+            avg_lift = (COALESCE(patterns.avg_lift, 0) * COALESCE(patterns.test_count, 0) + EXCLUDED.avg_lift)
+                       / (COALESCE(patterns.test_count, 0) + 1),
+            confidence_level = pattern_confidence_level(
+                COALESCE(patterns.test_count, 0) + 1,
+                (COALESCE(patterns.win_count, 0) + 1) * 100.0 / (COALESCE(patterns.test_count, 0) + 1)
+            ),
+            source_tests = array_append(patterns.source_tests, EXCLUDED.source_tests[1]),
+            minhash_signature = COALESCE(patterns.minhash_signature, EXCLUDED.minhash_signature),
+            lsh_buckets = COALESCE(patterns.lsh_buckets, EXCLUDED.lsh_buckets),
+            updated_at = NOW()
+        RETURNING name, category, test_count, confidence_level, (xmax = 0) AS inserted
+    """, (analysis.get("lift", 0), test_id, names, categories, descriptions, instructions, signatures, buckets))
 
+    updated = cursor.fetchall()
+    conn.commit()
 
-def determine_confidence_level(test_count: int, win_rate: float) -> str:
-    """
-    패턴 신뢰도 레벨 결정 (PLANNING_v2.md 기준)
+    for name, category, test_count, confidence, inserted in updated:
+        if inserted:
+            print(f"[Analyzer] 새 패턴 생성: {name} ({category})")
+        else:
+            print(f"[Analyzer] 패턴 업데이트: {name} (test_count={test_count}, confidence={confidence})")
 
-    - EXPERIMENTAL: 1-2회 테스트
-    - LOW: 3-5회, 승률 55%+
-    - MEDIUM: 6-10회, 승률 60%+
-    - HIGH: 11회+, 승률 65%+
-    """
-    if test_count >= 11 and win_rate >= 65:
-        return "HIGH"
-    elif test_count >= 6 and win_rate >= 60:
-        return "MEDIUM"
-    elif test_count >= 3 and win_rate >= 55:
-        return "LOW"
-    else:
-        return "EXPERIMENTAL"
+    return len(updated)
 
 
 # ============================================
@@ -638,7 +862,8 @@ def determine_confidence_level(test_count: int, win_rate: float) -> str:
 def analyze_topic_experiment_with_claude(
     experiment: Dict,
     articles_by_pattern: Dict[str, List[Dict]],
-    rankings: Dict
+    rankings: Dict,
+    use_cache: bool = True,
 ) -> Dict:
     """
     Claude Code CLI를 사용하여 주제 패턴 실험 분석
@@ -651,69 +876,30 @@ def analyze_topic_experiment_with_claude(
     if not CLAUDE_OAUTH_TOKEN:
         raise ValueError("CLAUDE_CODE_OAUTH_TOKEN 환경 변수가 설정되지 않았습니다.")
 
-    # 프롬프트 구성
-    user_prompt = format_topic_experiment_prompt(
+    # 프롬프트 구성 (토큰 예산 초과 시 글 목록 축약)
+    rendered = render_topic_experiment_prompt(
         experiment_name=experiment["name"],
         description=experiment.get("description", ""),
         patterns_tested=experiment["patterns_tested"],
         articles_by_pattern=articles_by_pattern,
         rankings=rankings,
         primary_metric=experiment["primary_metric"],
+        token_budget=TOPIC_PROMPT_TOKEN_BUDGET,
+    )
+    user_prompt = rendered["prompt"]
+
+    print(f"[Analyzer] 주제 패턴 실험 분석 요청: {experiment['name']} "
+          f"(추정 {rendered['estimated_tokens']}/{TOPIC_PROMPT_TOKEN_BUDGET} 토큰, "
+          f"축약 단계 {rendered['compaction_level']}, "
+          f"글 {rendered['articles_shown']}/{rendered['articles_total']}개 표시)")
+    if not rendered["within_budget"]:
+        print("[Analyzer] 경고: 최대 축약 후에도 프롬프트가 토큰 예산을 초과합니다")
+
+    # 3분 타임아웃 (더 복잡한 분석)
+    return run_claude_analysis(
+        TOPIC_EXPERIMENT_SYSTEM_PROMPT, user_prompt, timeout=180, use_cache=use_cache,
+        validate=validate_topic_experiment_response,
     )
-
-    full_prompt = f"""{TOPIC_EXPERIMENT_SYSTEM_PROMPT}
-
----
-
-{user_prompt}"""
-
-    print(f"[Analyzer] 주제 패턴 실험 분석 요청: {experiment['name']}")
-
-    # Claude Code CLI 호출
-    try:
-        result = subprocess.run(
-            [
-                "claude",
-                "-p", full_prompt,
-                "--output-format", "json"
-            ],
-            capture_output=True,
-            text=True,
-            timeout=180,  # 3분 타임아웃 (더 복잡한 분석)
-            env={**os.environ, "CLAUDE_CODE_OAUTH_TOKEN": CLAUDE_OAUTH_TOKEN}
-        )
-
-        if result.returncode != 0:
-            error_msg = result.stderr or result.stdout
-            raise RuntimeError(f"Claude CLI 실행 실패: {error_msg}")
-
-        cli_response = json.loads(result.stdout)
-        response_text = cli_response.get("result", "")
-
-        print(f"[Analyzer] Claude 응답 길이: {len(response_text)}")
-
-    except subprocess.TimeoutExpired:
-        raise RuntimeError("Claude CLI 타임아웃 (180초 초과)")
-    except json.JSONDecodeError as e:
-        print(f"[Analyzer] CLI 응답 파싱 오류: {e}")
-        raise RuntimeError(f"Claude CLI 응답 파싱 실패: {e}")
-
-    # 분석 결과 JSON 파싱
-    try:
-        json_match = re.search(r'```json\s*([\s\S]*?)\s*```', response_text)
-        if json_match:
-            analysis = json.loads(json_match.group(1))
-        else:
-            json_match = re.search(r'\{[\s\S]*\}', response_text)
-            if json_match:
-                analysis = json.loads(json_match.group())
-            else:
-                raise ValueError("JSON 형식을 찾을 수 없습니다")
-    except json.JSONDecodeError as e:
-        print(f"[Analyzer] JSON 파싱 오류: {e}")
-        raise ValueError(f"Claude 응답에서 JSON 추출 실패: {e}")
-
-    return analysis
 
 
 def complete_topic_experiment(conn, experiment_id: str, rankings: Dict, analysis: Dict):
@@ -788,7 +974,6 @@ def update_topic_pattern_insights(conn, analysis: Dict, experiment_id: str):
         test_count = int(existing[1]) + 1
         win_count = int(existing[2]) + 1
         win_rate = (win_count / test_count) * 100
-        confidence = determine_confidence_level(test_count, win_rate)
 
         cursor.execute("""
             UPDATE patterns
@@ -796,11 +981,13 @@ def update_topic_pattern_insights(conn, analysis: Dict, experiment_id: str):
                 test_count = %s,
                 win_count = %s,
                 win_rate = %s,
-                confidence_level = %s,
+                confidence_level = pattern_confidence_level(%s, %s),
                 description = %s,
                 updated_at = NOW()
             WHERE id = %s
-        """, (test_count, win_count, win_rate, confidence, description, pattern_id))
+            RETURNING confidence_level
+        """, (test_count, win_count, win_rate, test_count, win_rate, description, pattern_id))
+        confidence = cursor.fetchone()[0]
 
         print(f"[Analyzer] 주제 패턴 업데이트: {pattern_name} (confidence={confidence})")
     else:
@@ -859,25 +1046,22 @@ def save_analysis_result(
 
 
 # ============================================
-# Flask 앱 (Cloud Run용)
+# 분석 작업 (백그라운드 실행)
 # ============================================
 
-app = Flask(__name__)
+def run_completed_tests_analysis(use_cache: bool = True, job: Optional[JobContext] = None) -> Dict:
+    """
+    완료된 A/B 테스트 분석 (SPEC-003)
 
+    job이 주어지면 분석 대상 수와 테스트별 결과를 처리되는 대로 작업 테이블에 기록합니다.
 
-@app.route("/", methods=["GET", "POST"])
-@app.route("/analyze", methods=["GET", "POST"])
-def analyze_completed_tests():
+    Returns:
+        Dict: 응답 요약 (status, analyzed_count, error_count, results)
     """
-    완료된 A/B 테스트를 분석하는 Cloud Run 엔드포인트
+    print("[Analyzer] 시작...")
 
-    SPEC-002 완료 후 호출되거나, Cloud Scheduler로 호출
-    """
+    conn = get_db_connection()
     try:
-        print("[Analyzer] 시작...")
-
-        conn = get_db_connection()
-
         # 1. 미분석 완료 테스트 조회
         completed_tests = get_unanalyzed_completed_tests(conn)
         print(f"[Analyzer] {len(completed_tests)}개 테스트 분석 대기")
@@ -889,56 +1073,87 @@ def analyze_completed_tests():
                 print(f"[Analyzer] 프롬프트 업데이트: {prompt_result}")
             except Exception as e:
                 print(f"[Analyzer] 프롬프트 업데이트 실패: {e}")
-            conn.close()
-            return json.dumps({
+            if job:
+                job.set_total(0)
+            return {
                 "status": "success",
                 "message": "분석할 테스트 없음",
                 "analyzed": []
-            }), 200
-
-        results = []
+            }
 
+        # 2~3. 글 내용 / 메트릭 일괄 조회 (테스트 수와 관계없이 쿼리 2개)
+        inputs = prefetch_test_inputs(conn, completed_tests)
+        prepared = []
         for test in completed_tests:
-            try:
-                # 2. 글 내용 조회
-                article_a = get_article_by_slug_version(conn, test["article_slug"], test["control_version"])
-                article_b = get_article_by_slug_version(conn, test["article_slug"], test["variant_version"])
-
-                if not article_a or not article_b:
-                    print(f"[Analyzer] 글 없음: {test['article_slug']} (A={bool(article_a)}, B={bool(article_b)})")
-                    continue
+            key_a = (test["article_slug"], test["control_version"])
+            key_b = (test["article_slug"], test["variant_version"])
+            article_a = inputs["articles"].get(key_a)
+            article_b = inputs["articles"].get(key_b)
 
-                # 3. 메트릭 조회
-                metrics_a = get_version_metrics(conn, test["article_slug"], test["control_version"])
-                metrics_b = get_version_metrics(conn, test["article_slug"], test["variant_version"])
+            if not article_a or not article_b:
+                print(f"[Analyzer] 글 없음: {test['article_slug']} (A={bool(article_a)}, B={bool(article_b)})")
+                continue
 
-                # 4. Claude 분석
-                analysis = analyze_with_claude(test, article_a, article_b, metrics_a, metrics_b)
+            prepared.append((test, article_a, article_b, inputs["metrics"][key_a], inputs["metrics"][key_b]))
 
-                # 5. 패턴 업데이트
-                pattern_count = update_patterns(conn, analysis, test["id"])
+        if job:
+            job.set_total(len(prepared))
 
-                # 6. 분석 결과 저장
-                save_analysis_result(
-                    conn, test["article_slug"], test["winner_version"],
-                    test["id"], metrics_a, analysis
-                )
-
-                results.append({
-                    "test_id": test["id"],
-                    "test_name": test["name"],
-                    "winner": test["winner_version"],
-                    "patterns_found": pattern_count,
-                    "summary": analysis.get("summary", ""),
-                })
+        results = []
 
-            except Exception as e:
-                print(f"[Analyzer] 테스트 분석 실패 ({test['name']}): {e}")
-                results.append({
-                    "test_id": test["id"],
-                    "test_name": test["name"],
-                    "error": str(e),
-                })
+        def record(result: Dict):
+            results.append(result)
+            if job:
+                job.add_result(result)
+
+        # 4. Claude 분석 - CLAUDE_ANALYSIS_BATCH_SIZE건씩 묶어 최대 CLAUDE_MAX_CONCURRENCY개 동시 실행
+        #    전체 소요 시간은 분석 시간의 합이 아니라 가장 느린 분석에 가까워짐
+        #    묶음 크기는 동시 실행 슬롯을 모두 쓰도록 테스트 수에 맞춰 줄임 (최대 CLAUDE_ANALYSIS_BATCH_SIZE)
+        batch_size = min(CLAUDE_ANALYSIS_BATCH_SIZE, max(1, -(-len(prepared) // CLAUDE_MAX_CONCURRENCY)))
+        batches = [prepared[i:i + batch_size] for i in range(0, len(prepared), batch_size)]
+        workers = min(CLAUDE_MAX_CONCURRENCY, max(1, len(batches)))
+        print(f"[Analyzer] Claude 분석 {len(prepared)}건 ({len(batches)}회 호출, 동시 {workers}개)")
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(analyze_tests_batch_with_claude, batch, use_cache) for batch in batches]
+
+            # 5~6. 결과는 테스트 순서대로 모으고, DB 쓰기는 이 스레드에서만 순차 처리
+            for batch, future in zip(batches, futures):
+                try:
+                    outcomes = future.result()
+                except Exception as e:
+                    outcomes = [e] * len(batch)
+
+                for (test, _, _, metrics_a, _), outcome in zip(batch, outcomes):
+                    try:
+                        if isinstance(outcome, Exception):
+                            raise outcome
+                        analysis = outcome
+
+                        # 5. 패턴 업데이트
+                        pattern_count = update_patterns(conn, analysis, test["id"])
+
+                        # 6. 분석 결과 저장
+                        save_analysis_result(
+                            conn, test["article_slug"], test["winner_version"],
+                            test["id"], metrics_a, analysis
+                        )
+
+                        record({
+                            "test_id": test["id"],
+                            "test_name": test["name"],
+                            "winner": test["winner_version"],
+                            "patterns_found": pattern_count,
+                            "summary": analysis.get("summary", ""),
+                        })
+
+                    except Exception as e:
+                        print(f"[Analyzer] 테스트 분석 실패 ({test['name']}): {e}")
+                        record({
+                            "test_id": test["id"],
+                            "test_name": test["name"],
+                            "error": str(e),
+                        })
 
         # 7. SPEC-004: 프롬프트 자동 업데이트
         try:
@@ -947,65 +1162,52 @@ def analyze_completed_tests():
         except Exception as e:
             print(f"[Analyzer] 프롬프트 업데이트 실패: {e}")
 
-        conn.close()
-
-        return json.dumps({
+        return {
             "status": "success",
             "analyzed_count": len([r for r in results if "error" not in r]),
             "error_count": len([r for r in results if "error" in r]),
-            "results": results
-        }), 200
-
-    except Exception as e:
-        import traceback
-        error_msg = f"[Analyzer] 오류: {str(e)}"
-        print(error_msg)
-        print(traceback.format_exc())
-        return json.dumps({"status": "error", "message": str(e)}), 500
-
-
-# ============================================
-# 헬스체크 엔드포인트
-# ============================================
-
-@app.route("/health", methods=["GET"])
-def health_check():
-    """Cloud Run 헬스체크"""
-    return jsonify({"status": "healthy", "service": "content-analyzer"}), 200
+            "results": results,
+            "llm_cache": llm_cache.stats(),
+        }
 
+    finally:
+        conn.close()
 
-# ============================================
-# SPEC-006: 주제 패턴 실험 엔드포인트
-# ============================================
 
-@app.route("/analyze-experiments", methods=["GET", "POST"])
-def analyze_topic_experiments():
+def run_topic_experiments_analysis(use_cache: bool = True, job: Optional[JobContext] = None) -> Dict:
     """
-    완료된 주제 패턴 실험을 분석하는 엔드포인트
+    완료 대기 중인 주제 패턴 실험 분석 (SPEC-006)
 
-    SPEC-006: 다른 주제/카테고리를 비교하여 어떤 패턴이 가장 효과적인지 평가
+    job이 주어지면 분석 대상 수와 실험별 결과를 처리되는 대로 작업 테이블에 기록합니다.
 
-    기존 /analyze와 병행 실행됨 (Cloud Scheduler에서 둘 다 호출 가능)
+    Returns:
+        Dict: 응답 요약 (status, analyzed_count, error_count, results)
     """
-    try:
-        print("[Analyzer] 주제 패턴 실험 분석 시작...")
-
-        conn = get_db_connection()
+    print("[Analyzer] 주제 패턴 실험 분석 시작...")
 
+    conn = get_db_connection()
+    try:
         # 1. 완료 대기 중인 실험 조회
         experiments = get_running_topic_experiments(conn)
         print(f"[Analyzer] {len(experiments)}개 실험 분석 대기")
 
+        if job:
+            job.set_total(len(experiments))
+
         if len(experiments) == 0:
-            conn.close()
-            return json.dumps({
+            return {
                 "status": "success",
                 "message": "분석할 주제 패턴 실험 없음",
                 "analyzed": []
-            }), 200
+            }
 
         results = []
 
+        def record(result: Dict):
+            results.append(result)
+            if job:
+                job.add_result(result)
+
         for experiment in experiments:
             try:
                 # 2. 실험 글들의 메트릭 업데이트
@@ -1016,6 +1218,11 @@ def analyze_topic_experiments():
 
                 if not articles_by_pattern:
                     print(f"[Analyzer] 실험 {experiment['name']}: 글 없음")
+                    record({
+                        "experiment_id": experiment["id"],
+                        "experiment_name": experiment["name"],
+                        "skipped": "글 없음",
+                    })
                     continue
 
                 # 4. 패턴별 순위 계산
@@ -1028,7 +1235,8 @@ def analyze_topic_experiments():
                 analysis = analyze_topic_experiment_with_claude(
                     experiment,
                     articles_by_pattern,
-                    rankings
+                    rankings,
+                    use_cache=use_cache,
                 )
 
                 # 6. 실험 완료 처리
@@ -1037,7 +1245,7 @@ def analyze_topic_experiments():
                 # 7. 주제 패턴 인사이트 저장
                 update_topic_pattern_insights(conn, analysis, experiment["id"])
 
-                results.append({
+                record({
                     "experiment_id": experiment["id"],
                     "experiment_name": experiment["name"],
                     "winner_pattern": rankings.get("winner"),
@@ -1050,7 +1258,7 @@ def analyze_topic_experiments():
                 print(f"[Analyzer] 실험 분석 실패 ({experiment['name']}): {e}")
                 import traceback
                 print(traceback.format_exc())
-                results.append({
+                record({
                     "experiment_id": experiment["id"],
                     "experiment_name": experiment["name"],
                     "error": str(e),
@@ -1063,21 +1271,132 @@ def analyze_topic_experiments():
         except Exception as e:
             print(f"[Analyzer] 프롬프트 업데이트 실패: {e}")
 
-        conn.close()
-
-        return json.dumps({
+        return {
             "status": "success",
-            "analyzed_count": len([r for r in results if "error" not in r]),
+            "analyzed_count": len([r for r in results if "error" not in r and "skipped" not in r]),
             "error_count": len([r for r in results if "error" in r]),
-            "results": results
-        }), 200
+            "results": results,
+            "llm_cache": llm_cache.stats(),
+        }
+
+    finally:
+        conn.close()
+
+
+# ============================================
+# Flask 앱 (Cloud Run용)
+# ============================================
+
+app = Flask(__name__)
+
+# 서버 시작 시 Claude 워커를 미리 띄워 첫 분석도 CLI 기동 비용 없이 처리
+if get_claude_worker_pool():
+    get_claude_worker_pool().prewarm()
+
+# 분석 작업 백그라운드 실행기
+job_runner = JobRunner(get_db_connection)
+
+
+def _start_analysis_job(job_type: str, run: Callable[..., Dict]):
+    """
+    분석 작업 등록 후 202 + job id 반환
 
+    - ?no_cache=true: 캐시된 Claude 응답 무시
+    - ?sync=true: 작업을 등록하지 않고 요청 안에서 실행 (로컬 디버깅용, 기존 동작)
+    """
+    use_cache = request.args.get("no_cache", "false").lower() != "true"
+
+    if request.args.get("sync", "false").lower() == "true":
+        try:
+            return json.dumps(run(use_cache=use_cache)), 200
+        except Exception as e:
+            import traceback
+            print(f"[Analyzer] 오류: {str(e)}")
+            print(traceback.format_exc())
+            return json.dumps({"status": "error", "message": str(e)}), 500
+
+    try:
+        job_id, created = job_runner.submit(
+            job_type,
+            {"no_cache": not use_cache},
+            lambda job: run(use_cache=use_cache, job=job),
+        )
     except Exception as e:
-        import traceback
-        error_msg = f"[Analyzer] 주제 패턴 실험 분석 오류: {str(e)}"
-        print(error_msg)
-        print(traceback.format_exc())
-        return json.dumps({"status": "error", "message": str(e)}), 500
+        print(f"[Analyzer] 작업 등록 실패 ({job_type}): {e}")
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+    if not created:
+        print(f"[Analyzer] 이미 진행 중인 작업 반환: {job_type} ({job_id})")
+
+    return jsonify({
+        "status": "accepted",
+        "job_id": job_id,
+        "created": created,  # False면 이미 대기/실행 중인 같은 종류의 작업
+        "status_url": f"/jobs/{job_id}",
+    }), 202
+
+
+@app.route("/", methods=["GET", "POST"])
+@app.route("/analyze", methods=["GET", "POST"])
+def analyze_completed_tests():
+    """
+    완료된 A/B 테스트 분석 작업 시작
+
+    SPEC-002 완료 후 호출되거나, Cloud Scheduler로 호출
+    즉시 202 + job id를 반환하고 분석은 백그라운드에서 진행 (GET /jobs/<id>로 확인)
+    """
+    return _start_analysis_job("analyze_tests", run_completed_tests_analysis)
+
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def get_analysis_job(job_id: str):
+    """분석 작업 상태 / 진행 상황 / 항목별 결과 조회"""
+    try:
+        conn = get_db_connection()
+        try:
+            job = get_job(conn, job_id)
+        finally:
+            conn.close()
+    except Exception as e:
+        print(f"[Analyzer] 작업 조회 오류: {e}")
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+    if not job:
+        return jsonify({"status": "error", "message": "작업을 찾을 수 없습니다"}), 404
+    return jsonify(job), 200
+
+
+# ============================================
+# 헬스체크 엔드포인트
+# ============================================
+
+@app.route("/health", methods=["GET"])
+def health_check():
+    """Cloud Run 헬스체크 (LLM 캐시 hit/miss, 절약한 CLI 시간, DB 연결 풀 대기 시간 포함)"""
+    return jsonify({
+        "status": "healthy",
+        "service": "content-analyzer",
+        "llm_cache": llm_cache.stats(),
+        "llm_workers": _claude_worker_pool.stats() if _claude_worker_pool else None,
+        "db_pool": db_pool.stats(),
+    }), 200
+
+
+# ============================================
+# SPEC-006: 주제 패턴 실험 엔드포인트
+# ============================================
+
+@app.route("/analyze-experiments", methods=["GET", "POST"])
+def analyze_topic_experiments():
+    """
+    완료된 주제 패턴 실험 분석 작업 시작
+
+    SPEC-006: 다른 주제/카테고리를 비교하여 어떤 패턴이 가장 효과적인지 평가
+
+    기존 /analyze와 병행 실행됨 (Cloud Scheduler에서 둘 다 호출 가능)
+    즉시 202 + job id를 반환하고 분석은 백그라운드에서 진행 (GET /jobs/<id>로 확인)
+    """
+    return _start_analysis_job("analyze_experiments", run_topic_experiments_analysis)
 
 
 @app.route("/create-experiment", methods=["POST"])
@@ -1099,6 +1418,7 @@ def create_topic_experiment():
         }
     }
     """
+    conn = None
     try:
         data = request.get_json()
 
@@ -1147,7 +1467,6 @@ def create_topic_experiment():
                 article_count += 1
 
         conn.commit()
-        conn.close()
 
         return jsonify({
             "status": "success",
@@ -1163,6 +1482,10 @@ def create_topic_experiment():
         print(traceback.format_exc())
         return jsonify({"status": "error", "message": str(e)}), 500
 
+    finally:
+        if conn:
+            conn.close()
+
 
 # ============================================
 # 메인 (Cloud Run / 로컬 실행)
@@ -0,0 +1,182 @@
+"""
+SPEC-006: 주제 패턴 성과 부트스트랩
+
+패턴별 글 성과를 pageview 가중 평균으로 집계하고, 부트스트랩 재표본으로
+- 패턴별 신뢰구간
+- 각 패턴이 최고일 확률 (prob_best)
+을 계산합니다.
+
+글이 충분한 패턴은 Poisson 부트스트랩을 씁니다. 재표본마다 글별 가중치 Poisson(1)을 뽑아
+(난수 1바이트 → 256단계로 양자화한 Poisson(1) 역CDF 표) 재표본 × 글 가중치 행렬을 만들고,
+분자/분모 합은 행렬 곱 한 번(가중치 행렬 @ [값×pageviews, pageviews])으로 구합니다.
+복원 추출의 인덱스 생성 + 두 번의 gather보다 난수와 메모리 이동이 적습니다.
+글이 적은 패턴은 가중치가 모두 0인 재표본이 생기므로 기존처럼 복원 추출합니다.
+메모리를 제한하기 위해 재표본은 BOOTSTRAP_CHUNK_CELLS 크기 단위로 나눠 처리합니다.
+
+python pattern_bootstrap.py 로 BOOTSTRAP_TIMING_CASES의 실행 시간을 확인합니다.
+"""
+
+import os
+import sys
+import math
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+# ============================================
+# 설정
+# ============================================
+
+BOOTSTRAP_RESAMPLES = int(os.environ.get("BOOTSTRAP_RESAMPLES", "10000"))
+BOOTSTRAP_CONFIDENCE = 0.95
+
+# 한 번에 만드는 재표본 가중치 행렬 크기 상한 (재표본 수 × 글 수)
+# 행렬이 CPU 캐시에 들어가는 크기일 때 가장 빠름
+BOOTSTRAP_CHUNK_CELLS = 100_000
+
+# 이보다 글이 적은 패턴은 복원 추출 (Poisson 가중치가 모두 0일 확률 0.37^n - 20개면 약 2e-9)
+POISSON_MIN_ARTICLES = 20
+
+# 실행 시간 확인 (글 수, 패턴 수, 재표본 수, 상한 초) - 1 vCPU 기준
+# 측정값 (taskset -c 0, 12패턴, 10,000회): 5,000글 약 0.21초, 10,000글 약 0.41초
+BOOTSTRAP_TIMING_CASES = [
+    (5_000, 12, 10_000, 0.5),
+    (10_000, 12, 10_000, 1.0),
+]
+
+
+def _poisson_weight_table(levels: int = 256) -> np.ndarray:
+    """난수 바이트(0~255) → Poisson(1) 가중치 표 (역CDF를 levels단계로 양자화, 평균/분산 약 1.004)"""
+    cdf = np.cumsum([math.exp(-1) / math.factorial(k) for k in range(12)])
+    return np.searchsorted(cdf, (np.arange(levels) + 0.5) / levels).astype(np.float32)
+
+
+_POISSON_WEIGHTS = _poisson_weight_table()
+
+
+def _resample_means(
+    rng: np.random.Generator,
+    weighted_values: np.ndarray,
+    weights: np.ndarray,
+    n_resamples: int,
+) -> np.ndarray:
+    """패턴 하나의 재표본별 가중 평균 (n_resamples개, 가중치가 모두 0인 재표본은 NaN)"""
+    n = len(weights)
+    chunk = max(1, BOOTSTRAP_CHUNK_CELLS // n)
+    means = np.empty(n_resamples)
+
+    if n < POISSON_MIN_ARTICLES:
+        for start in range(0, n_resamples, chunk):
+            rows = min(chunk, n_resamples - start)
+            idx = rng.integers(0, n, size=(rows, n))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                means[start:start + rows] = weighted_values[idx].sum(axis=1) / weights[idx].sum(axis=1)
+        return means
+
+    # 열 0: 분자 (값 × pageviews), 열 1: 분모 (pageviews)
+    columns = np.stack([weighted_values, weights], axis=1).astype(np.float32)
+    counts = np.empty((chunk, n), dtype=np.float32)
+
+    for start in range(0, n_resamples, chunk):
+        rows = min(chunk, n_resamples - start)
+        draws = np.frombuffer(rng.bytes(rows * n), dtype=np.uint8).reshape(rows, n)
+        _POISSON_WEIGHTS.take(draws, out=counts[:rows])
+
+        sums = counts[:rows] @ columns
+        with np.errstate(divide="ignore", invalid="ignore"):
+            means[start:start + rows] = sums[:, 0] / sums[:, 1]
+
+    return means
+
+
+def bootstrap_pattern_means(
+    values_by_pattern: Dict[str, List[float]],
+    weights_by_pattern: Optional[Dict[str, List[float]]] = None,
+    higher_is_better: bool = True,
+    n_resamples: int = BOOTSTRAP_RESAMPLES,
+    confidence: float = BOOTSTRAP_CONFIDENCE,
+    seed: Optional[int] = None,
+) -> Dict[str, Dict]:
+    """
+    패턴별 가중 평균의 부트스트랩 신뢰구간 + 최고 패턴 확률
+
+    Args:
+        values_by_pattern: 패턴별 글 지표 값
+        weights_by_pattern: 패턴별 글 가중치 (pageviews). 패턴 가중치 합이 0이면 동일 가중치
+        higher_is_better: False면 낮을수록 좋은 지표 (이탈률)
+        n_resamples: 재표본 수
+        confidence: 신뢰수준
+        seed: 난수 시드 (재현용)
+
+    Returns:
+        Dict[pattern, {weighted_mean, ci_low, ci_high, prob_best}]
+    """
+    patterns = [p for p, values in values_by_pattern.items() if len(values)]
+    if not patterns:
+        return {}
+
+    rng = np.random.default_rng(seed)
+    point_estimates = []
+    means = np.empty((n_resamples, len(patterns)))
+
+    for i, pattern in enumerate(patterns):
+        values = np.asarray(values_by_pattern[pattern], dtype=np.float64)
+        weights = np.asarray(
+            (weights_by_pattern or {}).get(pattern, np.ones(len(values))), dtype=np.float64
+        )
+        if weights.sum() <= 0:
+            weights = np.ones(len(values))
+
+        weighted_values = values * weights
+        point_estimates.append(weighted_values.sum() / weights.sum())
+        means[:, i] = _resample_means(rng, weighted_values, weights, n_resamples)
+
+    # 재표본에서 가중치가 모두 0인 경우(NaN)는 동률로 보고 최하위 처리
+    scored = np.where(np.isnan(means), -np.inf, means if higher_is_better else -means)
+    best_counts = np.bincount(scored.argmax(axis=1), minlength=len(patterns))
+
+    alpha = (1 - confidence) / 2
+    ci_low, ci_high = np.nanquantile(means, [alpha, 1 - alpha], axis=0)
+
+    result = {}
+    for i, pattern in enumerate(patterns):
+        result[pattern] = {
+            "weighted_mean": round(float(point_estimates[i]), 2),
+            "ci_low": round(float(ci_low[i]), 2),
+            "ci_high": round(float(ci_high[i]), 2),
+            "prob_best": round(float(best_counts[i] / n_resamples), 4),
+        }
+
+    return result
+
+
+# ============================================
+# 실행 시간 확인 (python pattern_bootstrap.py)
+# ============================================
+
+def check_timing() -> bool:
+    """BOOTSTRAP_TIMING_CASES를 합성 데이터로 실행해 상한 안에 끝나는지 확인 (3회 중 최솟값)"""
+    ok = True
+    for n_articles, n_patterns, n_resamples, limit in BOOTSTRAP_TIMING_CASES:
+        rng = np.random.default_rng(1)
+        assignments = rng.integers(0, n_patterns, n_articles)
+        values = {f"p{k}": rng.normal(50, 15, (assignments == k).sum()).tolist() for k in range(n_patterns)}
+        weights = {f"p{k}": rng.integers(1, 500, (assignments == k).sum()).tolist() for k in range(n_patterns)}
+
+        elapsed = []
+        for _ in range(3):
+            start = time.perf_counter()
+            bootstrap_pattern_means(values, weights, n_resamples=n_resamples, seed=0)
+            elapsed.append(time.perf_counter() - start)
+
+        passed = min(elapsed) <= limit
+        ok = ok and passed
+        print(f"{'OK  ' if passed else 'FAIL'} {n_articles:,}글 × {n_patterns}패턴 × {n_resamples:,}회: "
+              f"{min(elapsed):.3f}초 (상한 {limit}초)")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if check_timing() else 1)
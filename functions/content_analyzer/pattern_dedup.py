@@ -0,0 +1,460 @@
+"""
+패턴 유사 중복 병합 (MinHash + LSH)
+
+Claude는 같은 패턴을 매번 조금씩 다른 이름으로 돌려줍니다
+("질문형 도입부", "질문으로 시작하는 도입부" ...). (name, category) 완전 일치로만 묶으면
+각각 test_count=1인 행이 쌓여 MEDIUM/HIGH에 도달하지 못하고, 프롬프트 지침 목록만 길어집니다.
+
+- 텍스트를 어절로 나누고, 어절 끝의 조사/어미("질문으로" → "질문", "시작하는" → "시작")를
+  떼어 낸 뒤 어절 안의 음절 bigram으로 분해
+  (한국어는 같은 뜻도 조사/어미가 달라져 단어 단위 비교가 어렵고,
+   어절 경계를 넘는 bigram("으로시", "는도")은 문장 틀만 같은 다른 패턴끼리 겹치게 만듦)
+- 거의 모든 패턴 설명에 나오는 틀 단어(TEMPLATE_WORDS: "시작", "도입부", "첫 문장", "독자" ...)는 제외
+  ("질문으로 시작하는 도입부" / "통계로 시작하는 도입부"처럼 핵심어만 다른 패턴이 틀 단어 때문에 가까워짐)
+- 유사도는 이름 핵심어 Jaccard와 전체 텍스트(name + description + prompt_instruction) Jaccard의
+  가중 평균 (이름이 패턴의 핵심 개념을 가장 짧게 담고 있음)
+- 이름 핵심어의 MinHash 서명(MINHASH_PERMUTATIONS개)을 LSH_BANDS개 밴드로 나눈 버킷 해시를
+  patterns.lsh_buckets에 저장하고 GIN 인덱스의 배열 겹침(&&)으로 후보만 조회
+  → 이름 핵심어가 하나도 겹치지 않는 패턴은 후보가 되지 않으므로 패턴 수가 늘어도 전체를 비교하지 않음
+- 병합 판단은 후보의 텍스트로 다시 만든 n-gram 집합으로 정확히 계산한 유사도로 합니다
+  (서명 추정치는 ±0.05 정도 흔들려 경계 부근의 같은/다른 패턴을 가르지 못함)
+- 후보 중 유사도가 PATTERN_MERGE_THRESHOLD 이상인 가장 가까운 패턴에 병합
+"""
+
+import os
+import re
+import sys
+import hashlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+# ============================================
+# 설정
+# ============================================
+
+SHINGLE_SIZE = 2
+MINHASH_PERMUTATIONS = 96
+# 이름 핵심어 Jaccard 기준 밴드당 3행 → 후보가 될 확률 1.0: 100%, 0.5: 98.6%, 0.33: 69%, 0.1: 3%, 0.05: 0.4%
+# 병합되려면 이름 유사도가 대략 0.5 이상이어야 하므로(아래 임계값) 놓치는 병합이 거의 없고,
+# 이름 핵심어가 겹치지 않는(0) 대부분의 패턴은 후보가 되지 않음
+LSH_BANDS = 32
+
+# 이 이상이면 같은 패턴으로 병합 (PATTERN_NAME_WEIGHT·이름 Jaccard + 나머지·전체 텍스트 Jaccard)
+# CALIBRATION_PAIRS 기준 (python pattern_dedup.py check로 확인):
+# 표현만 다른 같은 패턴은 0.41~0.63 (예: "질문형 도입부" / "질문으로 시작하는 도입부" 0.63),
+# 같은 카테고리의 다른 패턴은 0.05 이하 ("통계로 시작하는" / "질문으로 시작하는" 도입부 0.05)
+PATTERN_MERGE_THRESHOLD = float(os.environ.get("PATTERN_MERGE_THRESHOLD", "0.3"))
+PATTERN_NAME_WEIGHT = 0.5
+
+# 어절 끝에서 떼어 낼 조사/어미 (긴 것부터 한 번만, 떼고 남는 어간이 2음절 이상일 때만)
+KOREAN_SUFFIXES = sorted("""
+    을 를 이 가 은 는 의 에 에서 에게 으로 로 와 과 도 만 으면 면 고 게 어 아 다
+    하는 하면 하세요 합니다 한다 하고 해서 하여 해 하게 이다 입니다 된다 든다 진다 난다 세요 적 형 한
+""".split(), key=len, reverse=True)
+
+# 패턴 설명의 틀 단어 (어절 또는 조사/어미를 뗀 어간 기준) - 위치/대상/지시/결과 표현이라
+# 서로 다른 패턴도 거의 항상 공유하므로 유사도에서 제외
+TEMPLATE_WORDS = frozenset("""
+    시작 도입부 첫 문장 문단 글 글의 본문 제목 섹션 마지막 독자
+    작성 사용 포함 넣으 형태 이탈 줄어든 높아진 높아 오른 끌어 클릭률
+""".split())
+
+_HASH_PRIME = np.uint64(4294967311)  # 2^32보다 큰 소수 - a*x+b가 uint64 범위 안
+_rng = np.random.RandomState(20241221)  # 고정 시드 - 저장된 서명과 항상 같은 해시 함수
+_PERM_A = _rng.randint(1, 2 ** 31, size=MINHASH_PERMUTATIONS, dtype=np.int64).astype(np.uint64)
+_PERM_B = _rng.randint(0, 2 ** 31, size=MINHASH_PERMUTATIONS, dtype=np.int64).astype(np.uint64)
+
+_WORD_SPLIT_RE = re.compile(r'[\s\W_]+', re.UNICODE)
+
+
+# ============================================
+# 서명
+# ============================================
+
+def pattern_text(pattern: Dict) -> str:
+    """유사도 비교에 쓰는 패턴 텍스트"""
+    return " ".join([
+        pattern.get("name") or "",
+        pattern.get("description") or "",
+        pattern.get("prompt_instruction") or "",
+    ])
+
+
+def strip_suffix(word: str) -> str:
+    """어절 끝 조사/어미 하나 제거 ("도입부를" → "도입부", "시작하는" → "시작")"""
+    for suffix in KOREAN_SUFFIXES:
+        if len(word) > len(suffix) + 1 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set:
+    """
+    어절별(조사/어미 제거) 소문자 문자 n-gram 집합 - size보다 짧은 어절은 그대로 포함
+
+    TEMPLATE_WORDS는 제외합니다. 틀 단어만으로 된 텍스트("첫 문장")는 틀 단어 n-gram을 그대로 씁니다.
+    """
+    grams, template_grams = set(), set()
+    for word in _WORD_SPLIT_RE.split(text.lower()):
+        if not word:
+            continue
+        stem = strip_suffix(word)
+        target = template_grams if word in TEMPLATE_WORDS or stem in TEMPLATE_WORDS else grams
+        if len(stem) <= size:
+            target.add(stem)
+        else:
+            target.update(stem[i:i + size] for i in range(len(stem) - size + 1))
+    return grams or template_grams
+
+
+def pattern_shingles(pattern: Dict) -> Tuple[set, set]:
+    """(이름 n-gram, 전체 텍스트 n-gram)"""
+    return shingles(pattern.get("name") or ""), shingles(pattern_text(pattern))
+
+
+def pattern_signature(pattern: Dict) -> List[int]:
+    """LSH용 서명 - 이름 핵심어 기준 (유사도에서 이름 비중이 가장 커서 후보 조회도 이름으로 함)"""
+    return minhash_signature(pattern.get("name") or "")
+
+
+def minhash_signature(text: str) -> List[int]:
+    """MinHash 서명 (MINHASH_PERMUTATIONS개 정수)"""
+    grams = shingles(text)
+    if not grams:
+        return [int(_HASH_PRIME)] * MINHASH_PERMUTATIONS
+
+    # 프로세스마다 달라지는 hash() 대신 고정 해시 (서명을 DB에 저장하므로)
+    hashes = np.array(
+        [int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=4).digest(), "little") for g in grams],
+        dtype=np.uint64,
+    )
+    permuted = (np.outer(hashes, _PERM_A) + _PERM_B) % _HASH_PRIME
+    return permuted.min(axis=0).astype(np.int64).tolist()
+
+
+def lsh_buckets(signature: List[int]) -> List[int]:
+    """밴드별 버킷 해시 (BIGINT) - 같은 밴드가 완전히 같은 패턴끼리만 버킷을 공유"""
+    rows = len(signature) // LSH_BANDS
+    buckets = []
+    for band in range(LSH_BANDS):
+        values = signature[band * rows:(band + 1) * rows]
+        digest = hashlib.blake2b(
+            band.to_bytes(2, "little") + b"".join(v.to_bytes(8, "little") for v in values),
+            digest_size=8,
+        ).digest()
+        buckets.append(int.from_bytes(digest, "little", signed=True))
+    return buckets
+
+
+def array_literal(values: List[int]) -> str:
+    """BIGINT[] 리터럴 - unnest는 2차원 배열을 원소 단위로 펼치므로 행마다 문자열로 넘겨 SQL에서 변환"""
+    return "{" + ",".join(map(str, values)) + "}"
+
+
+def jaccard(a: set, b: set) -> float:
+    """두 n-gram 집합의 Jaccard 유사도"""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def pattern_similarity(a: Tuple[set, set], b: Tuple[set, set]) -> float:
+    """pattern_shingles 두 개의 유사도 (이름 Jaccard와 전체 텍스트 Jaccard의 가중 평균)"""
+    return PATTERN_NAME_WEIGHT * jaccard(a[0], b[0]) + (1 - PATTERN_NAME_WEIGHT) * jaccard(a[1], b[1])
+
+
+# ============================================
+# 병합 대상 찾기
+# ============================================
+
+def find_merge_targets(
+    conn,
+    patterns: List[Dict],
+    threshold: float = PATTERN_MERGE_THRESHOLD,
+) -> List[Tuple[str, Optional[str], float, List[int], List[int]]]:
+    """
+    새로 추출된 패턴마다 병합할 기존 패턴(또는 같은 배치 안의 앞선 패턴) 찾기
+
+    같은 카테고리 안에서만 병합하고, 이름이 완전히 같은 패턴이 있으면 그대로 둡니다.
+    후보 조회는 쿼리 1개 (patterns.lsh_buckets && 새 패턴들의 버킷 - GIN 인덱스)이고,
+    버킷이 겹친 후보만 pattern_similarity로 비교합니다.
+
+    Args:
+        patterns: [{"name", "category", "description", "prompt_instruction"}, ...]
+
+    Returns:
+        List: 패턴 순서대로 (저장할 이름, 병합 대상 이름 또는 None, 유사도, 서명, 버킷)
+              병합 대상이 있으면 저장할 이름 = 병합 대상 이름
+    """
+    grams = [pattern_shingles(p) for p in patterns]
+    signatures = [pattern_signature(p) for p in patterns]
+    buckets = [lsh_buckets(sig) for sig in signatures]
+
+    candidates: Dict[str, List[Tuple[str, Tuple[set, set], set]]] = {}
+    if patterns:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT name, category, description, prompt_instruction, lsh_buckets
+            FROM patterns
+            WHERE is_active = true
+              AND category = ANY(%s::TEXT[])
+              AND (lsh_buckets && %s::BIGINT[] OR name = ANY(%s::TEXT[]))
+        """, (
+            sorted({p["category"] for p in patterns}),
+            sorted({b for bucket_list in buckets for b in bucket_list}),
+            sorted({p["name"] for p in patterns}),
+        ))
+        for name, category, description, instruction, row_buckets in cursor.fetchall():
+            candidate = {"name": name, "description": description, "prompt_instruction": instruction}
+            candidates.setdefault(category, []).append((name, pattern_shingles(candidate), set(row_buckets or [])))
+
+    results = []
+    for pattern, pattern_grams, signature, bucket_list in zip(patterns, grams, signatures, buckets):
+        bucket_set = set(bucket_list)
+        best_name, best_similarity = None, 0.0
+
+        for name, candidate_grams, candidate_buckets in candidates.get(pattern["category"], []):
+            if name == pattern["name"]:
+                best_name, best_similarity = None, 1.0
+                break
+            if not (bucket_set & candidate_buckets):
+                continue
+            similarity = pattern_similarity(pattern_grams, candidate_grams)
+            if similarity >= threshold and similarity > best_similarity:
+                best_name, best_similarity = name, similarity
+
+        if best_name:
+            # 병합되면 병합 대상 이름으로 저장되므로 서명도 그 이름 기준
+            signature = pattern_signature({"name": best_name})
+            bucket_list = lsh_buckets(signature)
+            bucket_set = set(bucket_list)
+        results.append((best_name or pattern["name"], best_name, round(best_similarity, 4), signature, bucket_list))
+
+        # 같은 배치의 뒤쪽 패턴이 이 패턴에 병합될 수 있도록 후보에 추가
+        candidates.setdefault(pattern["category"], []).append((best_name or pattern["name"], pattern_grams, bucket_set))
+
+    return results
+
+
+# 이 프로세스에서 서명이 없는 패턴이 더 없음을 확인했는지 (update_patterns마다 다시 조회하지 않음)
+_signatures_backfilled = False
+
+
+def backfill_pattern_signatures(conn, limit: int = 1000) -> int:
+    """
+    서명이 없는 기존 패턴(마이그레이션 이전 데이터)에 서명/버킷 채우기
+
+    새 패턴은 upsert 시 서명과 함께 저장되므로 한 번 비워지면 다시 생기지 않습니다.
+    ensure_pattern_signatures로 프로세스당 한 번만 실행하거나,
+    마이그레이션 직후 `python pattern_dedup.py backfill`로 실행합니다.
+    조회는 idx_patterns_minhash_missing 부분 인덱스(014)를 사용합니다.
+    서명 기준이 바뀌면 마이그레이션에서 서명을 비워 다시 채웁니다 (014, 015).
+
+    Returns:
+        int: 채운 패턴 수
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT id, name
+        FROM patterns
+        WHERE minhash_signature IS NULL AND category <> 'topic'
+        LIMIT %s
+    """, (limit,))
+    rows = cursor.fetchall()
+    if not rows:
+        return 0
+
+    ids, signatures, buckets = [], [], []
+    for row in rows:
+        signature = pattern_signature({"name": row[1]})
+        ids.append(str(row[0]))
+        signatures.append(array_literal(signature))
+        buckets.append(array_literal(lsh_buckets(signature)))
+
+    cursor.execute("""
+        UPDATE patterns p
+        SET minhash_signature = v.signature::BIGINT[],
+            lsh_buckets = v.buckets::BIGINT[]
+        FROM unnest(%s::UUID[], %s::TEXT[], %s::TEXT[]) AS v(id, signature, buckets)
+        WHERE p.id = v.id
+    """, (ids, signatures, buckets))
+    conn.commit()
+
+    print(f"[Analyzer] 패턴 서명 채움: {len(rows)}개")
+    return len(rows)
+
+
+def ensure_pattern_signatures(conn) -> int:
+    """
+    프로세스당 한 번 서명 누락 확인 후 채우기 (update_patterns용)
+
+    채울 패턴이 limit보다 적으면 모두 채운 것이므로 이후 호출은 DB를 조회하지 않습니다.
+    """
+    global _signatures_backfilled
+    if _signatures_backfilled:
+        return 0
+
+    limit = 1000
+    filled = backfill_pattern_signatures(conn, limit=limit)
+    if filled < limit:
+        _signatures_backfilled = True
+    return filled
+
+
+# ============================================
+# 보정 확인 (python pattern_dedup.py check)
+# ============================================
+
+def _pattern(name: str, description: str, prompt_instruction: str) -> Dict:
+    return {"name": name, "description": description, "prompt_instruction": prompt_instruction}
+
+
+# (패턴 A, 패턴 B, 병합되어야 하는지)
+CALIBRATION_PAIRS = [
+    (
+        _pattern("질문형 도입부",
+                 "독자에게 질문을 던지며 글을 시작하면 호기심을 자극해 끝까지 읽게 만든다",
+                 "도입부 첫 문장을 독자의 고민을 묻는 질문으로 작성하세요"),
+        _pattern("질문으로 시작하는 도입부",
+                 "첫 문장을 질문으로 시작하면 독자의 호기심을 유발해 이탈이 줄어든다",
+                 "글의 첫 문장은 독자에게 묻는 질문 형태로 시작하세요"),
+        True,
+    ),
+    (
+        _pattern("공감형 도입부",
+                 "독자의 불편이나 걱정에 공감하며 시작하면 감정적으로 몰입한다",
+                 "도입부에서 독자가 겪는 증상이나 걱정에 먼저 공감하는 문장을 쓰세요"),
+        _pattern("공감으로 시작하는 도입부",
+                 "독자의 걱정에 공감하는 문장으로 시작하면 몰입도가 높아진다",
+                 "첫 문장에서 독자의 불편함과 걱정에 공감을 표현하세요"),
+        True,
+    ),
+    (
+        _pattern("숫자형 제목",
+                 "제목에 숫자를 넣으면 내용이 구체적으로 보여 클릭률이 오른다",
+                 "제목에 '5가지', '3단계'처럼 숫자를 포함하세요"),
+        _pattern("숫자를 포함한 제목",
+                 "숫자가 들어간 제목은 구체적이라 더 많이 클릭된다",
+                 "제목에 항목 수나 단계 수 같은 숫자를 넣으세요"),
+        True,
+    ),
+    (
+        _pattern("통계형 도입부",
+                 "도입부에 통계 수치를 제시하면 문제가 얼마나 흔한지 보여줘 신뢰가 높아진다",
+                 "도입부 첫 문장에 유병률 같은 통계 수치를 넣으세요"),
+        _pattern("통계로 시작하는 도입부",
+                 "첫 문장을 통계로 시작하면 독자의 관심을 끌어 이탈이 줄어든다",
+                 "글의 첫 문장은 독자에게 와닿는 통계 수치로 시작하세요"),
+        True,
+    ),
+    (
+        _pattern("환자 일화 도입부",
+                 "실제 환자 사례를 이야기처럼 들려주며 시작하면 공감과 몰입이 커진다",
+                 "도입부를 환자의 경험담이나 일화로 여세요"),
+        _pattern("일화로 시작하는 도입부",
+                 "실제 환자의 일화로 시작하면 독자가 이야기에 몰입해 이탈이 줄어든다",
+                 "도입부 첫 문장을 실제 사례나 일화로 시작하세요"),
+        True,
+    ),
+    (
+        _pattern("질문으로 시작하는 도입부",
+                 "첫 문장을 질문으로 시작하면 독자의 호기심을 유발해 이탈이 줄어든다",
+                 "글의 첫 문장은 독자에게 묻는 질문 형태로 시작하세요"),
+        _pattern("공감으로 시작하는 도입부",
+                 "독자의 걱정에 공감하는 문장으로 시작하면 몰입도가 높아진다",
+                 "첫 문장에서 독자의 불편함과 걱정에 공감을 표현하세요"),
+        False,
+    ),
+    (
+        _pattern("질문형 도입부",
+                 "독자에게 질문을 던지며 글을 시작하면 호기심을 자극해 끝까지 읽게 만든다",
+                 "도입부 첫 문장을 독자의 고민을 묻는 질문으로 작성하세요"),
+        _pattern("결론 먼저 제시",
+                 "핵심 답을 글 초반에 보여주면 독자가 원하는 정보를 바로 얻어 신뢰가 높아진다",
+                 "첫 문단에 핵심 결론을 한 문장으로 먼저 제시하세요"),
+        False,
+    ),
+    (
+        _pattern("통계로 시작하는 도입부",
+                 "첫 문장을 통계로 시작하면 독자의 관심을 끌어 이탈이 줄어든다",
+                 "글의 첫 문장은 독자에게 와닿는 통계 수치로 시작하세요"),
+        _pattern("질문으로 시작하는 도입부",
+                 "첫 문장을 질문으로 시작하면 독자의 호기심을 유발해 이탈이 줄어든다",
+                 "글의 첫 문장은 독자에게 묻는 질문 형태로 시작하세요"),
+        False,
+    ),
+    (
+        _pattern("일화로 시작하는 도입부",
+                 "실제 환자의 일화로 시작하면 독자가 이야기에 몰입해 이탈이 줄어든다",
+                 "도입부 첫 문장을 실제 사례나 일화로 시작하세요"),
+        _pattern("질문으로 시작하는 도입부",
+                 "첫 문장을 질문으로 시작하면 독자의 호기심을 유발해 이탈이 줄어든다",
+                 "글의 첫 문장은 독자에게 묻는 질문 형태로 시작하세요"),
+        False,
+    ),
+    (
+        _pattern("일화로 시작하는 도입부",
+                 "실제 환자의 일화로 시작하면 독자가 이야기에 몰입해 이탈이 줄어든다",
+                 "도입부 첫 문장을 실제 사례나 일화로 시작하세요"),
+        _pattern("통계로 시작하는 도입부",
+                 "첫 문장을 통계로 시작하면 독자의 관심을 끌어 이탈이 줄어든다",
+                 "글의 첫 문장은 독자에게 와닿는 통계 수치로 시작하세요"),
+        False,
+    ),
+    (
+        _pattern("숫자형 제목",
+                 "제목에 숫자를 넣으면 내용이 구체적으로 보여 클릭률이 오른다",
+                 "제목에 '5가지', '3단계'처럼 숫자를 포함하세요"),
+        _pattern("질문형 제목",
+                 "제목을 질문으로 쓰면 궁금증이 생겨 클릭률이 오른다",
+                 "제목을 독자가 검색할 법한 질문 형태로 작성하세요"),
+        False,
+    ),
+    (
+        _pattern("FAQ 섹션 추가",
+                 "자주 묻는 질문을 정리하면 검색 의도를 충족해 체류시간이 늘어난다",
+                 "글 마지막에 자주 묻는 질문 3~5개와 답변을 추가하세요"),
+        _pattern("구체적 수치 제시",
+                 "막연한 표현보다 구체적인 숫자를 쓰면 설득력과 신뢰도가 높아진다",
+                 "효과나 위험을 설명할 때 구체적인 수치와 출처를 함께 제시하세요"),
+        False,
+    ),
+]
+
+
+def candidate_probability(similarity: float) -> float:
+    """이름 Jaccard가 similarity인 두 패턴이 LSH 버킷을 하나 이상 공유할 확률"""
+    rows = MINHASH_PERMUTATIONS // LSH_BANDS
+    return 1 - (1 - similarity ** rows) ** LSH_BANDS
+
+
+def check_calibration(threshold: float = PATTERN_MERGE_THRESHOLD) -> bool:
+    """CALIBRATION_PAIRS의 병합 여부가 기대와 같은지 확인 (LSH 후보 + 유사도 판단 경로 그대로 사용)"""
+    ok = True
+    for a, b, should_merge in CALIBRATION_PAIRS:
+        shared_bucket = bool(set(lsh_buckets(pattern_signature(a))) & set(lsh_buckets(pattern_signature(b))))
+        similarity = pattern_similarity(pattern_shingles(a), pattern_shingles(b))
+        merges = shared_bucket and similarity >= threshold
+        ok = ok and merges == should_merge
+        print(f"{'OK  ' if merges == should_merge else 'FAIL'} {a['name']} / {b['name']}: "
+              f"유사도 {similarity:.2f}, 병합 {'예' if merges else '아니오'} (기대: {'예' if should_merge else '아니오'})")
+
+    print("LSH 후보 확률 (이름 Jaccard): " + ", ".join(
+        f"{s:.2f} → {candidate_probability(s):.1%}" for s in (0.05, 0.1, 0.33, 0.5, 1.0)
+    ))
+    return ok
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "backfill":
+        from db import connect
+        conn = connect()
+        try:
+            while backfill_pattern_signatures(conn) > 0:
+                pass
+        finally:
+            conn.close()
+    else:
+        sys.exit(0 if check_calibration() else 1)
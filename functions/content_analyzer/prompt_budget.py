@@ -0,0 +1,34 @@
+"""
+프롬프트 토큰 추정
+
+Claude 토크나이저는 로컬에서 쓸 수 없으므로 문자 종류별 비율로 근사합니다.
+- 한글/한자 등 비 ASCII: 문자당 약 1토큰 (보수적으로 1.0)
+- ASCII (영문, 숫자, 기호, 공백): 약 4자당 1토큰
+
+실측보다 약간 크게 잡히도록 맞춰 두었으므로 예산 안쪽이면 실제로도 안쪽입니다.
+프롬프트 렌더러들이 같은 추정기를 공유합니다.
+"""
+
+import re
+
+
+ASCII_CHARS_PER_TOKEN = 4.0
+NON_ASCII_TOKENS_PER_CHAR = 1.0
+
+_NON_ASCII_RE = re.compile(r'[^\x00-\x7f]')
+
+
+def estimate_tokens(text: str) -> int:
+    """텍스트 토큰 수 추정"""
+    if not text:
+        return 0
+    non_ascii = len(_NON_ASCII_RE.findall(text))
+    ascii_chars = len(text) - non_ascii
+    return int(ascii_chars / ASCII_CHARS_PER_TOKEN + non_ascii * NON_ASCII_TOKENS_PER_CHAR) + 1
+
+
+def truncate_text(text: str, max_chars: int) -> str:
+    """max_chars 글자로 자르고 말줄임표 추가"""
+    if max_chars <= 0 or len(text) <= max_chars:
+        return text
+    return text[:max_chars - 1].rstrip() + "…"
@@ -5,27 +5,39 @@ SPEC-004: 프롬프트 자동 업데이트 모듈
 """
 
 import os
+import json
+import math
+import time
+import threading
+from datetime import datetime, timezone
 from typing import Dict, List, Optional
 
-import pg8000
+from db import connect, get_db_connection
+from prompt_budget import estimate_tokens
 
 
 # ============================================
 # 설정
 # ============================================
 
-DB_CONFIG = {
-    "host": os.environ.get("DB_HOST", "34.64.111.186"),
-    "port": int(os.environ.get("DB_PORT", "5432")),
-    "user": os.environ.get("DB_USER", "admin"),
-    "password": os.environ.get("DB_PASSWORD", "galddae-password"),
-    "database": os.environ.get("DB_NAME", "factcheck_db"),
-}
-
 # 업데이트 트리거 조건
 MIN_NEW_HIGH_PATTERNS = 1      # 새 HIGH 패턴 1개 이상
 MIN_UNAPPLIED_MEDIUM_PATTERNS = 3  # 미적용 MEDIUM 패턴 3개 이상
 
+# 프롬프트에 넣을 패턴 지침 선택 (select_pattern_instructions)
+PATTERN_INSTRUCTION_TOKEN_BUDGET = int(os.environ.get("PATTERN_INSTRUCTION_TOKEN_BUDGET", "1500"))
+PATTERN_CATEGORY_QUOTA = int(os.environ.get("PATTERN_CATEGORY_QUOTA", "4"))  # 카테고리별 최대 패턴 수
+LOW_PATTERN_LIMIT = 3  # LOW(실험 중) 패턴 최대 수
+PATTERN_RECENCY_HALF_LIFE_DAYS = 30.0  # 최근성 점수가 절반이 되는 기간
+CONFIDENCE_TIER_ORDER = {"HIGH": 0, "MEDIUM": 1, "LOW": 2}  # EXPERIMENTAL은 프롬프트에 넣지 않음
+
+# 활성 프롬프트 캐시 (get_active_prompt)
+# 새 버전 활성화 시 NOTIFY로 즉시 무효화, 알림을 놓쳐도 TTL이 지나면 다시 조회
+ACTIVE_PROMPT_CHANNEL = "prompt_versions_changed"
+ACTIVE_PROMPT_CACHE_TTL_SECONDS = float(os.environ.get("ACTIVE_PROMPT_CACHE_TTL_SECONDS", "60"))
+ACTIVE_PROMPT_LISTEN = os.environ.get("ACTIVE_PROMPT_LISTEN", "true").lower() == "true"
+ACTIVE_PROMPT_LISTEN_POLL_SECONDS = float(os.environ.get("ACTIVE_PROMPT_LISTEN_POLL_SECONDS", "2"))
+
 
 # ============================================
 # 기본 프롬프트 템플릿
@@ -73,21 +85,6 @@ JSON 형식으로 출력하세요:
 '''
 
 
-# ============================================
-# 데이터베이스 연결
-# ============================================
-
-def get_db_connection():
-    """PostgreSQL 연결"""
-    return pg8000.connect(
-        host=DB_CONFIG["host"],
-        port=DB_CONFIG["port"],
-        user=DB_CONFIG["user"],
-        password=DB_CONFIG["password"],
-        database=DB_CONFIG["database"],
-    )
-
-
 # ============================================
 # 패턴 조회
 # ============================================
@@ -97,7 +94,7 @@ def get_active_patterns(conn) -> List[Dict]:
     cursor = conn.cursor()
     cursor.execute("""
         SELECT id, name, category, description, prompt_instruction,
-               confidence_level, test_count, win_rate
+               confidence_level, test_count, win_rate, avg_lift, updated_at
         FROM patterns
         WHERE is_active = true
         ORDER BY
@@ -121,6 +118,8 @@ def get_active_patterns(conn) -> List[Dict]:
             "confidence_level": row[5],
             "test_count": int(row[6]) if row[6] else 0,
             "win_rate": float(row[7]) if row[7] else 0,
+            "avg_lift": float(row[8]) if row[8] else 0,
+            "updated_at": row[9],
         })
 
     return patterns
@@ -131,7 +130,7 @@ def get_current_prompt_version(conn) -> Optional[Dict]:
     cursor = conn.cursor()
     cursor.execute("""
         SELECT id, version, name, system_prompt, user_prompt_template,
-               applied_patterns, articles_generated
+               applied_patterns, articles_generated, dropped_patterns, pattern_selection
         FROM prompt_versions
         WHERE status = 'active'
         ORDER BY activated_at DESC
@@ -148,6 +147,8 @@ def get_current_prompt_version(conn) -> Optional[Dict]:
             "user_prompt_template": row[4],
             "applied_patterns": row[5] if row[5] else [],
             "articles_generated": int(row[6]) if row[6] else 0,
+            "dropped_patterns": row[7] if row[7] else [],
+            "pattern_selection": (json.loads(row[8]) if isinstance(row[8], str) else row[8]) or {},
         }
     return None
 
@@ -232,22 +233,149 @@ def generate_pattern_instructions(patterns: List[Dict]) -> str:
         for p in medium_patterns:
             lines.append(f"- **{p['name']}** ({p['category']}): {p['prompt_instruction']}")
 
-    # LOW 패턴 (선택) - 최대 3개만
+    # LOW 패턴 (선택) - 개수 제한은 select_pattern_instructions에서 적용
     low_patterns = [p for p in patterns if p["confidence_level"] == "LOW"]
     if low_patterns:
         lines.append("\n### [선택] 실험 중 패턴")
-        for p in low_patterns[:3]:
+        for p in low_patterns:
             lines.append(f"- {p['name']}: {p['prompt_instruction']}")
 
     return "\n".join(lines)
 
 
+def score_pattern(pattern: Dict, now: Optional[datetime] = None) -> float:
+    """
+    같은 신뢰도 등급 안에서의 우선순위 점수 (0~1)
+
+    승률 50%, 평균 lift 30%, 최근성 30일 반감기 20%
+    """
+    win_rate = min(max(pattern.get("win_rate", 0) / 100, 0.0), 1.0)
+    lift = min(max(pattern.get("avg_lift", 0), 0.0), 50.0) / 50.0  # 50% 이상은 같은 점수
+
+    recency = 0.0
+    updated_at = pattern.get("updated_at")
+    if updated_at:
+        now = now or datetime.now(timezone.utc)
+        if updated_at.tzinfo is None:
+            updated_at = updated_at.replace(tzinfo=timezone.utc)
+        age_days = max((now - updated_at).total_seconds() / 86400, 0.0)
+        recency = math.pow(0.5, age_days / PATTERN_RECENCY_HALF_LIFE_DAYS)
+
+    return round(0.5 * win_rate + 0.3 * lift + 0.2 * recency, 4)
+
+
+def select_pattern_instructions(
+    patterns: List[Dict],
+    token_budget: int = PATTERN_INSTRUCTION_TOKEN_BUDGET,
+    category_quota: int = PATTERN_CATEGORY_QUOTA,
+) -> Dict:
+    """
+    프롬프트에 넣을 패턴 선택 (순위 + 상한)
+
+    신뢰도 등급(HIGH > MEDIUM > LOW) 다음 score_pattern 순으로 정렬한 뒤 차례로 넣되,
+    카테고리별 상한, LOW 최대 개수, 렌더링된 지침의 추정 토큰 예산을 넘는 패턴은 제외합니다.
+    EXPERIMENTAL 패턴은 기존과 같이 넣지 않으며 선택 기록에도 남기지 않습니다.
+
+    Returns:
+        Dict: included (포함 패턴, 순위순), dropped (제외 패턴),
+              selection (prompt_versions.pattern_selection 기록용), estimated_tokens
+    """
+    now = datetime.now(timezone.utc)
+    ranked = sorted(
+        (p for p in patterns if p["confidence_level"] in CONFIDENCE_TIER_ORDER),
+        key=lambda p: (CONFIDENCE_TIER_ORDER[p["confidence_level"]], -score_pattern(p, now)),
+    )
+
+    included, dropped, decisions = [], [], []
+    category_counts: Dict[str, int] = {}
+    low_count = 0
+    estimated_tokens = 0
+
+    for pattern in ranked:
+        reason = None
+        if category_counts.get(pattern["category"], 0) >= category_quota:
+            reason = "category_quota"
+        elif pattern["confidence_level"] == "LOW" and low_count >= LOW_PATTERN_LIMIT:
+            reason = "low_limit"
+        else:
+            tokens = estimate_tokens(generate_pattern_instructions(included + [pattern]))
+            if tokens > token_budget:
+                reason = "token_budget"
+
+        if reason:
+            dropped.append(pattern)
+        else:
+            included.append(pattern)
+            category_counts[pattern["category"]] = category_counts.get(pattern["category"], 0) + 1
+            low_count += pattern["confidence_level"] == "LOW"
+            estimated_tokens = tokens
+
+        decisions.append({
+            "id": pattern["id"],
+            "name": pattern["name"],
+            "category": pattern["category"],
+            "confidence_level": pattern["confidence_level"],
+            "score": score_pattern(pattern, now),
+            "included": reason is None,
+            "reason": reason,
+        })
+
+    return {
+        "included": included,
+        "dropped": dropped,
+        "estimated_tokens": estimated_tokens,
+        "selection": {
+            "token_budget": token_budget,
+            "category_quota": category_quota,
+            "estimated_tokens": estimated_tokens,
+            "patterns": decisions,
+        },
+    }
+
+
+def settled_dropped_pattern_ids(current_version: Optional[Dict], patterns: List[Dict]) -> List[str]:
+    """
+    이전 선택에서 제외된 뒤 달라지지 않은 패턴 ID
+
+    제외 당시 기록(pattern_selection)과 비교해 신뢰도 등급이 같고 점수가 오르지 않은 패턴만
+    돌려줍니다. 최근성 점수는 시간이 지나면 내려가기만 하므로, 등급이 오르거나 새 테스트
+    결과로 승률/lift/최근성이 올라간 패턴은 다시 미적용으로 보고 재선택을 트리거할 수 있습니다.
+    """
+    if not current_version:
+        return []
+
+    recorded = {
+        d["id"]: d for d in current_version.get("pattern_selection", {}).get("patterns", [])
+        if not d.get("included")
+    }
+    now = datetime.now(timezone.utc)
+    by_id = {p["id"]: p for p in patterns}
+
+    settled = []
+    for pattern_id in current_version.get("dropped_patterns", []):
+        pattern_id = str(pattern_id)
+        pattern, decision = by_id.get(pattern_id), recorded.get(pattern_id)
+        if pattern is None or decision is None:
+            continue
+        if (
+            pattern["confidence_level"] == decision.get("confidence_level")
+            and score_pattern(pattern, now) <= decision.get("score", 0)
+        ):
+            settled.append(pattern_id)
+    return settled
+
+
 def create_new_prompt_version(
     conn,
     patterns: List[Dict],
-    current_version: Optional[Dict]
+    current_version: Optional[Dict],
+    selected: Optional[Dict] = None,
 ) -> str:
-    """새 프롬프트 버전 생성"""
+    """
+    새 프롬프트 버전 생성
+
+    selected: select_pattern_instructions 결과 (없으면 patterns로 선택)
+    """
     cursor = conn.cursor()
 
     # 버전 번호 결정
@@ -263,24 +391,28 @@ def create_new_prompt_version(
     else:
         new_version = "v1.0"
 
-    # 패턴 지침 생성
-    pattern_instructions = generate_pattern_instructions(patterns)
+    # 패턴 선택 (등급/점수 순, 카테고리 상한 + 토큰 예산) 후 지침 생성
+    if selected is None:
+        selected = select_pattern_instructions(patterns)
+    included = selected["included"]
+    pattern_instructions = generate_pattern_instructions(included)
 
     # 프롬프트 생성
     system_prompt = BASE_SYSTEM_PROMPT.format(pattern_instructions=pattern_instructions)
     user_prompt = BASE_USER_PROMPT
 
-    # 적용된 패턴 ID 목록 (HIGH, MEDIUM만)
-    applied_pattern_ids = [
-        p["id"] for p in patterns
-        if p["confidence_level"] in ("HIGH", "MEDIUM")
-    ]
+    # 포함/제외 패턴 ID 목록
+    applied_pattern_ids = [p["id"] for p in included]
+    dropped_pattern_ids = [p["id"] for p in selected["dropped"]]
 
     # 변경 사유 생성
-    high_count = len([p for p in patterns if p["confidence_level"] == "HIGH"])
-    medium_count = len([p for p in patterns if p["confidence_level"] == "MEDIUM"])
-    low_count = len([p for p in patterns if p["confidence_level"] == "LOW"])
-    description = f"패턴 적용: HIGH {high_count}개, MEDIUM {medium_count}개, LOW {low_count}개"
+    high_count = len([p for p in included if p["confidence_level"] == "HIGH"])
+    medium_count = len([p for p in included if p["confidence_level"] == "MEDIUM"])
+    low_count = len([p for p in included if p["confidence_level"] == "LOW"])
+    description = (
+        f"패턴 적용: HIGH {high_count}개, MEDIUM {medium_count}개, LOW {low_count}개"
+        f" (제외 {len(dropped_pattern_ids)}개, 지침 약 {selected['estimated_tokens']}토큰)"
+    )
 
     # 기존 버전 deprecated 처리
     if current_version:
@@ -295,11 +427,13 @@ def create_new_prompt_version(
         INSERT INTO prompt_versions (
             version, name, description,
             system_prompt, user_prompt_template,
-            applied_patterns, status, activated_at
+            applied_patterns, dropped_patterns, pattern_selection,
+            status, activated_at
         ) VALUES (
             %s, %s, %s,
             %s, %s,
-            %s::UUID[], 'active', NOW()
+            %s::UUID[], %s::UUID[], %s::JSONB,
+            'active', NOW()
         )
         RETURNING id
     """, (
@@ -309,10 +443,16 @@ def create_new_prompt_version(
         system_prompt,
         user_prompt,
         applied_pattern_ids if applied_pattern_ids else None,
+        dropped_pattern_ids if dropped_pattern_ids else None,
+        json.dumps(selected["selection"], ensure_ascii=False),
     ))
 
     new_id = str(cursor.fetchone()[0])
+
+    # 다른 프로세스의 활성 프롬프트 캐시 무효화 (NOTIFY는 커밋 시점에 전달됨)
+    cursor.execute("SELECT pg_notify(%s, %s)", (ACTIVE_PROMPT_CHANNEL, new_version))
     conn.commit()
+    invalidate_active_prompt_cache()
 
     print(f"[Prompt Updater] 새 버전 생성: {new_version} (ID: {new_id})")
     print(f"[Prompt Updater] {description}")
@@ -342,12 +482,17 @@ def update_prompt_if_needed(conn) -> Dict:
     # 1. 현재 프롬프트 버전 조회
     current = get_current_prompt_version(conn)
     current_applied = current["applied_patterns"] if current else []
+    current_dropped = current["dropped_patterns"] if current else []
     print(f"[Prompt Updater] 현재 버전: {current['version'] if current else 'None'}")
-    print(f"[Prompt Updater] 현재 적용된 패턴: {len(current_applied)}개")
+    print(f"[Prompt Updater] 현재 적용된 패턴: {len(current_applied)}개 (선택에서 제외: {len(current_dropped)}개)")
 
     # 2. 미적용 패턴 조회
-    unapplied = get_unapplied_patterns(conn, current_applied)
-    print(f"[Prompt Updater] 미적용 HIGH/MEDIUM 패턴: {len(unapplied)}개")
+    # 선택에서 제외된 패턴은 등급/점수가 그대로일 때만 제외 (오른 패턴은 다시 트리거 가능)
+    all_patterns = get_active_patterns(conn)
+    settled_dropped = settled_dropped_pattern_ids(current, all_patterns)
+    unapplied = get_unapplied_patterns(conn, [str(i) for i in current_applied] + settled_dropped)
+    print(f"[Prompt Updater] 미적용 HIGH/MEDIUM 패턴: {len(unapplied)}개 "
+          f"(제외 패턴 중 변동 없음: {len(settled_dropped)}/{len(current_dropped)}개)")
 
     # 3. 업데이트 필요 여부 판단
     if not should_update_prompt(unapplied):
@@ -358,17 +503,17 @@ def update_prompt_if_needed(conn) -> Dict:
             "unapplied_count": len(unapplied),
         }
 
-    # 4. 모든 활성 패턴 조회 (새 프롬프트에 모두 포함)
-    all_patterns = get_active_patterns(conn)
+    # 4. 모든 활성 패턴에서 선택 (등급/점수 순, 카테고리 상한 + 토큰 예산)
     print(f"[Prompt Updater] 전체 활성 패턴: {len(all_patterns)}개")
+    selected = select_pattern_instructions(all_patterns)
 
     # 5. 새 프롬프트 버전 생성
-    new_version = create_new_prompt_version(conn, all_patterns, current)
+    new_version = create_new_prompt_version(conn, all_patterns, current, selected)
 
     return {
         "updated": True,
         "new_version": new_version,
-        "patterns_applied": len([p for p in all_patterns if p["confidence_level"] in ("HIGH", "MEDIUM")]),
+        "patterns_applied": len(selected["included"]),
         "previous_version": current["version"] if current else None,
     }
 
@@ -377,26 +522,85 @@ def update_prompt_if_needed(conn) -> Dict:
 # 프롬프트 조회 (글 생성용)
 # ============================================
 
-def get_active_prompt() -> Dict:
+_active_prompt_lock = threading.Lock()
+_active_prompt: Optional[Dict] = None
+_active_prompt_loaded_at = 0.0
+_active_prompt_generation = 0  # 무효화될 때마다 증가 (조회 중 무효화되면 결과를 캐시하지 않음)
+_active_prompt_listener: Optional[threading.Thread] = None
+
+
+def invalidate_active_prompt_cache():
+    """활성 프롬프트 캐시 비우기 (다음 get_active_prompt에서 다시 조회)"""
+    global _active_prompt, _active_prompt_generation
+    with _active_prompt_lock:
+        _active_prompt = None
+        _active_prompt_generation += 1
+
+
+def _listen_prompt_changes():
     """
-    현재 활성화된 프롬프트 조회 (글 생성 시 사용)
+    prompt_versions_changed 채널 구독 (백그라운드 스레드)
 
-    Returns:
-        Dict: system_prompt, user_prompt_template, version
+    LISTEN 상태를 유지해야 하므로 풀이 아닌 전용 연결을 사용합니다.
+    pg8000은 알림 대기 API가 없어, 가벼운 쿼리로 주기적으로 알림을 받아 옵니다.
+    연결이 끊기면 다시 연결하며, 그 사이에는 TTL로만 갱신됩니다.
     """
+    while True:
+        conn = None
+        try:
+            conn = connect()
+            conn.autocommit = True
+            cursor = conn.cursor()
+            cursor.execute(f"LISTEN {ACTIVE_PROMPT_CHANNEL}")
+            # LISTEN 이전에 바뀌었을 수 있으므로 구독 후 한 번 비움
+            invalidate_active_prompt_cache()
+
+            while True:
+                cursor.execute("SELECT 1")
+                if conn.notifications:
+                    _, _, payload = conn.notifications.pop()
+                    conn.notifications.clear()
+                    invalidate_active_prompt_cache()
+                    print(f"[Prompt Updater] 새 프롬프트 버전 알림: {payload}")
+                time.sleep(ACTIVE_PROMPT_LISTEN_POLL_SECONDS)
+
+        except Exception as e:
+            print(f"[Prompt Updater] 프롬프트 변경 구독 오류 (TTL로 갱신): {e}")
+            if conn:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            time.sleep(max(ACTIVE_PROMPT_CACHE_TTL_SECONDS, ACTIVE_PROMPT_LISTEN_POLL_SECONDS))
+
+
+def _ensure_prompt_listener():
+    global _active_prompt_listener
+    if not ACTIVE_PROMPT_LISTEN:
+        return
+    with _active_prompt_lock:
+        if _active_prompt_listener is None:
+            _active_prompt_listener = threading.Thread(
+                target=_listen_prompt_changes, name="prompt-listener", daemon=True
+            )
+            _active_prompt_listener.start()
+
+
+def _load_active_prompt() -> Dict:
+    """활성 프롬프트 DB 조회"""
     conn = get_db_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT system_prompt, user_prompt_template, version
-        FROM prompt_versions
-        WHERE status = 'active'
-        ORDER BY activated_at DESC
-        LIMIT 1
-    """)
-
-    row = cursor.fetchone()
-    conn.close()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT system_prompt, user_prompt_template, version
+            FROM prompt_versions
+            WHERE status = 'active'
+            ORDER BY activated_at DESC
+            LIMIT 1
+        """)
+        row = cursor.fetchone()
+    finally:
+        conn.close()
 
     if row:
         return {
@@ -413,6 +617,33 @@ def get_active_prompt() -> Dict:
     }
 
 
+def get_active_prompt() -> Dict:
+    """
+    현재 활성화된 프롬프트 조회 (글 생성 시 사용)
+
+    글마다 호출되므로 프로세스 메모리에 캐시합니다.
+    새 버전이 활성화되면 NOTIFY로 수 초 안에 무효화되고,
+    알림을 받지 못하는 경우에도 ACTIVE_PROMPT_CACHE_TTL_SECONDS 후에는 다시 조회합니다.
+
+    Returns:
+        Dict: system_prompt, user_prompt_template, version
+    """
+    global _active_prompt, _active_prompt_loaded_at
+    _ensure_prompt_listener()
+
+    with _active_prompt_lock:
+        if _active_prompt is not None and time.monotonic() - _active_prompt_loaded_at < ACTIVE_PROMPT_CACHE_TTL_SECONDS:
+            return dict(_active_prompt)
+        generation = _active_prompt_generation
+
+    prompt = _load_active_prompt()
+    with _active_prompt_lock:
+        if generation == _active_prompt_generation:
+            _active_prompt = prompt
+            _active_prompt_loaded_at = time.monotonic()
+    return dict(prompt)
+
+
 # ============================================
 # 테스트
 # ============================================
@@ -28,7 +28,7 @@ ANALYSIS_SYSTEM_PROMPT = """
 - other: 기타
 """
 
-ANALYSIS_USER_PROMPT = """
+ANALYSIS_TEST_PROMPT = """
 ## A/B 테스트 결과 분석
 
 ### 테스트 정보
@@ -76,7 +76,9 @@ ANALYSIS_USER_PROMPT = """
 - **승자**: {winner}
 - **p-value**: {p_value}
 - **Lift**: {lift}%
+"""
 
+ANALYSIS_REQUEST_PROMPT = """
 ---
 
 ## 분석 요청
@@ -112,8 +114,107 @@ JSON 외의 텍스트는 포함하지 마세요.
 ```
 """
 
+ANALYSIS_USER_PROMPT = ANALYSIS_TEST_PROMPT + ANALYSIS_REQUEST_PROMPT
 
-def format_analysis_prompt(
+# 여러 테스트 일괄 분석 (테스트별 ANALYSIS_TEST_PROMPT 뒤에 붙임)
+ANALYSIS_BATCH_REQUEST_PROMPT = """
+---
+
+## 분석 요청
+
+위 {count}개 테스트를 각각 독립적으로 분석하세요. 다른 테스트의 내용을 섞지 마세요.
+analyses 배열에 테스트마다 하나씩, test_key를 그대로 넣어 다음 형식의 JSON으로 출력하세요.
+JSON 외의 텍스트는 포함하지 마세요.
+
+```json
+{{
+  "analyses": [
+    {{
+      "test_key": "T1",
+      "summary": "분석 요약 (1-2문장, 핵심 인사이트)",
+      "win_reason": "승리 원인 분석 (구체적, 데이터 기반)",
+      "patterns": [
+        {{
+          "name": "패턴 이름 (예: 질문형 도입부)",
+          "category": "intro|title|structure|faq|visual|meta|other",
+          "description": "패턴 설명 (왜 효과적인지)",
+          "prompt_instruction": "글 생성 시 적용할 구체적 지침"
+        }}
+      ],
+      "next_hypotheses": [
+        {{
+          "hypothesis": "다음 테스트 가설",
+          "target_section": "테스트할 영역",
+          "expected_lift": 10,
+          "priority": "high|medium|low"
+        }}
+      ],
+      "recommendations": [
+        "즉시 적용 가능한 개선 사항"
+      ]
+    }}
+  ]
+}}
+```
+"""
+
+
+# 응답 형식 검증 스키마 (response_parser.compile_schema)
+# 코드에서 사용하는 필드만 형식을 검사하고, 그 외 필드는 자유
+ANALYSIS_RESPONSE_SCHEMA = {
+    "type": "object",
+    "required": ["patterns"],
+    "properties": {
+        "summary": {"type": "string"},
+        "win_reason": {"type": "string"},
+        "patterns": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["name"],
+                "properties": {
+                    "name": {"type": "string"},
+                    "category": {"type": "string"},
+                    "description": {"type": "string"},
+                    "prompt_instruction": {"type": "string"},
+                },
+            },
+        },
+        "next_hypotheses": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["hypothesis"],
+                "properties": {
+                    "hypothesis": {"type": "string"},
+                    "target_section": {"type": ["string", "null"]},
+                    "expected_lift": {"type": ["number", "null"]},
+                    "priority": {"type": "string"},
+                },
+            },
+        },
+        "recommendations": {"type": "array"},
+    },
+}
+
+# 일괄 분석 응답 - analyses 항목별 형식은 ANALYSIS_RESPONSE_SCHEMA로 따로 검증 (실패한 테스트만 재분석)
+ANALYSIS_BATCH_RESPONSE_SCHEMA = {
+    "type": "object",
+    "required": ["analyses"],
+    "properties": {
+        "analyses": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["test_key"],
+                "properties": {"test_key": {"type": "string"}},
+            },
+        },
+    },
+}
+
+
+def _analysis_test_fields(
     test_name: str,
     hypothesis: str,
     target_section: str,
@@ -124,9 +225,9 @@ def format_analysis_prompt(
     winner: str,
     p_value: float,
     lift: float
-) -> str:
+) -> dict:
     """
-    분석 프롬프트 포맷팅
+    테스트 1건의 프롬프트 치환 값 (ANALYSIS_TEST_PROMPT 필드)
     """
     # A 버전 정보 추출
     a_sections = article_a.get("sections", [])
@@ -150,7 +251,7 @@ def format_analysis_prompt(
         if section.get("type") == "faq":
             b_faq_count = len(section.get("items", []))
 
-    return ANALYSIS_USER_PROMPT.format(
+    return dict(
         test_name=test_name,
         hypothesis=hypothesis,
         target_section=target_section or "전체",
@@ -174,3 +275,45 @@ def format_analysis_prompt(
         p_value=p_value,
         lift=round(lift, 2),
     )
+
+
+def format_analysis_prompt(
+    test_name: str,
+    hypothesis: str,
+    target_section: str,
+    article_a: dict,
+    article_b: dict,
+    metrics_a: dict,
+    metrics_b: dict,
+    winner: str,
+    p_value: float,
+    lift: float
+) -> str:
+    """
+    분석 프롬프트 포맷팅
+    """
+    return ANALYSIS_USER_PROMPT.format(**_analysis_test_fields(
+        test_name, hypothesis, target_section, article_a, article_b,
+        metrics_a, metrics_b, winner, p_value, lift,
+    ))
+
+
+def format_batch_analysis_prompt(tests: list) -> str:
+    """
+    여러 테스트 일괄 분석 프롬프트 포맷팅
+
+    시스템 프롬프트와 출력 형식 설명을 테스트마다 반복하지 않고 한 번만 보냅니다.
+
+    Args:
+        tests: [{"test_key": "T1", **format_analysis_prompt 인자}, ...]
+               test_key는 응답의 analyses[].test_key로 돌아와 결과를 테스트에 다시 나눌 때 사용
+    """
+    blocks = []
+    for test in tests:
+        fields = {key: value for key, value in test.items() if key != "test_key"}
+        blocks.append(
+            f"\n# 테스트 {test['test_key']} (test_key: \"{test['test_key']}\")\n"
+            + ANALYSIS_TEST_PROMPT.format(**_analysis_test_fields(**fields))
+        )
+
+    return "".join(blocks) + ANALYSIS_BATCH_REQUEST_PROMPT.format(count=len(tests))
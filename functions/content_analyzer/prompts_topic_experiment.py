@@ -6,7 +6,9 @@ Claude Code CLI용 프롬프트 템플릿
 """
 
 import json
-from typing import Dict, List, Any
+from typing import Any, Dict, List, Optional, Tuple
+
+from prompt_budget import estimate_tokens, truncate_text
 
 # 주제 패턴 설명
 TOPIC_PATTERNS_INFO = {
@@ -102,27 +104,131 @@ TOPIC_EXPERIMENT_SYSTEM_PROMPT = """당신은 건강 콘텐츠 분석 전문가
 """
 
 
-def format_topic_experiment_prompt(
+# 응답 형식 검증 스키마 (response_parser.compile_schema)
+# 코드에서 사용하는 필드만 형식을 검사하고, 그 외 필드는 자유
+TOPIC_EXPERIMENT_RESPONSE_SCHEMA = {
+    "type": "object",
+    "required": ["winner_insights"],
+    "properties": {
+        "summary": {"type": "string"},
+        "winner_insights": {
+            "type": "object",
+            "properties": {
+                "pattern": {"type": ["string", "null"]},
+                "pattern_name_ko": {"type": "string"},
+                "why_successful": {"type": "string"},
+                "key_elements": {"type": "array", "items": {"type": "string"}},
+            },
+        },
+        "pattern_analysis": {"type": "object"},
+        "recommendations": {"type": "object"},
+        "prompt_update_suggestions": {"type": "array"},
+    },
+}
+
+
+# 토큰 예산 축약 단계 - 앞에서부터 시도하여 처음으로 예산에 맞는 단계 사용
+# (패턴별 상위/하위 글 수 - None이면 전체, 글 표시 형식, 제목 최대 글자 수 - 0이면 제한 없음)
+TOPIC_PROMPT_COMPACTION_LEVELS = [
+    (None, "full", 0),
+    (None, "compact", 60),
+    (3, "compact", 60),
+    (2, "compact", 40),
+    (1, "compact", 30),
+    (0, "compact", 0),  # 패턴별 집계만
+]
+
+
+def _format_article(rank: int, article: Dict, detail: str, title_chars: int) -> str:
+    metrics = article.get("metrics", {})
+    title = truncate_text(article.get("title", "제목 없음"), title_chars)
+
+    if detail == "full":
+        return (
+            f"  {rank}. \"{title}\"\n"
+            f"     - 체류시간: {metrics.get('avg_time_on_page', 0):.1f}초\n"
+            f"     - 스크롤: {metrics.get('avg_scroll_depth', 0):.1f}%\n"
+            f"     - 이탈률: {metrics.get('avg_bounce_rate', 0):.1f}%\n"
+            f"     - 참여도: {metrics.get('engagement_score', 0):.1f}점"
+        )
+
+    return (
+        f"  {rank}. \"{title}\" - 체류 {metrics.get('avg_time_on_page', 0):.0f}초"
+        f" / 스크롤 {metrics.get('avg_scroll_depth', 0):.0f}%"
+        f" / 이탈 {metrics.get('avg_bounce_rate', 0):.0f}%"
+        f" / 참여도 {metrics.get('engagement_score', 0):.1f}"
+    )
+
+
+def _format_pattern_articles(
+    pattern: str,
+    articles: List[Dict],
+    sort_metric: str,
+    higher_is_better: bool,
+    keep: Any,
+    detail: str,
+    title_chars: int,
+) -> Tuple[str, int]:
+    """
+    패턴 1개의 글 목록 (주요 지표 순으로 정렬, 상위/하위 keep개만 남기고 중간 생략)
+
+    Returns:
+        Tuple[str, int]: (텍스트, 표시한 글 수)
+    """
+    pattern_name = TOPIC_PATTERNS_INFO.get(pattern, {}).get("name_ko", pattern)
+    lines = [f"\n### {pattern} - {pattern_name}"]
+
+    if articles:
+        values = [a.get("metrics", {}).get(sort_metric, 0) or 0 for a in articles]
+        lines.append(
+            f"  (글 {len(articles)}개, {sort_metric} 평균 {sum(values) / len(values):.1f}"
+            f" / 최고 {max(values) if higher_is_better else min(values):.1f}"
+            f" / 최저 {min(values) if higher_is_better else max(values):.1f})"
+        )
+
+    ranked = sorted(
+        articles,
+        key=lambda a: a.get("metrics", {}).get(sort_metric, 0) or 0,
+        reverse=higher_is_better,
+    )
+
+    if keep is None or keep * 2 >= len(ranked):
+        shown = list(enumerate(ranked, 1))
+        lines.extend(_format_article(rank, a, detail, title_chars) for rank, a in shown)
+        return "\n".join(lines), len(shown)
+
+    top = list(enumerate(ranked[:keep], 1))
+    bottom = list(enumerate(ranked[len(ranked) - keep:], len(ranked) - keep + 1)) if keep else []
+    lines.extend(_format_article(rank, a, detail, title_chars) for rank, a in top)
+    lines.append(f"  … 중간 {len(ranked) - len(top) - len(bottom)}개 생략")
+    lines.extend(_format_article(rank, a, detail, title_chars) for rank, a in bottom)
+    return "\n".join(lines), len(top) + len(bottom)
+
+
+def render_topic_experiment_prompt(
     experiment_name: str,
     description: str,
     patterns_tested: List[str],
     articles_by_pattern: Dict[str, List[Dict]],
     rankings: Dict,
     primary_metric: str,
-) -> str:
+    token_budget: Optional[int] = None,
+    system_prompt: str = TOPIC_EXPERIMENT_SYSTEM_PROMPT,
+) -> Dict:
     """
-    주제 패턴 실험 분석용 프롬프트 생성
+    토큰 예산에 맞춘 주제 패턴 실험 분석 프롬프트 생성
+
+    패턴 설명과 패턴별 집계/순위는 항상 포함하고, 글 목록만 단계적으로 줄입니다
+    (TOPIC_PROMPT_COMPACTION_LEVELS). 글은 주요 지표 순으로 정렬하여
+    상위/하위 글을 남기고 중간 성과 글부터 생략합니다.
+    예산은 시스템 프롬프트를 포함한 전체 추정 토큰 수 기준입니다.
 
     Args:
-        experiment_name: 실험 이름
-        description: 실험 설명
-        patterns_tested: 테스트된 패턴 목록
-        articles_by_pattern: 패턴별 글 목록
-        rankings: 패턴별 순위 및 성과 데이터
-        primary_metric: 주요 측정 지표
+        token_budget: 최대 추정 토큰 수 (None이면 축약 없음)
 
     Returns:
-        str: 포맷팅된 분석 프롬프트
+        Dict: prompt, estimated_tokens, token_budget, within_budget,
+              compaction_level, articles_shown, articles_total
     """
     # 패턴 정보 준비
     patterns_info_text = []
@@ -132,28 +238,6 @@ def format_topic_experiment_prompt(
             f"- {pattern} ({info.get('name_ko', pattern)}): {info.get('description', '')}"
         )
 
-    # 패턴별 글 요약
-    pattern_articles_text = []
-    for pattern, articles in articles_by_pattern.items():
-        pattern_info = TOPIC_PATTERNS_INFO.get(pattern, {})
-        pattern_name = pattern_info.get("name_ko", pattern)
-
-        article_summaries = []
-        for i, article in enumerate(articles, 1):
-            metrics = article.get("metrics", {})
-            article_summaries.append(
-                f"  {i}. \"{article.get('title', '제목 없음')}\"\n"
-                f"     - 체류시간: {metrics.get('avg_time_on_page', 0):.1f}초\n"
-                f"     - 스크롤: {metrics.get('avg_scroll_depth', 0):.1f}%\n"
-                f"     - 이탈률: {metrics.get('avg_bounce_rate', 0):.1f}%\n"
-                f"     - 참여도: {metrics.get('engagement_score', 0):.1f}점"
-            )
-
-        pattern_articles_text.append(
-            f"\n### {pattern} - {pattern_name}\n" +
-            "\n".join(article_summaries)
-        )
-
     # 순위 정보
     pattern_stats = rankings.get("pattern_stats", {})
     ranking_list = rankings.get("ranking", [])
@@ -167,9 +251,30 @@ def format_topic_experiment_prompt(
             f"   - 평균 체류시간: {stats.get('avg_time_on_page', 0):.1f}초\n"
             f"   - 평균 스크롤: {stats.get('avg_scroll_depth', 0):.1f}%\n"
             f"   - 총 PV: {stats.get('total_pageviews', 0)}"
+            + (
+                f"\n   - PV 가중 평균: {stats['weighted_mean']:.1f} "
+                f"(95% CI {stats['ci_low']:.1f}~{stats['ci_high']:.1f}, 최고일 확률 {stats['prob_best'] * 100:.0f}%)"
+                if "prob_best" in stats else ""
+            )
         )
 
-    prompt = f"""# 주제 패턴 실험 분석 요청
+    sort_metric = rankings.get("bootstrap", {}).get("metric", "engagement_score")
+    higher_is_better = sort_metric != "avg_bounce_rate"
+    articles_total = sum(len(articles) for articles in articles_by_pattern.values())
+    system_tokens = estimate_tokens(system_prompt)
+
+    for level, (keep, detail, title_chars) in enumerate(TOPIC_PROMPT_COMPACTION_LEVELS):
+        # 패턴별 글 요약
+        pattern_articles_text = []
+        articles_shown = 0
+        for pattern, articles in articles_by_pattern.items():
+            text, shown = _format_pattern_articles(
+                pattern, articles, sort_metric, higher_is_better, keep, detail, title_chars
+            )
+            pattern_articles_text.append(text)
+            articles_shown += shown
+
+        prompt = f"""# 주제 패턴 실험 분석 요청
 
 ## 실험 개요
 - **실험명**: {experiment_name}
@@ -197,5 +302,46 @@ def format_topic_experiment_prompt(
 
 반드시 위에서 지정한 JSON 형식으로 응답해주세요.
 """
+        estimated_tokens = system_tokens + estimate_tokens(prompt)
+        if token_budget is None or estimated_tokens <= token_budget:
+            break
+
+    return {
+        "prompt": prompt,
+        "estimated_tokens": estimated_tokens,
+        "token_budget": token_budget,
+        "within_budget": token_budget is None or estimated_tokens <= token_budget,
+        "compaction_level": level,
+        "articles_shown": articles_shown,
+        "articles_total": articles_total,
+    }
 
-    return prompt
+
+def format_topic_experiment_prompt(
+    experiment_name: str,
+    description: str,
+    patterns_tested: List[str],
+    articles_by_pattern: Dict[str, List[Dict]],
+    rankings: Dict,
+    primary_metric: str,
+    token_budget: Optional[int] = None,
+) -> str:
+    """
+    주제 패턴 실험 분석용 프롬프트 생성
+
+    Args:
+        experiment_name: 실험 이름
+        description: 실험 설명
+        patterns_tested: 테스트된 패턴 목록
+        articles_by_pattern: 패턴별 글 목록
+        rankings: 패턴별 순위 및 성과 데이터
+        primary_metric: 주요 측정 지표
+        token_budget: 최대 추정 토큰 수 (render_topic_experiment_prompt 참고)
+
+    Returns:
+        str: 포맷팅된 분석 프롬프트
+    """
+    return render_topic_experiment_prompt(
+        experiment_name, description, patterns_tested, articles_by_pattern,
+        rankings, primary_metric, token_budget,
+    )["prompt"]
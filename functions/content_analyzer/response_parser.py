@@ -0,0 +1,220 @@
+"""
+Claude 분석 응답 파서
+
+- IncrementalJSONExtractor: 스트리밍으로 받는 응답 텍스트를 조각 단위로 받아
+  첫 번째 최상위 JSON 객체가 닫히는 순간 바로 반환 (전체 응답을 기다리지 않음)
+- compile_schema: 응답 형식(JSON Schema 부분집합)을 검증 함수로 미리 컴파일
+  → 형식이 틀린 응답은 타임아웃까지 기다리지 않고 즉시 실패
+
+기존 `\\{[\\s\\S]*\\}` 정규식은 응답 전체를 역추적하고, JSON 뒤에 중괄호가 있는
+설명이 붙으면 잘못된 범위를 잡았습니다.
+"""
+
+import re
+import json
+from typing import Any, Callable, Dict, Optional
+
+
+# ============================================
+# 설정
+# ============================================
+
+# 이 길이만큼 받았는데 JSON 시작('{')이 없으면 형식 오류로 판단
+MAX_PREAMBLE_CHARS = 8000
+
+# 객체 밖: 여는/닫는 괄호와 문자열 시작, 문자열 안: 따옴표와 이스케이프
+_STRUCTURE_RE = re.compile(r'[{}\[\]"]')
+_STRING_RE = re.compile(r'["\\]')
+_FENCE_RE = re.compile(r'```(?:json)?\s*$')
+
+
+# ============================================
+# 증분 JSON 추출
+# ============================================
+
+class IncrementalJSONExtractor:
+    """
+    스트리밍 텍스트에서 첫 번째 최상위 JSON 객체 추출
+
+    문자열 안/밖과 괄호 깊이를 이어서 추적하므로 조각이 어디서 잘려도 되고,
+    이미 본 텍스트는 다시 스캔하지 않습니다.
+    ```json 코드 블록 안에서 시작한 객체가 파싱되지 않으면 바로 ValueError,
+    본문 중 중괄호(예: 설명 속 {예시})였다면 무시하고 다음 '{'부터 다시 찾습니다.
+    """
+
+    def __init__(self, max_preamble_chars: int = MAX_PREAMBLE_CHARS):
+        self.max_preamble_chars = max_preamble_chars
+        self.text = ""
+        self.result: Optional[Dict] = None
+        self._pos = 0
+        self._start: Optional[int] = None
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._fenced = False
+
+    def feed(self, chunk: str) -> Optional[Dict]:
+        """
+        텍스트 조각 추가
+
+        Returns:
+            Optional[Dict]: 객체가 닫혔으면 파싱 결과, 아직이면 None
+        """
+        if self.result is not None:
+            return self.result
+        self.text += chunk
+        self._scan()
+        return self.result
+
+    def _scan(self):
+        text = self.text
+        end = len(text)
+        i = self._pos
+
+        while i < end and self.result is None:
+            if self._start is None:
+                i = text.find("{", i)
+                if i < 0:
+                    i = end
+                    break
+                self._start = i
+                self._depth = 0
+                self._in_string = False
+                self._escape = False
+                self._fenced = bool(_FENCE_RE.search(text[max(0, i - 16):i]))
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                    i += 1
+                    continue
+                match = _STRING_RE.search(text, i)
+                if not match:
+                    i = end
+                    break
+                i = match.end()
+                if match.group() == "\\":
+                    self._escape = True
+                else:
+                    self._in_string = False
+                continue
+
+            match = _STRUCTURE_RE.search(text, i)
+            if not match:
+                i = end
+                break
+            i = match.end()
+            char = match.group()
+
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            else:
+                self._depth -= 1
+                if self._depth == 0:
+                    i = self._close(i)
+
+        self._pos = i
+        if self._start is None and self.result is None and len(text) > self.max_preamble_chars:
+            raise ValueError(f"응답 앞 {self.max_preamble_chars}자 안에 JSON이 없습니다")
+
+    def _close(self, end: int) -> int:
+        """최상위 괄호가 닫힘 - 파싱 성공이면 결과 저장, 아니면 다음 탐색 위치 반환"""
+        candidate = self.text[self._start:end]
+        try:
+            parsed = json.loads(candidate)
+        except json.JSONDecodeError as e:
+            if self._fenced:
+                raise ValueError(f"JSON 코드 블록 파싱 실패: {e}")
+            parsed = None
+
+        if isinstance(parsed, dict):
+            self.result = parsed
+            return end
+
+        # 본문 속 중괄호였음 - 그 다음 글자부터 다시 탐색
+        restart = self._start + 1
+        self._start = None
+        return restart
+
+
+def extract_json_object(text: str) -> Dict:
+    """전체 응답 텍스트에서 첫 번째 JSON 객체 추출 (캐시된 응답 등)"""
+    extractor = IncrementalJSONExtractor(max_preamble_chars=len(text) + 1)
+    result = extractor.feed(text)
+    if result is None:
+        raise ValueError("JSON 형식을 찾을 수 없습니다")
+    return result
+
+
+# ============================================
+# 응답 형식 검증
+# ============================================
+
+_TYPE_CHECKS = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+    "null": lambda v: v is None,
+}
+
+
+def compile_schema(schema: Dict) -> Callable[[Any], None]:
+    """
+    JSON Schema 부분집합(type, required, properties, items)을 검증 함수로 컴파일
+
+    스키마는 모듈 로드 시 한 번 컴파일하고, 검증은 응답마다 호출합니다.
+    정의되지 않은 키는 허용합니다 (Claude가 필드를 더 붙여도 통과).
+
+    Returns:
+        Callable: validate(value) - 형식이 다르면 ValueError("$.patterns[0].name: ...")
+    """
+    checks = []
+
+    types = schema.get("type")
+    if types:
+        types = [types] if isinstance(types, str) else list(types)
+        type_checks = [_TYPE_CHECKS[t] for t in types]
+        expected = "|".join(types)
+
+        def check_type(value, path):
+            if not any(check(value) for check in type_checks):
+                raise ValueError(f"{path}: {expected} 필요 (실제: {type(value).__name__})")
+            return True
+        checks.append(check_type)
+
+    required = list(schema.get("required", []))
+    properties = {key: compile_schema(sub) for key, sub in schema.get("properties", {}).items()}
+    if required or properties:
+        def check_object(value, path):
+            if not isinstance(value, dict):
+                return False
+            for key in required:
+                if key not in value:
+                    raise ValueError(f"{path}: 필수 키 '{key}' 없음")
+            for key, validate in properties.items():
+                if key in value:
+                    validate(value[key], f"{path}.{key}")
+            return True
+        checks.append(check_object)
+
+    if "items" in schema:
+        validate_item = compile_schema(schema["items"])
+
+        def check_items(value, path):
+            if not isinstance(value, list):
+                return False
+            for index, item in enumerate(value):
+                validate_item(item, f"{path}[{index}]")
+            return True
+        checks.append(check_items)
+
+    def validate(value, path: str = "$"):
+        for check in checks:
+            check(value, path)
+
+    return validate
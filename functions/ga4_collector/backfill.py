@@ -0,0 +1,297 @@
+"""
+GA4 과거 데이터 백필
+
+article_metrics에 과거 일별 메트릭을 채워 넣는 CLI입니다.
+
+- 기간을 일/주 단위 샤드로 나눠 제한된 스레드 풀에서 병렬 수집
+- 모든 스레드가 BetaAnalyticsDataClient 하나를 공유
+- 응답마다 돌아오는 propertyQuota를 보고 요청 속도 조절
+- 완료된 샤드는 ga4_backfill_checkpoints에 기록 → 중단 후 재실행 시 이어서 진행
+
+실행:
+    python backfill.py 2024-06-01 2024-12-31
+    python backfill.py 2024-06-01 2024-12-31 --shard day --workers 4
+"""
+
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from google.analytics.data_v1beta import BetaAnalyticsDataClient
+from google.api_core import exceptions as google_exceptions
+
+from main import (
+    GA4_PROPERTY_ID,
+    get_db_connection,
+    get_ga4_client,
+    fetch_ga4_metrics,
+    fetch_scroll_depth_events,
+    build_metric_row,
+    bulk_upsert_metrics,
+)
+
+
+# ============================================
+# 설정
+# ============================================
+
+DEFAULT_WORKERS = 4  # GA4 property당 동시 요청 한도는 10
+MAX_SHARD_ATTEMPTS = 5  # 샤드당 최대 시도 횟수
+RETRY_BASE_SECONDS = 10  # 재시도 대기 (지수 증가)
+
+# 남은 쿼터가 이 비율(요청당 소비량 × 워커 수 대비) 아래로 떨어지면 일시 정지
+QUOTA_SAFETY_FACTOR = 3
+DAILY_TOKEN_RESERVE = 2000  # 일일 토큰이 이보다 적으면 백필 중단 (수집 함수 몫으로 남김)
+
+
+class QuotaExhausted(Exception):
+    """일일 쿼터 부족으로 백필을 중단해야 함"""
+
+
+# ============================================
+# 쿼터 기반 속도 조절
+# ============================================
+
+class QuotaThrottle:
+    """
+    GA4 propertyQuota 기반 요청 속도 조절 (스레드 간 공유)
+
+    응답의 QuotaStatus(consumed: 이번 요청 소비량, remaining: 남은 양)로
+    남은 요청 수를 추정하여:
+    - 시간당 토큰/동시 요청이 부족하면 모든 워커를 일정 시간 멈추고
+    - 일일 토큰이 부족하면 QuotaExhausted로 백필을 중단합니다.
+    """
+
+    def __init__(self, workers: int):
+        self._workers = workers
+        self._lock = threading.Lock()
+        self._pause_until = 0.0
+        self._daily_exhausted = False
+
+    def wait(self):
+        """요청 전 호출 - 정지 구간이면 대기"""
+        while True:
+            with self._lock:
+                if self._daily_exhausted:
+                    raise QuotaExhausted("GA4 일일 토큰 쿼터 부족")
+                delay = self._pause_until - time.monotonic()
+            if delay <= 0:
+                return
+            time.sleep(min(delay, 5))
+
+    def pause(self, seconds: float, reason: str):
+        with self._lock:
+            until = time.monotonic() + seconds
+            if until > self._pause_until:
+                self._pause_until = until
+                print(f"[Backfill] {reason} → {seconds:.0f}초 대기")
+
+    def observe(self, response):
+        """응답 콜백 - propertyQuota 확인"""
+        quota = response.property_quota
+        if not quota:
+            return
+
+        daily = quota.tokens_per_day
+        if daily.consumed and daily.remaining < max(DAILY_TOKEN_RESERVE, daily.consumed * self._workers):
+            with self._lock:
+                self._daily_exhausted = True
+            return
+
+        # 시간당 토큰 (property 단위 / 프로젝트 단위)
+        for status in (quota.tokens_per_hour, quota.tokens_per_project_per_hour):
+            if status.consumed and status.remaining < status.consumed * self._workers * QUOTA_SAFETY_FACTOR:
+                # 다음 정시에 시간당 쿼터가 회복된다고 보고 대기
+                self.pause(3600 - time.time() % 3600 + 5, f"시간당 토큰 부족 (남음 {status.remaining})")
+                return
+
+        concurrent = quota.concurrent_requests
+        if concurrent.consumed and concurrent.remaining < self._workers:
+            self.pause(RETRY_BASE_SECONDS, f"동시 요청 한도 근접 (남음 {concurrent.remaining})")
+
+    def backoff(self, attempt: int):
+        """429(ResourceExhausted) 응답 후 지수 백오프"""
+        self.pause(RETRY_BASE_SECONDS * (2 ** attempt), "GA4 쿼터 초과 응답")
+
+
+# ============================================
+# 샤드 / 체크포인트
+# ============================================
+
+def build_shards(start_date: date, end_date: date, shard: str = "week") -> List[Tuple[date, date]]:
+    """기간을 일/주 단위 샤드로 분할 (양 끝 포함)"""
+    step = timedelta(days=7 if shard == "week" else 1)
+    shards = []
+    cursor_date = start_date
+    while cursor_date <= end_date:
+        shard_end = min(cursor_date + step - timedelta(days=1), end_date)
+        shards.append((cursor_date, shard_end))
+        cursor_date = shard_end + timedelta(days=1)
+    return shards
+
+
+def get_completed_shards(conn) -> Set[Tuple[date, date]]:
+    """이미 완료된 샤드 조회"""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT shard_start, shard_end
+        FROM ga4_backfill_checkpoints
+        WHERE property_id = %s
+    """, (GA4_PROPERTY_ID,))
+    return {(row[0], row[1]) for row in cursor.fetchall()}
+
+
+def mark_shard_completed(conn, shard: Tuple[date, date], inserted: int, updated: int):
+    """샤드 완료 기록"""
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO ga4_backfill_checkpoints (
+            property_id, shard_start, shard_end, rows_inserted, rows_updated
+        ) VALUES (%s, %s, %s, %s, %s)
+        ON CONFLICT (property_id, shard_start, shard_end)
+        DO UPDATE SET
+            rows_inserted = EXCLUDED.rows_inserted,
+            rows_updated = EXCLUDED.rows_updated,
+            completed_at = NOW()
+    """, (GA4_PROPERTY_ID, shard[0], shard[1], inserted, updated))
+    conn.commit()
+
+
+# ============================================
+# 샤드 수집
+# ============================================
+
+def fetch_shard(client: BetaAnalyticsDataClient, throttle: QuotaThrottle, shard: Tuple[date, date]) -> List[tuple]:
+    """
+    샤드 1개 수집 (워커 스레드)
+
+    GA4 요청만 수행하고 article_metrics 행 목록을 반환합니다.
+    DB 쓰기는 메인 스레드에서 하나의 연결로 직렬화합니다.
+    """
+    start_str, end_str = shard[0].isoformat(), shard[1].isoformat()
+
+    for attempt in range(MAX_SHARD_ATTEMPTS):
+        throttle.wait()
+        try:
+            scroll_data = fetch_scroll_depth_events(
+                start_str, end_str, client=client,
+                on_response=throttle.observe, raise_errors=True,
+            )
+            throttle.wait()
+            metrics = fetch_ga4_metrics(start_str, end_str, client=client, on_response=throttle.observe)
+            return [build_metric_row(m, scroll_data) for m in metrics]
+
+        except google_exceptions.ResourceExhausted:
+            if attempt == MAX_SHARD_ATTEMPTS - 1:
+                raise
+            throttle.backoff(attempt)
+
+
+def run_backfill(
+    start_date: date,
+    end_date: date,
+    shard: str = "week",
+    workers: int = DEFAULT_WORKERS,
+) -> Dict:
+    """
+    백필 실행
+
+    Returns:
+        Dict: 샤드/행 수 요약
+    """
+    conn = get_db_connection()
+
+    shards = build_shards(start_date, end_date, shard)
+    completed = get_completed_shards(conn)
+    pending = [s for s in shards if s not in completed]
+
+    print(f"[Backfill] {start_date} ~ {end_date}: 샤드 {len(shards)}개 "
+          f"(완료 {len(shards) - len(pending)}, 남음 {len(pending)}, workers={workers})")
+
+    client = get_ga4_client()
+    throttle = QuotaThrottle(workers)
+
+    summary = {"shards_total": len(shards), "shards_done": 0, "shards_failed": 0,
+               "rows_inserted": 0, "rows_updated": 0, "stopped": None}
+
+    # 완료 결과가 쌓이지 않도록 동시에 진행 중인 샤드 수를 workers × 2로 제한
+    queue = iter(pending)
+    in_flight = {}
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        def submit_next() -> bool:
+            next_shard = next(queue, None)
+            if next_shard is None:
+                return False
+            in_flight[executor.submit(fetch_shard, client, throttle, next_shard)] = next_shard
+            return True
+
+        for _ in range(workers * 2):
+            if not submit_next():
+                break
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                current = in_flight.pop(future)
+                label = f"{current[0]} ~ {current[1]}"
+
+                try:
+                    rows = future.result()
+                except QuotaExhausted as e:
+                    summary["stopped"] = str(e)
+                    continue
+                except Exception as e:
+                    print(f"[Backfill] 샤드 실패 ({label}): {e}")
+                    summary["shards_failed"] += 1
+                    continue
+
+                inserted, updated = bulk_upsert_metrics(conn, rows)
+                mark_shard_completed(conn, current, inserted, updated)
+
+                summary["shards_done"] += 1
+                summary["rows_inserted"] += inserted
+                summary["rows_updated"] += updated
+                print(f"[Backfill] 샤드 완료 ({label}): 신규 {inserted}, 업데이트 {updated}")
+
+            # 일일 쿼터가 바닥나면 새 샤드는 제출하지 않음 (재실행 시 이어서 진행)
+            if not summary["stopped"]:
+                while len(in_flight) < workers * 2 and submit_next():
+                    pass
+
+    conn.close()
+
+    if summary["stopped"]:
+        print(f"[Backfill] 중단: {summary['stopped']} - 쿼터 회복 후 같은 명령으로 재실행하세요.")
+    print(f"[Backfill] 완료: {summary}")
+    return summary
+
+
+# ============================================
+# CLI
+# ============================================
+
+def _parse_date(value: str) -> date:
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="GA4 article_metrics 과거 데이터 백필")
+    parser.add_argument("start_date", type=_parse_date, help="시작일 (YYYY-MM-DD)")
+    parser.add_argument("end_date", type=_parse_date, help="종료일 (YYYY-MM-DD, 포함)")
+    parser.add_argument("--shard", choices=["day", "week"], default="week", help="샤드 단위 (기본: week)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help=f"동시 요청 수 (기본: {DEFAULT_WORKERS})")
+    args = parser.parse_args(argv)
+
+    if args.start_date > args.end_date:
+        parser.error("start_date는 end_date보다 이후일 수 없습니다")
+
+    run_backfill(args.start_date, args.end_date, shard=args.shard, workers=max(1, args.workers))
+
+
+if __name__ == "__main__":
+    main()
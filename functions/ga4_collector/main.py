@@ -8,9 +8,14 @@ SPEC-002 구현
 """
 
 import os
+import io
+import csv
 import json
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Any
 import functions_framework
 
 from google.analytics.data_v1beta import BetaAnalyticsDataClient
@@ -46,6 +51,30 @@ DB_CONFIG = {
 P_VALUE_THRESHOLD = 0.15  # 탐색적 접근
 MIN_SAMPLE_SIZE = 50  # 최소 pageviews
 
+# 순차 검정 (ab_tests.sequential_method = 'msprt') 기본값 - 테스트별 값이 없을 때 사용
+DEFAULT_MSPRT_TAU = 5.0  # 효과 크기 혼합분포 표준편차 (engagement_score 단위)
+DEFAULT_SEQUENTIAL_ALPHA = 0.05
+# mSPRT 분산은 일별 행 몇 개로 구한 추정치(plug-in)라 초기에 과소추정되면 Λ가 폭주함
+# → 버전별 관측이 MSPRT_MIN_OBSERVATIONS 미만이면 갱신하지 않고, 표본분산은 MSPRT_MIN_VARIANCE로 하한
+MSPRT_MIN_OBSERVATIONS = 7  # 버전별 최소 일별 행 (한 주기)
+MSPRT_MIN_VARIANCE = 1.0  # 일별 engagement_score 표본분산 하한
+
+# CUPED 분산 감소 (테스트 시작 전 같은 요일 engagement를 공변량으로 사용)
+CUPED_PRE_PERIOD_DAYS = int(os.environ.get("AB_CUPED_PRE_PERIOD_DAYS", "28"))
+CUPED_MIN_OBSERVATIONS = 3  # 버전별 최소 관측 수 (요일이 매칭된 일별 행)
+USE_CUPED_DECISIONS = os.environ.get("AB_USE_CUPED", "false").lower() == "true"  # fixed 테스트 판정에 CUPED p-value 사용
+
+# GA4 클라이언트 (get_ga4_client로 지연 생성)
+_ga4_client: Optional[BetaAnalyticsDataClient] = None
+_ga4_client_lock = threading.Lock()
+
+# GA4 리포트 페이지 크기 (API 최대 250,000행)
+REPORT_PAGE_SIZE = int(os.environ.get("GA4_REPORT_PAGE_SIZE", "10000"))
+
+# 증분 수집 설정
+GA4_REVISION_DAYS = int(os.environ.get("GA4_REVISION_DAYS", "3"))  # GA4가 아직 수정할 수 있는 최근 일수
+INITIAL_LOOKBACK_DAYS = int(os.environ.get("GA4_INITIAL_LOOKBACK_DAYS", "3"))  # 워터마크가 없을 때 수집 기간
+
 
 # ============================================
 # 데이터베이스 연결
@@ -66,18 +95,105 @@ def get_db_connection():
 # GA4 데이터 수집
 # ============================================
 
-def fetch_ga4_metrics(days: int = 3) -> List[Dict]:
+def get_ga4_client() -> BetaAnalyticsDataClient:
     """
-    GA4 Data API에서 최근 N일간 메트릭 조회
+    프로세스 전역 GA4 클라이언트 (스레드 안전, 웜 인스턴스에서 재사용)
 
-    Returns:
-        List[Dict]: 글별 메트릭 목록
+    클라이언트 생성(인증·gRPC 채널 설정)은 비싸므로 호출마다 만들지 않습니다.
+    """
+    global _ga4_client
+    with _ga4_client_lock:
+        if _ga4_client is None:
+            _ga4_client = BetaAnalyticsDataClient()
+        return _ga4_client
+
+
+def _timed(fn: Callable, *args, **kwargs) -> Tuple[Any, float]:
+    """함수 실행 결과와 소요 시간(초) 반환"""
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+_PREFETCH_END = object()
+
+
+def _prefetch_first(executor: ThreadPoolExecutor, rows: Iterator) -> Iterator:
+    """
+    제너레이터의 첫 요소(=첫 페이지 요청)를 백그라운드 스레드에서 미리 시작
+
+    다른 리포트 요청과 메트릭 리포트 첫 페이지가 동시에 진행되도록 하고,
+    나머지 페이지는 소비하는 쪽에서 평소처럼 스트리밍합니다.
+    """
+    first = executor.submit(next, rows, _PREFETCH_END)
+
+    def resume():
+        item = first.result()
+        if item is _PREFETCH_END:
+            return
+        yield item
+        yield from rows
+
+    return resume()
+
+
+def _parse_ga4_date(value: str) -> str:
+    """GA4 date 차원 값(YYYYMMDD)을 YYYY-MM-DD로 변환"""
+    return datetime.strptime(value, "%Y%m%d").strftime("%Y-%m-%d")
+
+
+def _iter_report_rows(
+    client: BetaAnalyticsDataClient,
+    request: RunReportRequest,
+    on_response: Optional[Callable] = None,
+) -> Iterator:
+    """
+    run_report 결과를 페이지 단위로 순회 (limit/offset 페이지네이션)
+
+    GA4는 limit 없이 요청하면 기본 10,000행에서 결과를 잘라내므로
+    row_count에 도달할 때까지 offset을 늘려가며 다음 페이지를 요청합니다.
+    한 번에 한 페이지만 메모리에 유지합니다.
+
+    on_response가 주어지면 propertyQuota를 함께 요청하고
+    각 페이지 응답을 콜백으로 넘깁니다 (쿼터 기반 속도 조절용).
+    """
+    if on_response:
+        request.return_property_quota = True
+
+    offset = 0
+    while True:
+        request.limit = REPORT_PAGE_SIZE
+        request.offset = offset
+        response = client.run_report(request)
+
+        if on_response:
+            on_response(response)
+
+        for row in response.rows:
+            yield row
+
+        offset += len(response.rows)
+        if not response.rows or offset >= response.row_count:
+            break
+
+
+def fetch_ga4_metrics(
+    start_date: str,
+    end_date: str,
+    client: Optional[BetaAnalyticsDataClient] = None,
+    on_response: Optional[Callable] = None,
+) -> Iterator[Dict]:
     """
-    client = BetaAnalyticsDataClient()
+    GA4 Data API에서 기간 내 글별·일별 메트릭 조회
 
-    # 날짜 범위 계산
-    end_date = datetime.now().strftime("%Y-%m-%d")
-    start_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+    Args:
+        start_date, end_date: YYYY-MM-DD (양 끝 포함)
+        on_response: 페이지 응답 콜백 (_iter_report_rows 참고)
+
+    Returns:
+        Iterator[Dict]: 글×날짜별 메트릭 (페이지 단위로 스트리밍)
+    """
+    client = client or BetaAnalyticsDataClient()
 
     # GA4 리포트 요청
     request = RunReportRequest(
@@ -85,6 +201,7 @@ def fetch_ga4_metrics(days: int = 3) -> List[Dict]:
         date_ranges=[DateRange(start_date=start_date, end_date=end_date)],
         dimensions=[
             Dimension(name="pagePath"),
+            Dimension(name="date"),
         ],
         metrics=[
             Metric(name="averageSessionDuration"),
@@ -103,42 +220,45 @@ def fetch_ga4_metrics(days: int = 3) -> List[Dict]:
         ),
     )
 
-    response = client.run_report(request)
-
     # 결과 파싱
-    results = []
-    for row in response.rows:
+    for row in _iter_report_rows(client, request, on_response):
         page_path = row.dimension_values[0].value
         slug = page_path.replace("/articles/", "").rstrip("/")
 
         if slug:
-            results.append({
+            yield {
                 "slug": slug,
+                "date": _parse_ga4_date(row.dimension_values[1].value),
                 "avg_session_duration": float(row.metric_values[0].value or 0),
                 "bounce_rate": float(row.metric_values[1].value or 0),
                 "pageviews": int(row.metric_values[2].value or 0),
                 "sessions": int(row.metric_values[3].value or 0),
-            })
-
-    return results
+            }
 
 
-def fetch_scroll_depth_events(days: int = 3) -> Dict[str, Dict]:
+def fetch_scroll_depth_events(
+    start_date: str,
+    end_date: str,
+    client: Optional[BetaAnalyticsDataClient] = None,
+    on_response: Optional[Callable] = None,
+    raise_errors: bool = False,
+) -> Dict[Tuple[str, str], Dict]:
     """
-    scroll_depth 이벤트 조회
+    기간 내 scroll_depth 이벤트 일별 조회
+
+    기본적으로 조회 실패 시 빈 결과를 반환하고(스크롤 없이 메트릭 저장),
+    raise_errors=True면 예외를 그대로 올립니다 (백필 재시도용).
 
     Returns:
-        Dict[slug, {scroll_25, scroll_50, scroll_75, scroll_100}]
+        Dict[(slug, date), {scroll_25, scroll_50, scroll_75, scroll_100}]
     """
-    client = BetaAnalyticsDataClient()
-
-    end_date = datetime.now().strftime("%Y-%m-%d")
-    start_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+    client = client or BetaAnalyticsDataClient()
 
     request = RunReportRequest(
         property=f"properties/{GA4_PROPERTY_ID}",
         date_ranges=[DateRange(start_date=start_date, end_date=end_date)],
         dimensions=[
+            Dimension(name="date"),
             Dimension(name="customEvent:article_slug"),
             Dimension(name="customEvent:depth"),
         ],
@@ -156,41 +276,196 @@ def fetch_scroll_depth_events(days: int = 3) -> Dict[str, Dict]:
         ),
     )
 
+    # 결과 파싱 (글×날짜당 4개 값으로 집계되므로 행 수가 아닌 글×날짜 수에 비례)
+    scroll_data: Dict[Tuple[str, str], Dict] = {}
     try:
-        response = client.run_report(request)
+        for row in _iter_report_rows(client, request, on_response):
+            key = (row.dimension_values[1].value, _parse_ga4_date(row.dimension_values[0].value))
+            depth = row.dimension_values[2].value
+            count = int(row.metric_values[0].value or 0)
+
+            if key not in scroll_data:
+                scroll_data[key] = {
+                    "scroll_25_count": 0,
+                    "scroll_50_count": 0,
+                    "scroll_75_count": 0,
+                    "scroll_100_count": 0,
+                }
+
+            depth_key = f"scroll_{depth}_count"
+            if depth_key in scroll_data[key]:
+                scroll_data[key][depth_key] = count
     except Exception as e:
+        if raise_errors:
+            raise
         print(f"scroll_depth 이벤트 조회 실패: {e}")
         return {}
 
-    # 결과 파싱
-    scroll_data: Dict[str, Dict] = {}
-    for row in response.rows:
-        slug = row.dimension_values[0].value
-        depth = row.dimension_values[1].value
-        count = int(row.metric_values[0].value or 0)
-
-        if slug not in scroll_data:
-            scroll_data[slug] = {
-                "scroll_25_count": 0,
-                "scroll_50_count": 0,
-                "scroll_75_count": 0,
-                "scroll_100_count": 0,
-            }
+    return scroll_data
 
-        depth_key = f"scroll_{depth}_count"
-        if depth_key in scroll_data[slug]:
-            scroll_data[slug][depth_key] = count
 
-    return scroll_data
+# ============================================
+# 증분 수집 워터마크
+# ============================================
+
+def get_collection_window(conn, today: date) -> Tuple[date, date, date]:
+    """
+    증분 수집 기간 계산 (ga4_collection_state 워터마크 기준)
+
+    - finalized_through 이후 날짜만 새로 수집
+    - GA4가 아직 수정할 수 있는 최근 GA4_REVISION_DAYS일은 매번 재수집
+    - 워터마크가 없으면 최근 INITIAL_LOOKBACK_DAYS일 수집
+
+    Returns:
+        Tuple[date, date, date]: (start_date, end_date, 이번 실행 후 확정되는 날짜)
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT finalized_through
+        FROM ga4_collection_state
+        WHERE property_id = %s
+    """, (GA4_PROPERTY_ID,))
+    row = cursor.fetchone()
+
+    finalized_through = today - timedelta(days=GA4_REVISION_DAYS)
+
+    if row and row[0]:
+        start_date = row[0] + timedelta(days=1)
+    else:
+        start_date = today - timedelta(days=INITIAL_LOOKBACK_DAYS)
+
+    # 수정 가능 구간은 항상 다시 수집
+    start_date = min(start_date, finalized_through + timedelta(days=1))
+
+    return start_date, today, finalized_through
+
+
+def advance_watermark(conn, finalized_through: date):
+    """수집 완료 후 워터마크 전진 (뒤로 가지 않음)"""
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO ga4_collection_state (property_id, finalized_through, last_run_at)
+        VALUES (%s, %s, NOW())
+        ON CONFLICT (property_id)
+        DO UPDATE SET
+            finalized_through = GREATEST(ga4_collection_state.finalized_through, EXCLUDED.finalized_through),
+            last_run_at = NOW()
+    """, (GA4_PROPERTY_ID, finalized_through))
+    conn.commit()
 
 
 # ============================================
 # 메트릭 저장
 # ============================================
 
-def save_metrics(conn, metrics: List[Dict], scroll_data: Dict, date_str: str):
+# article_metrics에 적재하는 컬럼 (COPY 스테이징 테이블과 순서 동일)
+METRIC_COLUMNS = [
+    "article_slug", "article_version", "date",
+    "pageviews", "unique_visitors",
+    "avg_time_on_page", "bounce_rate",
+    "scroll_depth_avg", "scroll_25_pct", "scroll_50_pct", "scroll_75_pct", "scroll_100_pct",
+    "engagement_score",
+]
+
+# COPY 한 번에 보내는 CSV 청크 크기 (바이트)
+COPY_CHUNK_SIZE = 64 * 1024
+
+
+def build_metric_row(m: Dict, scroll_data: Dict) -> tuple:
+    """GA4 일별 메트릭 1건을 METRIC_COLUMNS 순서의 article_metrics 행으로 변환"""
+    slug = m["slug"]
+    scroll = scroll_data.get((slug, m["date"]), {})
+    total_sessions = m["sessions"] if m["sessions"] > 0 else 1
+
+    # 평균 스크롤 깊이 계산
+    scroll_25 = scroll.get("scroll_25_count", 0)
+    scroll_50 = scroll.get("scroll_50_count", 0)
+    scroll_75 = scroll.get("scroll_75_count", 0)
+    scroll_100 = scroll.get("scroll_100_count", 0)
+
+    # 가중 평균 스크롤 깊이
+    scroll_depth_avg = (
+        (scroll_25 * 25 + scroll_50 * 50 + scroll_75 * 75 + scroll_100 * 100) /
+        max(scroll_25 + scroll_50 + scroll_75 + scroll_100, 1)
+    )
+
+    # engagement_score 계산
+    engagement_score = calculate_engagement_score(
+        avg_session_duration=m["avg_session_duration"],
+        bounce_rate=m["bounce_rate"],
+        pageviews=m["pageviews"],
+        scroll_75_count=scroll_75,
+        total_sessions=total_sessions,
+    )
+
+    return (
+        slug, "A", m["date"],
+        m["pageviews"], m["sessions"],  # sessions를 unique_visitors로 사용
+        m["avg_session_duration"], m["bounce_rate"],
+        round(scroll_depth_avg, 2), scroll_25, scroll_50, scroll_75, scroll_100,
+        engagement_score,
+    )
+
+
+def _iter_csv_chunks(rows: Iterable[tuple]) -> Iterator[str]:
     """
-    article_metrics 테이블에 메트릭 저장
+    행 스트림을 COPY FROM STDIN용 CSV 청크로 변환
+
+    각 행 앞에 순번(seq)을 붙여 스테이징 테이블에서 중복 키가 있을 때
+    마지막 행이 이기도록 합니다 (기존 행 단위 UPSERT와 같은 의미).
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+
+    for seq, row in enumerate(rows):
+        writer.writerow((seq,) + tuple(row))
+        if buffer.tell() >= COPY_CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def bulk_upsert_metrics(conn, rows: Iterable[tuple]) -> Tuple[int, int]:
+    """
+    article_metrics 대량 UPSERT (COPY → 임시 스테이징 테이블 → 단일 MERGE)
+
+    행마다 INSERT ... ON CONFLICT를 보내면 적재 시간이 Cloud SQL 왕복 지연에
+    비례하므로, 모든 행을 COPY로 한 번에 흘려보낸 뒤 한 문장으로 병합합니다.
+    병합과 진행 중인 A/B 테스트의 ab_variant_stats 증분 갱신, 적재 직렬화(advisory lock)는
+    scripts/fetch_ga_metrics.py와 같은 DB 함수 merge_article_metrics_staging()
+    (016_article_metrics_merge_function.sql)이 처리합니다.
+
+    Args:
+        rows: METRIC_COLUMNS 순서의 튜플 스트림 (제너레이터 가능)
+
+    Returns:
+        Tuple[int, int]: (신규 삽입 수, 업데이트 수)
+    """
+    cursor = conn.cursor()
+    columns = ", ".join(METRIC_COLUMNS)
+
+    cursor.execute("SELECT create_article_metrics_staging()")
+    cursor.execute(
+        f"COPY article_metrics_staging (seq, {columns}) FROM STDIN WITH (FORMAT csv)",
+        stream=_iter_csv_chunks(rows),
+    )
+    cursor.execute("SELECT inserted_count, updated_count FROM merge_article_metrics_staging()")
+
+    inserted, updated = cursor.fetchone()
+    conn.commit()
+
+    return int(inserted), int(updated)
+
+
+def save_metrics(conn, metrics: Iterable[Dict], scroll_data: Dict) -> Tuple[int, int]:
+    """
+    article_metrics 테이블에 일별 메트릭 저장 (GA4 date 차원 기준)
+
+    metrics는 fetch_ga4_metrics의 제너레이터를 그대로 받아
+    COPY 스트림으로 흘려보내므로 전체 리포트를 메모리에 올리지 않습니다.
 
     DB 스키마 (001_initial_schema.sql):
     - article_slug, article_version, date (UNIQUE)
@@ -198,72 +473,16 @@ def save_metrics(conn, metrics: List[Dict], scroll_data: Dict, date_str: str):
     - avg_time_on_page, bounce_rate, exit_rate
     - scroll_depth_avg, scroll_25_pct, scroll_50_pct, scroll_75_pct, scroll_100_pct
     - engagement_score
-    """
-    cursor = conn.cursor()
-
-    for m in metrics:
-        slug = m["slug"]
-        scroll = scroll_data.get(slug, {})
-        total_sessions = m["sessions"] if m["sessions"] > 0 else 1
-
-        # 평균 스크롤 깊이 계산
-        scroll_25 = scroll.get("scroll_25_count", 0)
-        scroll_50 = scroll.get("scroll_50_count", 0)
-        scroll_75 = scroll.get("scroll_75_count", 0)
-        scroll_100 = scroll.get("scroll_100_count", 0)
-
-        # 가중 평균 스크롤 깊이
-        scroll_depth_avg = (
-            (scroll_25 * 25 + scroll_50 * 50 + scroll_75 * 75 + scroll_100 * 100) /
-            max(scroll_25 + scroll_50 + scroll_75 + scroll_100, 1)
-        )
-
-        # engagement_score 계산
-        engagement_score = calculate_engagement_score(
-            avg_session_duration=m["avg_session_duration"],
-            bounce_rate=m["bounce_rate"],
-            pageviews=m["pageviews"],
-            scroll_75_count=scroll_75,
-            total_sessions=total_sessions,
-        )
 
-        # UPSERT 쿼리 (스키마에 맞게 수정)
-        cursor.execute("""
-            INSERT INTO article_metrics (
-                article_slug, article_version, date,
-                pageviews, unique_visitors,
-                avg_time_on_page, bounce_rate,
-                scroll_depth_avg, scroll_25_pct, scroll_50_pct, scroll_75_pct, scroll_100_pct,
-                engagement_score
-            ) VALUES (
-                %s, 'A', %s,
-                %s, %s,
-                %s, %s,
-                %s, %s, %s, %s, %s,
-                %s
-            )
-            ON CONFLICT (article_slug, article_version, date)
-            DO UPDATE SET
-                pageviews = EXCLUDED.pageviews,
-                unique_visitors = EXCLUDED.unique_visitors,
-                avg_time_on_page = EXCLUDED.avg_time_on_page,
-                bounce_rate = EXCLUDED.bounce_rate,
-                scroll_depth_avg = EXCLUDED.scroll_depth_avg,
-                scroll_25_pct = EXCLUDED.scroll_25_pct,
-                scroll_50_pct = EXCLUDED.scroll_50_pct,
-                scroll_75_pct = EXCLUDED.scroll_75_pct,
-                scroll_100_pct = EXCLUDED.scroll_100_pct,
-                engagement_score = EXCLUDED.engagement_score
-        """, (
-            slug, date_str,
-            m["pageviews"], m["sessions"],  # sessions를 unique_visitors로 사용
-            m["avg_session_duration"], m["bounce_rate"],
-            scroll_depth_avg, scroll_25, scroll_50, scroll_75, scroll_100,
-            engagement_score,
-        ))
+    Returns:
+        Tuple[int, int]: (신규 삽입 수, 업데이트 수)
+    """
+    rows = (build_metric_row(m, scroll_data) for m in metrics)
+    inserted, updated = bulk_upsert_metrics(conn, rows)
 
-    conn.commit()
-    print(f"[GA4 Collector] {len(metrics)}개 글 메트릭 저장 완료 (date: {date_str})")
+    print(f"[GA4 Collector] {inserted + updated}개 글×날짜 메트릭 저장 완료 "
+          f"(신규 {inserted}, 업데이트 {updated})")
+    return inserted, updated
 
 
 def calculate_engagement_score(
@@ -310,142 +529,425 @@ def calculate_engagement_score(
 # A/B 테스트 평가
 # ============================================
 
-def get_running_ab_tests(conn) -> List[Dict]:
-    """진행 중인 A/B 테스트 조회"""
+def get_running_ab_test_metrics(conn) -> List[Dict]:
+    """
+    진행 중인 모든 A/B 테스트의 버전별 누적 통계를 한 번에 조회 (테스트 시작일 이후)
+
+    ab_variant_stats는 GA4 수집 시 증분 갱신되므로 테스트가 오래 진행돼도
+    버전당 한 행만 읽습니다. 평균/분산은 NUMERIC으로 정확히 계산합니다.
+
+    Returns:
+        List[Dict]: 테스트별 {id, name, control_version, variant_version, a_metrics, b_metrics, design}
+                    (통계가 없는 버전은 None)
+    """
     cursor = conn.cursor()
     cursor.execute("""
-        SELECT id, article_slug, name, control_version, variant_version
-        FROM ab_tests
-        WHERE status = 'running'
+        SELECT
+            t.id,
+            t.name,
+            t.control_version,
+            t.variant_version,
+            a.n, a.sum / NULLIF(a.n, 0),
+            CASE WHEN a.n > 1 THEN (a.n * a.sum_sq - a.sum * a.sum) / (a.n * (a.n - 1)) END,
+            a.pageviews,
+            b.n, b.sum / NULLIF(b.n, 0),
+            CASE WHEN b.n > 1 THEN (b.n * b.sum_sq - b.sum * b.sum) / (b.n * (b.n - 1)) END,
+            b.pageviews,
+            t.sequential_method,
+            t.msprt_tau,
+            t.sequential_alpha,
+            t.always_valid_p
+        FROM ab_tests t
+        LEFT JOIN ab_variant_stats a
+            ON a.test_id = t.id AND a.variant_version = t.control_version
+        LEFT JOIN ab_variant_stats b
+            ON b.test_id = t.id AND b.variant_version = t.variant_version
+        WHERE t.status = 'running'
     """)
 
+    def to_metrics(n, avg_score, variance, total_pageviews) -> Optional[Dict]:
+        if n is None:
+            return None
+        return {
+            "avg_score": float(avg_score) if avg_score else 0,
+            "total_pageviews": int(total_pageviews) if total_pageviews else 0,
+            "n": int(n),
+            "variance": float(variance) if variance is not None else None,
+        }
+
     tests = []
     for row in cursor.fetchall():
         tests.append({
-            "id": row[0],
-            "article_slug": row[1],
-            "name": row[2],
-            "control_version": row[3],
-            "variant_version": row[4],
+            "id": str(row[0]),
+            "name": row[1],
+            "control_version": row[2],
+            "variant_version": row[3],
+            "a_metrics": to_metrics(*row[4:8]),
+            "b_metrics": to_metrics(*row[8:12]),
+            "design": {
+                "method": row[12] or "fixed",
+                "tau": float(row[13]) if row[13] is not None else DEFAULT_MSPRT_TAU,
+                "alpha": float(row[14]) if row[14] is not None else DEFAULT_SEQUENTIAL_ALPHA,
+                "always_valid_p": float(row[15]) if row[15] is not None else None,
+            },
         })
 
     return tests
 
 
-def get_version_metrics(conn, slug: str, version: str) -> Optional[Dict]:
-    """버전별 메트릭 조회 (최근 7일)"""
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT
-            AVG(engagement_score) as avg_score,
-            SUM(pageviews) as total_pageviews,
-            ARRAY_AGG(engagement_score) as scores
-        FROM article_metrics
-        WHERE article_slug = %s
-          AND article_version = %s
-          AND date >= CURRENT_DATE - INTERVAL '7 days'
-        GROUP BY article_slug, article_version
-    """, (slug, version))
+def _summarize(metrics_list: List[Dict]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    버전별 통계를 (n, 평균, 표본분산) 배열로 변환
 
-    row = cursor.fetchone()
-    if row:
-        return {
-            "avg_score": float(row[0]) if row[0] else 0,
-            "total_pageviews": int(row[1]) if row[1] else 0,
-            "scores": row[2] if row[2] else [],
+    관측이 없으면 기존처럼 avg_score 한 개짜리 표본으로 취급합니다 (분산 NaN).
+    """
+    n = np.array([max(m["n"], 1) for m in metrics_list], dtype=float)
+    mean = np.array([m["avg_score"] for m in metrics_list], dtype=float)
+    var = np.array([
+        m["variance"] if m["variance"] is not None else np.nan
+        for m in metrics_list
+    ], dtype=float)
+    return n, mean, np.maximum(var, 0)
+
+
+def welch_t_test(
+    n_a: np.ndarray, mean_a: np.ndarray, var_a: np.ndarray,
+    n_b: np.ndarray, mean_b: np.ndarray, var_b: np.ndarray,
+) -> np.ndarray:
+    """
+    Welch's t-test 벡터 연산 (여러 테스트를 한 번에)
+
+    stats.ttest_ind(a, b, equal_var=False)와 같은 양측 p-value를 반환합니다.
+    표본이 1개이거나 분산이 모두 0이면 NaN.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        se_a = var_a / n_a
+        se_b = var_b / n_b
+        se2 = se_a + se_b
+        t_stat = (mean_a - mean_b) / np.sqrt(se2)
+        df = se2 ** 2 / (se_a ** 2 / (n_a - 1) + se_b ** 2 / (n_b - 1))
+        p_values = 2 * stats.t.sf(np.abs(t_stat), df)
+
+    return p_values
+
+
+def msprt_always_valid_p(
+    n_a: np.ndarray, mean_a: np.ndarray, var_a: np.ndarray,
+    n_b: np.ndarray, mean_b: np.ndarray, var_b: np.ndarray,
+    tau: np.ndarray, previous_p: np.ndarray,
+) -> np.ndarray:
+    """
+    mSPRT always-valid p-value 벡터 연산 (Johari et al., 정규 혼합분포 N(0, τ²))
+
+    차이 추정치 θ = mean_b - mean_a, 분산 V = var_a/n_a + var_b/n_b 일 때
+        Λ = sqrt(V / (V + τ²)) · exp(τ² θ² / (2V(V + τ²)))
+        p = min(이전 p, 1/Λ)
+
+    p는 단조 감소하므로 평가할 때마다 확인하다가 alpha 아래에서 멈춰도
+    1종 오류가 alpha로 유지됩니다. 분산을 계산할 수 없으면 이전 p(없으면 1)를 유지.
+
+    V는 알려진 분산이 아니라 일별 행으로 구한 plug-in 추정치입니다. 행이 적을 때
+    분산이 과소추정되면 보장이 깨지므로, 버전별 관측이 MSPRT_MIN_OBSERVATIONS 미만이면
+    이전 p를 유지하고 표본분산은 MSPRT_MIN_VARIANCE 아래로 내려가지 않게 합니다.
+    """
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        v = np.maximum(var_a, MSPRT_MIN_VARIANCE) / n_a + np.maximum(var_b, MSPRT_MIN_VARIANCE) / n_b
+        tau2 = tau ** 2
+        theta = mean_b - mean_a
+        log_lambda = 0.5 * np.log(v / (v + tau2)) + tau2 * theta ** 2 / (2 * v * (v + tau2))
+        p_now = np.minimum(1.0, np.exp(-log_lambda))
+
+    enough = (n_a >= MSPRT_MIN_OBSERVATIONS) & (n_b >= MSPRT_MIN_OBSERVATIONS)
+    p_now = np.where(np.isfinite(p_now) & enough, p_now, 1.0)
+    return np.minimum(previous_p, p_now)
+
+
+def evaluate_ab_tests(pairs: List[Tuple[Dict, Dict]], designs: Optional[List[Dict]] = None) -> List[Dict]:
+    """
+    여러 A/B 테스트를 한 번에 통계적 유의성 평가
+
+    Args:
+        pairs: [(a_metrics, b_metrics), ...] - 각 metrics는 {avg_score, total_pageviews, n, variance}
+        designs: 테스트별 검정 설정 {method, tau, alpha, always_valid_p} (None이면 모두 fixed)
+
+    Returns:
+        List[Dict]: 입력 순서대로 {winner, p_value, conclusion, lift, a_score, b_score, method}
+                    (msprt는 always_valid_p 포함)
+    """
+    if not pairs:
+        return []
+
+    designs = designs or [{"method": "fixed"}] * len(pairs)
+
+    a_list = [a for a, _ in pairs]
+    b_list = [b for _, b in pairs]
+
+    n_a, a_scores, var_a = _summarize(a_list)
+    n_b, b_scores, var_b = _summarize(b_list)
+    p_values = welch_t_test(n_a, a_scores, var_a, n_b, b_scores, var_b)
+    always_valid = msprt_always_valid_p(
+        n_a, a_scores, var_a, n_b, b_scores, var_b,
+        tau=np.array([d.get("tau", DEFAULT_MSPRT_TAU) for d in designs], dtype=float),
+        previous_p=np.array([
+            d["always_valid_p"] if d.get("always_valid_p") is not None else 1.0
+            for d in designs
+        ], dtype=float),
+    )
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lifts = np.where(a_scores > 0, (b_scores - a_scores) / a_scores * 100, 0.0)
+
+    results = []
+    for i, ((a_metrics, b_metrics), design) in enumerate(zip(pairs, designs)):
+        sequential = design["method"] == "msprt"
+
+        # 샘플 크기 확인
+        if a_metrics["total_pageviews"] < MIN_SAMPLE_SIZE or b_metrics["total_pageviews"] < MIN_SAMPLE_SIZE:
+            results.append({
+                "winner": None,
+                "p_value": None,
+                "conclusion": "insufficient_data",
+                "lift": 0,
+                "method": design["method"],
+            })
+            continue
+
+        # msprt: always-valid p를 기준으로 언제든 종료 가능 / fixed: 기존 Welch t-test
+        if sequential:
+            p_value = float(always_valid[i])
+            threshold = design.get("alpha", DEFAULT_SEQUENTIAL_ALPHA)
+        else:
+            p_value = float(p_values[i])
+            threshold = P_VALUE_THRESHOLD
+
+        # 승자 결정 (p-value를 계산할 수 없으면 판단 보류)
+        if p_value < threshold:
+            winner = "B" if b_scores[i] > a_scores[i] else "A"
+            conclusion = "significant"
+        else:
+            winner = None
+            conclusion = "inconclusive"
+
+        result = {
+            "winner": winner,
+            "p_value": round(p_value, 4) if np.isfinite(p_value) else None,
+            "conclusion": conclusion,
+            "lift": round(float(lifts[i]), 2),
+            "a_score": round(float(a_scores[i]), 4),
+            "b_score": round(float(b_scores[i]), 4),
+            "method": design["method"],
         }
-    return None
+        if sequential:
+            result["always_valid_p"] = round(p_value, 5)
+        results.append(result)
+
+    return results
 
 
 def evaluate_ab_test(a_metrics: Dict, b_metrics: Dict) -> Dict:
     """
-    A/B 테스트 통계적 유의성 평가
+    A/B 테스트 통계적 유의성 평가 (단일 테스트)
 
     Returns:
         Dict: {winner, p_value, conclusion, lift}
     """
-    # 샘플 크기 확인
-    if a_metrics["total_pageviews"] < MIN_SAMPLE_SIZE or b_metrics["total_pageviews"] < MIN_SAMPLE_SIZE:
-        return {
-            "winner": None,
-            "p_value": None,
-            "conclusion": "insufficient_data",
-            "lift": 0,
-        }
+    return evaluate_ab_tests([(a_metrics, b_metrics)])[0]
 
-    # 스코어 배열 준비
-    a_scores = np.array(a_metrics["scores"]) if a_metrics["scores"] else np.array([a_metrics["avg_score"]])
-    b_scores = np.array(b_metrics["scores"]) if b_metrics["scores"] else np.array([b_metrics["avg_score"]])
 
-    # Welch's t-test (분산이 다를 수 있으므로)
-    try:
-        t_stat, p_value = stats.ttest_ind(a_scores, b_scores, equal_var=False)
-    except Exception as e:
-        print(f"t-test 실패: {e}")
-        return {
-            "winner": None,
-            "p_value": None,
-            "conclusion": "error",
-            "lift": 0,
-        }
+def get_cuped_observations(conn, test_ids: List[str]) -> Dict[str, Dict[str, Tuple[np.ndarray, np.ndarray]]]:
+    """
+    CUPED용 일별 관측 (Y: 테스트 기간 engagement_score, X: 사전 기간 같은 요일 평균) 일괄 조회
 
-    # Lift 계산
-    if a_metrics["avg_score"] > 0:
-        lift = ((b_metrics["avg_score"] - a_metrics["avg_score"]) / a_metrics["avg_score"]) * 100
-    else:
-        lift = 0
+    X는 테스트 시작 전 CUPED_PRE_PERIOD_DAYS 동안 control 버전의 같은 요일(ISODOW)
+    평균입니다. 처리 이전 값이므로 두 버전에 공통으로 쓸 수 있고, 요일 효과를
+    흡수해 일별 변동을 줄입니다. 사전 기간에 같은 요일 데이터가 없는 날은 제외합니다.
 
-    # 승자 결정
-    if p_value < P_VALUE_THRESHOLD:
-        winner = "B" if b_metrics["avg_score"] > a_metrics["avg_score"] else "A"
-        conclusion = "significant"
-    else:
-        winner = None
-        conclusion = "inconclusive"
+    Returns:
+        Dict: {test_id: {version: (y, x)}}
+    """
+    if not test_ids:
+        return {}
+
+    cursor = conn.cursor()
+    cursor.execute("""
+        WITH tests AS (
+            SELECT id, article_slug, control_version, variant_version, started_at::date AS start_date
+            FROM ab_tests
+            WHERE id = ANY(%s::UUID[])
+        ),
+        pre_period AS (
+            SELECT t.id, EXTRACT(ISODOW FROM m.date) AS dow, AVG(m.engagement_score) AS x
+            FROM tests t
+            JOIN article_metrics m
+                ON m.article_slug = t.article_slug
+                AND m.article_version = t.control_version
+                AND m.date >= t.start_date - %s::INT
+                AND m.date < t.start_date
+                AND m.engagement_score IS NOT NULL
+            GROUP BY t.id, EXTRACT(ISODOW FROM m.date)
+        )
+        SELECT t.id, m.article_version, m.engagement_score, pre.x
+        FROM tests t
+        JOIN article_metrics m
+            ON m.article_slug = t.article_slug
+            AND m.article_version IN (t.control_version, t.variant_version)
+            AND m.date >= t.start_date
+            AND m.engagement_score IS NOT NULL
+        JOIN pre_period pre
+            ON pre.id = t.id
+            AND pre.dow = EXTRACT(ISODOW FROM m.date)
+    """, (list(test_ids), CUPED_PRE_PERIOD_DAYS))
+
+    grouped: Dict[str, Dict[str, Tuple[List[float], List[float]]]] = {}
+    for test_id, version, y, x in cursor.fetchall():
+        ys, xs = grouped.setdefault(str(test_id), {}).setdefault(version, ([], []))
+        ys.append(float(y))
+        xs.append(float(x))
+
+    return {
+        test_id: {version: (np.array(ys), np.array(xs)) for version, (ys, xs) in versions.items()}
+        for test_id, versions in grouped.items()
+    }
+
+
+def evaluate_ab_test_cuped(
+    a_obs: Tuple[np.ndarray, np.ndarray],
+    b_obs: Tuple[np.ndarray, np.ndarray],
+) -> Optional[Dict]:
+    """
+    CUPED 보정 Welch t-test
+
+    Y_adj = Y - θ(X - mean(X)), θ = cov(Y, X) / var(X) (두 버전 합쳐서 추정)
+
+    Args:
+        a_obs, b_obs: 버전별 (y, x) 배열
+
+    Returns:
+        Dict: {p_value, lift, theta, variance_reduction, a_score, b_score, n_a, n_b}
+              관측이 부족하거나 공변량 분산이 0이면 None
+    """
+    (y_a, x_a), (y_b, x_b) = a_obs, b_obs
+    if len(y_a) < CUPED_MIN_OBSERVATIONS or len(y_b) < CUPED_MIN_OBSERVATIONS:
+        return None
+
+    y = np.concatenate([y_a, y_b])
+    x = np.concatenate([x_a, x_b])
+    x_var = x.var(ddof=1)
+    if x_var <= 0:
+        return None
+
+    theta = np.cov(y, x, ddof=1)[0, 1] / x_var
+    x_mean = x.mean()
+    adj_a = y_a - theta * (x_a - x_mean)
+    adj_b = y_b - theta * (x_b - x_mean)
+
+    n_a, n_b = float(len(y_a)), float(len(y_b))
+    raw_se2 = y_a.var(ddof=1) / n_a + y_b.var(ddof=1) / n_b
+    adj_se2 = adj_a.var(ddof=1) / n_a + adj_b.var(ddof=1) / n_b
+
+    p_value = float(welch_t_test(
+        np.array([n_a]), np.array([adj_a.mean()]), np.array([adj_a.var(ddof=1)]),
+        np.array([n_b]), np.array([adj_b.mean()]), np.array([adj_b.var(ddof=1)]),
+    )[0])
+    if not np.isfinite(p_value):
+        return None
+
+    a_score, b_score = float(adj_a.mean()), float(adj_b.mean())
+    lift = (b_score - a_score) / a_score * 100 if a_score > 0 else 0
+    variance_reduction = 1 - adj_se2 / raw_se2 if raw_se2 > 0 else 0
 
     return {
-        "winner": winner,
         "p_value": round(p_value, 4),
-        "conclusion": conclusion,
         "lift": round(lift, 2),
-        "a_score": round(a_metrics["avg_score"], 4),
-        "b_score": round(b_metrics["avg_score"], 4),
+        "theta": round(float(theta), 4),
+        # 같은 검정력에 필요한 표본이 (1 - variance_reduction)배로 줄어듦
+        "variance_reduction": round(float(variance_reduction), 4),
+        "a_score": round(a_score, 4),
+        "b_score": round(b_score, 4),
+        "n_a": int(n_a),
+        "n_b": int(n_b),
     }
 
 
-def update_ab_test_result(conn, test_id: str, result: Dict):
+def apply_cuped(tests: List[Dict], results: List[Dict], observations: Dict) -> None:
+    """
+    평가 결과에 CUPED 결과를 result["cuped"]로 추가
+
+    USE_CUPED_DECISIONS가 켜져 있으면 fixed 테스트 중 원래 inconclusive였던 것을
+    CUPED p-value로 다시 판정합니다 (msprt는 always-valid p만 사용).
     """
-    A/B 테스트 결과 업데이트
+    for test, result in zip(tests, results):
+        versions = observations.get(test["id"], {})
+        a_obs = versions.get(test["control_version"])
+        b_obs = versions.get(test["variant_version"])
+        cuped = evaluate_ab_test_cuped(a_obs, b_obs) if a_obs and b_obs else None
+        result["cuped"] = cuped
+
+        if (
+            USE_CUPED_DECISIONS and cuped
+            and result["method"] == "fixed"
+            and result["conclusion"] == "inconclusive"
+            and cuped["p_value"] < P_VALUE_THRESHOLD
+        ):
+            result.update({
+                "winner": "B" if cuped["b_score"] > cuped["a_score"] else "A",
+                "p_value": cuped["p_value"],
+                "conclusion": "significant",
+                "lift": cuped["lift"],
+            })
+
+
+# UPDATE ... FROM (VALUES ...) 한 문장에 넣는 최대 테스트 수
+UPDATE_BATCH_SIZE = 1000
+
+
+def update_ab_test_results(conn, updates: List[Tuple[str, Dict]]):
+    """
+    A/B 테스트 결과 일괄 업데이트 (UPDATE ... FROM (VALUES ...))
 
     DB 스키마 (ab_tests):
     - status, started_at, ended_at
     - winner_version, actual_lift, confidence_level
+
+    - 유의한 결과: 테스트 완료 처리 (winner, lift, confidence 기록)
+    - 유의하지 않거나 데이터 부족: 상태 유지, 임시 lift만 저장
+    - msprt 테스트: always_valid_p 갱신 (다음 평가의 이전 값)
+    - CUPED 결과: cuped_result 갱신 (계산하지 못했으면 이전 값 유지)
     """
     cursor = conn.cursor()
 
-    if result["conclusion"] == "significant":
-        # 유의한 결과 - 테스트 완료
-        confidence_level = (1 - result["p_value"]) * 100 if result["p_value"] else None
-        cursor.execute("""
-            UPDATE ab_tests
+    for offset in range(0, len(updates), UPDATE_BATCH_SIZE):
+        batch = updates[offset:offset + UPDATE_BATCH_SIZE]
+
+        values_sql = ", ".join(["(%s::UUID, %s::BOOLEAN, %s::TEXT, %s::DECIMAL, %s::DECIMAL, %s::DECIMAL, %s::JSONB)"] * len(batch))
+        params = []
+        for test_id, result in batch:
+            significant = result["conclusion"] == "significant"
+            confidence_level = (1 - result["p_value"]) * 100 if significant and result["p_value"] else None
+            params.extend([
+                test_id,
+                significant,
+                result["winner"] if significant else None,
+                result.get("lift", 0),
+                confidence_level,
+                result.get("always_valid_p"),
+                json.dumps(result["cuped"]) if result.get("cuped") else None,
+            ])
+
+        cursor.execute(f"""
+            UPDATE ab_tests t
             SET
-                status = 'completed',
-                winner_version = %s,
-                actual_lift = %s,
-                confidence_level = %s,
-                ended_at = NOW(),
+                status = CASE WHEN v.significant THEN 'completed' ELSE t.status END,
+                winner_version = CASE WHEN v.significant THEN v.winner ELSE t.winner_version END,
+                actual_lift = v.lift,
+                confidence_level = CASE WHEN v.significant THEN v.confidence ELSE t.confidence_level END,
+                ended_at = CASE WHEN v.significant THEN NOW() ELSE t.ended_at END,
+                always_valid_p = COALESCE(v.always_valid_p, t.always_valid_p),
+                cuped_result = COALESCE(v.cuped, t.cuped_result),
                 updated_at = NOW()
-            WHERE id = %s
-        """, (result["winner"], result["lift"], confidence_level, test_id))
-    else:
-        # 유의하지 않거나 데이터 부족 - 상태 유지, 임시 결과 저장
-        cursor.execute("""
-            UPDATE ab_tests
-            SET
-                actual_lift = %s,
-                updated_at = NOW()
-            WHERE id = %s
-        """, (result.get("lift", 0), test_id))
+            FROM (VALUES {values_sql}) AS v(id, significant, winner, lift, confidence, always_valid_p, cuped)
+            WHERE t.id = v.id
+        """, params)
 
     conn.commit()
 
@@ -454,29 +956,40 @@ def evaluate_all_ab_tests(conn) -> int:
     """
     모든 진행 중인 A/B 테스트 평가
 
+    누적 통계 조회 1회 + 벡터 평가 + UPDATE 1회로 테스트 수·기간과 무관하게
+    DB 왕복과 읽는 행 수가 일정합니다.
+
     Returns:
         int: 완료된 테스트 수 (content_analyzer 호출 필요 여부 판단용)
     """
-    tests = get_running_ab_tests(conn)
+    tests = get_running_ab_test_metrics(conn)
     print(f"[GA4 Collector] {len(tests)}개 A/B 테스트 평가 중...")
 
-    completed_count = 0
-
+    evaluable = []
     for test in tests:
-        a_metrics = get_version_metrics(conn, test["article_slug"], test["control_version"])
-        b_metrics = get_version_metrics(conn, test["article_slug"], test["variant_version"])
-
-        if not a_metrics or not b_metrics:
+        if not test["a_metrics"] or not test["b_metrics"]:
             print(f"  - {test['name']}: 메트릭 없음, 스킵")
             continue
+        evaluable.append(test)
 
-        result = evaluate_ab_test(a_metrics, b_metrics)
-        update_ab_test_result(conn, test["id"], result)
+    results = evaluate_ab_tests(
+        [(t["a_metrics"], t["b_metrics"]) for t in evaluable],
+        designs=[t["design"] for t in evaluable],
+    )
+    apply_cuped(evaluable, results, get_cuped_observations(conn, [t["id"] for t in evaluable]))
+    update_ab_test_results(conn, [(t["id"], r) for t, r in zip(evaluable, results)])
 
+    completed_count = 0
+    for test, result in zip(evaluable, results):
         if result["conclusion"] == "significant":
             completed_count += 1
 
-        print(f"  - {test['name']}: {result['conclusion']} (p={result['p_value']}, winner={result['winner']})")
+        print(f"  - {test['name']}: {result['conclusion']} "
+              f"({result['method']}, p={result['p_value']}, winner={result['winner']})")
+        if result["cuped"]:
+            cuped = result["cuped"]
+            print(f"    CUPED: p={cuped['p_value']}, lift={cuped['lift']}%, "
+                  f"분산 감소 {cuped['variance_reduction'] * 100:.1f}% (n={cuped['n_a']}/{cuped['n_b']})")
 
     return completed_count
 
@@ -486,6 +999,7 @@ def trigger_content_analyzer():
     SPEC-003: content_analyzer Cloud Function 호출
 
     완료된 A/B 테스트가 있으면 분석 트리거
+    content_analyzer는 작업을 등록하고 202 + job id를 바로 반환합니다.
     """
     import requests
 
@@ -498,7 +1012,9 @@ def trigger_content_analyzer():
         print(f"[GA4 Collector] Content Analyzer 호출: {url}")
         response = requests.post(url, timeout=60)
         print(f"[GA4 Collector] Content Analyzer 응답: {response.status_code}")
-        return response.status_code == 200
+        if response.status_code == 202:
+            print(f"[GA4 Collector] Content Analyzer 작업: {response.json().get('job_id')}")
+        return response.status_code in (200, 202)
     except Exception as e:
         print(f"[GA4 Collector] Content Analyzer 호출 실패: {e}")
         return False
@@ -517,26 +1033,50 @@ def collect_ga4_metrics(request):
     """
     try:
         print("[GA4 Collector] 시작...")
-
-        # 1. GA4에서 메트릭 수집
-        print("[GA4 Collector] GA4 메트릭 수집 중...")
-        metrics = fetch_ga4_metrics(days=3)
-        scroll_data = fetch_scroll_depth_events(days=3)
-        print(f"[GA4 Collector] {len(metrics)}개 글, {len(scroll_data)}개 스크롤 데이터 수집")
-
-        if len(metrics) == 0:
+        timings: Dict[str, float] = {}
+        started = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            # 1. GA4 클라이언트 준비와 DB 연결/수집 기간 결정을 동시에 진행
+            client_future = executor.submit(get_ga4_client)
+
+            stage = time.perf_counter()
+            conn = get_db_connection()
+            start_date, end_date, finalized_through = get_collection_window(conn, date.today())
+            start_str, end_str = start_date.isoformat(), end_date.isoformat()
+            timings["db_connect"] = time.perf_counter() - stage
+            print(f"[GA4 Collector] 수집 기간: {start_str} ~ {end_str} (확정: ~{finalized_through.isoformat()})")
+
+            stage = time.perf_counter()
+            client = client_future.result()
+            timings["ga4_client_wait"] = time.perf_counter() - stage
+
+            # 2. 스크롤 이벤트 리포트와 메트릭 리포트 첫 페이지를 동시에 요청
+            print("[GA4 Collector] GA4 메트릭 수집 중...")
+            stage = time.perf_counter()
+            scroll_future = executor.submit(_timed, fetch_scroll_depth_events, start_str, end_str, client)
+            metrics = _prefetch_first(executor, fetch_ga4_metrics(start_str, end_str, client=client))
+
+            scroll_data, timings["scroll_report"] = scroll_future.result()
+            timings["reports_wait"] = time.perf_counter() - stage
+            print(f"[GA4 Collector] {len(scroll_data)}개 스크롤 데이터 수집")
+
+            # 3. 일별 메트릭 저장 (나머지 GA4 페이지를 DB에 바로 스트리밍)
+            stage = time.perf_counter()
+            inserted, updated = save_metrics(conn, metrics, scroll_data)
+            metrics_collected = inserted + updated
+            advance_watermark(conn, finalized_through)
+            timings["save_metrics"] = time.perf_counter() - stage
+
+        if metrics_collected == 0:
             print("[GA4 Collector] 수집된 메트릭 없음")
+            conn.close()
             return json.dumps({"status": "success", "metrics_collected": 0, "message": "No data"}), 200
 
-        # 2. DB 연결
-        conn = get_db_connection()
-
-        # 3. 메트릭 저장 (오늘 날짜로)
-        today = datetime.now().strftime("%Y-%m-%d")
-        save_metrics(conn, metrics, scroll_data, today)
-
         # 4. A/B 테스트 평가
+        stage = time.perf_counter()
         completed_tests = evaluate_all_ab_tests(conn)
+        timings["evaluate_ab_tests"] = time.perf_counter() - stage
 
         conn.close()
 
@@ -544,15 +1084,26 @@ def collect_ga4_metrics(request):
         analyzer_triggered = False
         if completed_tests > 0:
             print(f"[GA4 Collector] {completed_tests}개 테스트 완료, Content Analyzer 호출")
+            stage = time.perf_counter()
             analyzer_triggered = trigger_content_analyzer()
+            timings["trigger_analyzer"] = time.perf_counter() - stage
+
+        timings["total"] = time.perf_counter() - started
+        timings = {k: round(v, 3) for k, v in timings.items()}
+        print(f"[GA4 Collector] 단계별 소요(초): {json.dumps(timings)}")
 
         result = {
             "status": "success",
-            "metrics_collected": len(metrics),
+            "metrics_collected": metrics_collected,
+            "metrics_inserted": inserted,
+            "metrics_updated": updated,
             "scroll_data_collected": len(scroll_data),
-            "date": today,
+            "start_date": start_str,
+            "end_date": end_str,
+            "finalized_through": finalized_through.isoformat(),
             "completed_tests": completed_tests,
             "analyzer_triggered": analyzer_triggered,
+            "timings": timings,
         }
         print(f"[GA4 Collector] 완료: {json.dumps(result)}")
         return json.dumps(result), 200
@@ -7,6 +7,9 @@ AI 기반 콘텐츠 성과 분석 및 A/B 테스트 생성
 3. B 버전 자동 생성
 4. A/B 테스트 등록
 
+분석(2~3)은 asyncio로 OPENAI_MAX_CONCURRENCY개까지 동시에 요청하고,
+완료된 분석은 큐를 통해 DB 작성자 하나가 순서대로 저장합니다 (글마다 커밋).
+
 실행: python scripts/analyze_and_create_ab.py
 스케줄: 3일마다 (GA 수집 직후)
 """
@@ -14,10 +17,19 @@ AI 기반 콘텐츠 성과 분석 및 A/B 테스트 생성
 import os
 import json
 import uuid
+import random
+import asyncio
 from datetime import datetime, timedelta
 from typing import Optional
 import psycopg2
-from openai import OpenAI
+from openai import (
+    AsyncOpenAI,
+    APIConnectionError,
+    APIStatusError,
+    APITimeoutError,
+    InternalServerError,
+    RateLimitError,
+)
 
 # ============================================
 # 설정
@@ -36,7 +48,20 @@ OPENAI_MODEL = "gpt-4o"
 
 # 분석 설정
 UNDERPERFORMING_PERCENTILE = 20  # 하위 20%
-MAX_AB_TESTS_PER_RUN = 3  # 한 번에 최대 3개 테스트 생성
+MAX_AB_TESTS_PER_RUN = int(os.environ.get("MAX_AB_TESTS_PER_RUN", "30"))  # 한 번에 최대 테스트 생성 수
+
+# OpenAI 동시 요청 / 재시도 (429, 5xx, 타임아웃, 연결 오류)
+OPENAI_MAX_CONCURRENCY = int(os.environ.get("OPENAI_MAX_CONCURRENCY", "8"))
+OPENAI_MAX_RETRIES = int(os.environ.get("OPENAI_MAX_RETRIES", "5"))
+OPENAI_RETRY_BASE_DELAY = 2.0  # 초, 시도마다 2배 (지터 포함)
+OPENAI_RETRY_MAX_DELAY = 60.0
+OPENAI_REQUEST_TIMEOUT = 120.0
+
+RETRYABLE_OPENAI_ERRORS = (RateLimitError, APITimeoutError, APIConnectionError, InternalServerError)
+
+# 새 테스트의 검정 방식 (fixed: Welch t-test, msprt: 순차 검정 - 근거가 충분해지는 즉시 종료)
+# 기본은 fixed, mSPRT는 AB_SEQUENTIAL_METHOD=msprt로 명시적으로 켬
+AB_SEQUENTIAL_METHOD = os.environ.get("AB_SEQUENTIAL_METHOD", "fixed")
 
 
 def get_db_connection():
@@ -44,16 +69,17 @@ def get_db_connection():
     return psycopg2.connect(**DB_CONFIG)
 
 
-def get_openai_client():
-    """OpenAI 클라이언트"""
-    return OpenAI()
+def get_openai_client() -> AsyncOpenAI:
+    """OpenAI 비동기 클라이언트 (재시도는 analyze_article에서 직접 처리)"""
+    return AsyncOpenAI(max_retries=0, timeout=OPENAI_REQUEST_TIMEOUT)
 
 
-def get_underperforming_articles(cursor) -> list:
+def get_underperforming_articles(cursor, limit: Optional[int] = MAX_AB_TESTS_PER_RUN) -> list:
     """
     성과 하위 20% 글 추출
 
     기준: 최근 7일 평균 engagement_score
+    limit=None이면 하위 20% 전체 (배치 모드)
     """
     cursor.execute("""
         WITH article_stats AS (
@@ -87,7 +113,7 @@ def get_underperforming_articles(cursor) -> list:
         WHERE s.avg_engagement < p.p20
         ORDER BY s.avg_engagement ASC
         LIMIT %s
-    """, (MAX_AB_TESTS_PER_RUN,))
+    """, (limit,))
 
     columns = [desc[0] for desc in cursor.description]
     return [dict(zip(columns, row)) for row in cursor.fetchall()]
@@ -127,17 +153,8 @@ def get_top_performing_articles(cursor) -> list:
     return [dict(zip(columns, row)) for row in cursor.fetchall()]
 
 
-def analyze_article(client: OpenAI, article: dict, top_articles: list) -> dict:
-    """
-    AI로 글 분석 및 개선 가설 생성
-
-    Returns:
-        {
-            "problems": [...],
-            "hypothesis": {...},
-            "improved_sections": {...}
-        }
-    """
+def build_analysis_prompt(article: dict, top_articles: list) -> str:
+    """글 분석 프롬프트 생성"""
     sections = article.get("sections", [])
     if isinstance(sections, str):
         sections = json.loads(sections)
@@ -202,34 +219,77 @@ def analyze_article(client: OpenAI, article: dict, top_articles: list) -> dict:
     ]
 }}
 """
+    return prompt
+
 
-    response = client.chat.completions.create(
-        model=OPENAI_MODEL,
-        messages=[
+def build_analysis_request(article: dict, top_articles: list) -> dict:
+    """Chat Completions 요청 본문 (동기 호출과 배치 파일이 공유)"""
+    return {
+        "model": OPENAI_MODEL,
+        "messages": [
             {"role": "system", "content": "당신은 콘텐츠 최적화 전문가입니다. JSON 형식으로만 응답하세요."},
-            {"role": "user", "content": prompt}
+            {"role": "user", "content": build_analysis_prompt(article, top_articles)}
         ],
-        response_format={"type": "json_object"},
-        temperature=0.7
-    )
+        "response_format": {"type": "json_object"},
+        "temperature": 0.7
+    }
 
-    return json.loads(response.choices[0].message.content)
 
+def retry_delay(attempt: int, error: Exception) -> float:
+    """
+    재시도 대기 시간 (초)
 
-def create_b_version(cursor, article: dict, analysis: dict) -> Optional[str]:
+    서버가 Retry-After를 주면 따르고, 아니면 지수 백오프 + full jitter
+    (동시에 429를 받은 요청들이 같은 시각에 다시 몰리지 않도록)
     """
-    B 버전 글 생성
+    if isinstance(error, APIStatusError):
+        retry_after = error.response.headers.get("retry-after")
+        try:
+            if retry_after is not None:
+                return min(float(retry_after), OPENAI_RETRY_MAX_DELAY)
+        except ValueError:
+            pass
+
+    backoff = min(OPENAI_RETRY_BASE_DELAY * (2 ** attempt), OPENAI_RETRY_MAX_DELAY)
+    return random.uniform(backoff / 2, backoff)
+
+
+async def analyze_article(client: AsyncOpenAI, article: dict, top_articles: list) -> dict:
+    """
+    AI로 글 분석 및 개선 가설 생성
+
+    Rate limit / 일시 오류는 OPENAI_MAX_RETRIES회까지 백오프 후 재시도합니다.
 
     Returns:
-        article_id: 생성된 B 버전 ID
+        {
+            "problems": [...],
+            "hypothesis": {...},
+            "improved_sections": {...}
+        }
     """
+    request = build_analysis_request(article, top_articles)
+
+    for attempt in range(OPENAI_MAX_RETRIES + 1):
+        try:
+            response = await client.chat.completions.create(**request)
+            return json.loads(response.choices[0].message.content)
+
+        except RETRYABLE_OPENAI_ERRORS as e:
+            if attempt >= OPENAI_MAX_RETRIES:
+                raise
+            delay = retry_delay(attempt, e)
+            print(f"   ⏳ {article['article_slug']}: {type(e).__name__}, {delay:.1f}초 후 재시도 ({attempt + 1}/{OPENAI_MAX_RETRIES})")
+            await asyncio.sleep(delay)
+
+
+def merge_improved_sections(article: dict, analysis: dict) -> list:
+    """원본 섹션에 개선된 섹션 병합 (같은 type의 섹션을 교체)"""
     original_sections = article.get("sections", [])
     if isinstance(original_sections, str):
         original_sections = json.loads(original_sections)
 
     improved_sections = analysis.get("improved_sections", [])
 
-    # 원본 섹션에 개선된 섹션 병합
     new_sections = []
     improved_types = {s["type"] for s in improved_sections}
 
@@ -241,6 +301,18 @@ def create_b_version(cursor, article: dict, analysis: dict) -> Optional[str]:
         else:
             new_sections.append(section)
 
+    return new_sections
+
+
+def create_b_version(cursor, article: dict, analysis: dict) -> Optional[str]:
+    """
+    B 버전 글 생성
+
+    Returns:
+        article_id: 생성된 B 버전 ID
+    """
+    new_sections = merge_improved_sections(article, analysis)
+
     # B 버전 INSERT
     article_id = str(uuid.uuid4())
 
@@ -285,12 +357,14 @@ def create_ab_test(cursor, article: dict, analysis: dict, b_version_id: str) ->
             name, hypothesis, target_section,
             control_version, variant_version, traffic_split,
             primary_metric, expected_lift,
+            sequential_method,
             status, started_at
         ) VALUES (
             %s, %s,
             %s, %s, %s,
             'A', 'B', 0.5,
             'avg_time_on_page', %s,
+            %s,
             'running', NOW()
         )
     """, (
@@ -299,12 +373,22 @@ def create_ab_test(cursor, article: dict, analysis: dict, b_version_id: str) ->
         f"{article['article_slug']} 개선 테스트",
         hypothesis.get("description", ""),
         hypothesis.get("target_section", "intro"),
-        hypothesis.get("expected_lift", 10)
+        hypothesis.get("expected_lift", 10),
+        AB_SEQUENTIAL_METHOD,
     ))
 
     return test_id
 
 
+def metrics_snapshot(article: dict) -> dict:
+    """분석 시점 성과 스냅샷 (content_analysis.metrics_snapshot)"""
+    return {
+        "avg_time": float(article.get("avg_time") or 0),
+        "avg_bounce": float(article.get("avg_bounce") or 0),
+        "avg_engagement": float(article.get("avg_engagement") or 0)
+    }
+
+
 def save_analysis(cursor, article: dict, analysis: dict):
     """분석 결과 저장"""
     cursor.execute("""
@@ -325,17 +409,112 @@ def save_analysis(cursor, article: dict, analysis: dict):
         )
     """, (
         article["article_slug"],
-        json.dumps({
-            "avg_time": article.get("avg_time", 0),
-            "avg_bounce": article.get("avg_bounce", 0),
-            "avg_engagement": article.get("avg_engagement", 0)
-        }),
+        json.dumps(metrics_snapshot(article)),
         json.dumps(analysis.get("problems", []), ensure_ascii=False),
         json.dumps([analysis.get("hypothesis", {})], ensure_ascii=False),
         OPENAI_MODEL
     ))
 
 
+# ============================================
+# 분석 파이프라인 (동시 분석 → 단일 DB 작성자)
+# ============================================
+
+def write_ab_test(conn, article: dict, analysis: dict) -> str:
+    """B 버전 + A/B 테스트 + 분석 결과를 한 트랜잭션으로 저장"""
+    cursor = conn.cursor()
+    try:
+        b_version_id = create_b_version(cursor, article, analysis)
+        test_id = create_ab_test(cursor, article, analysis, b_version_id)
+        save_analysis(cursor, article, analysis)
+        conn.commit()
+    finally:
+        cursor.close()
+    return test_id
+
+
+async def write_results(conn, queue: asyncio.Queue) -> dict:
+    """
+    완료된 분석을 도착 순서대로 저장 (DB 작성자 하나 - 연결 하나를 순차 사용)
+
+    큐에서 None을 받으면 종료합니다.
+    psycopg2 호출은 스레드에서 실행해 진행 중인 OpenAI 요청을 막지 않습니다.
+    """
+    stats = {"created": 0, "failed": 0}
+
+    while True:
+        item = await queue.get()
+        if item is None:
+            break
+        article, analysis = item
+        slug = article["article_slug"]
+
+        if isinstance(analysis, Exception):
+            print(f"\n❌ {slug}: 분석 실패 ({type(analysis).__name__}: {analysis})")
+            stats["failed"] += 1
+            continue
+
+        problems = analysis.get("problems", [])
+        hypothesis = analysis.get("hypothesis", {})
+
+        print(f"\n🔍 분석 완료: {slug}")
+        print(f"   점수: {article.get('avg_engagement', 0):.1f} | 체류: {article.get('avg_time', 0):.1f}초")
+        print(f"   문제점: {len(problems)}개")
+        for p in problems[:2]:
+            print(f"      - {p.get('section')}: {p.get('issue')}")
+
+        print(f"   가설: {hypothesis.get('description', 'N/A')[:50]}...")
+        print(f"   예상 개선: +{hypothesis.get('expected_lift', 0)}%")
+
+        # B 버전 생성 + A/B 테스트 등록 + 분석 결과 저장
+        print("   📝 B 버전 생성 중...")
+        try:
+            test_id = await asyncio.to_thread(write_ab_test, conn, article, analysis)
+        except Exception as e:
+            await asyncio.to_thread(conn.rollback)
+            print(f"   ❌ 저장 실패: {e}")
+            stats["failed"] += 1
+            continue
+
+        print(f"   ✅ A/B 테스트 생성 완료 (ID: {test_id[:8]}...)")
+        stats["created"] += 1
+
+    return stats
+
+
+async def run_analysis_pipeline(conn, articles: list, top_articles: list) -> dict:
+    """
+    글 분석을 최대 OPENAI_MAX_CONCURRENCY개 동시에 실행하고 결과를 DB 작성자로 전달
+
+    한 글의 분석/저장 실패는 해당 글만 건너뜁니다.
+
+    Returns:
+        dict: {"created": 생성된 테스트 수, "failed": 실패한 글 수}
+    """
+    client = get_openai_client()
+    print(f"✅ OpenAI 연결 준비 (동시 요청 최대 {OPENAI_MAX_CONCURRENCY}개)")
+
+    queue: asyncio.Queue = asyncio.Queue()
+    semaphore = asyncio.Semaphore(OPENAI_MAX_CONCURRENCY)
+
+    async def analyze(article: dict):
+        async with semaphore:
+            try:
+                result = await analyze_article(client, article, top_articles)
+            except Exception as e:
+                result = e
+        await queue.put((article, result))
+
+    writer = asyncio.create_task(write_results(conn, queue))
+    try:
+        await asyncio.gather(*(analyze(article) for article in articles))
+    finally:
+        await queue.put(None)
+        await client.close()
+
+    return await writer
+
+
 def main():
     """메인 실행"""
     print("🚀 AI 성과 분석 및 A/B 테스트 생성 시작")
@@ -346,9 +525,6 @@ def main():
     cursor = conn.cursor()
 
     try:
-        openai_client = get_openai_client()
-        print("✅ OpenAI 연결 성공")
-
         # 성과 하위 글 추출
         print("\n📉 성과 하위 글 추출 중...")
         underperforming = get_underperforming_articles(cursor)
@@ -369,49 +545,24 @@ def main():
         """)
         running_tests = {row[0] for row in cursor.fetchall()}
 
-        created_tests = 0
-
+        targets = []
         for article in underperforming:
-            slug = article["article_slug"]
-
             # 이미 테스트 중이면 스킵
-            if slug in running_tests:
-                print(f"\n⏭️  {slug} (이미 테스트 진행 중)")
+            if article["article_slug"] in running_tests:
+                print(f"⏭️  {article['article_slug']} (이미 테스트 진행 중)")
                 continue
+            targets.append(article)
 
-            print(f"\n🔍 분석 중: {slug}")
-            print(f"   점수: {article.get('avg_engagement', 0):.1f} | 체류: {article.get('avg_time', 0):.1f}초")
-
-            # AI 분석
-            analysis = analyze_article(openai_client, article, top_articles)
-
-            problems = analysis.get("problems", [])
-            hypothesis = analysis.get("hypothesis", {})
-
-            print(f"   문제점: {len(problems)}개")
-            for p in problems[:2]:
-                print(f"      - {p.get('section')}: {p.get('issue')}")
-
-            print(f"   가설: {hypothesis.get('description', 'N/A')[:50]}...")
-            print(f"   예상 개선: +{hypothesis.get('expected_lift', 0)}%")
-
-            # B 버전 생성
-            print("   📝 B 버전 생성 중...")
-            b_version_id = create_b_version(cursor, article, analysis)
-
-            # A/B 테스트 등록
-            test_id = create_ab_test(cursor, article, analysis, b_version_id)
-
-            # 분석 결과 저장
-            save_analysis(cursor, article, analysis)
-
-            conn.commit()
-
-            print(f"   ✅ A/B 테스트 생성 완료 (ID: {test_id[:8]}...)")
-            created_tests += 1
+        # AI 분석 (동시) → B 버전 생성 / A/B 테스트 등록 (순차)
+        print(f"\n🔍 {len(targets)}개 글 분석 중...")
+        conn.commit()  # 조회 트랜잭션 종료 - 이후 글마다 커밋
+        stats = asyncio.run(run_analysis_pipeline(conn, targets, top_articles))
+        created_tests = stats["created"]
 
         print("\n" + "=" * 50)
         print(f"✅ 총 {created_tests}개 A/B 테스트 생성됨")
+        if stats["failed"]:
+            print(f"⚠️  실패: {stats['failed']}개 글 (다음 실행에서 다시 시도)")
 
         # 현재 진행 중인 테스트 요약
         cursor.execute("""
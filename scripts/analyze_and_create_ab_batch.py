@@ -0,0 +1,645 @@
+#!/usr/bin/env python3
+"""
+성과 하위 글 일괄 분석 (OpenAI Batch API)
+
+analyze_and_create_ab.py는 실행마다 몇십 개 글을 동기 Chat Completions로 분석합니다.
+하위 20% 전체를 다시 분석할 때는 배치 모드를 사용합니다.
+
+1. 하위 20% 전체 글의 분석 요청을 JSONL 파일로 직렬화
+2. 배치 제출 (요청 본문은 analyze_and_create_ab.build_analysis_request와 동일)
+3. 완료될 때까지 폴링
+4. 결과를 B 버전(articles) / A/B 테스트(ab_tests) / 분석 결과(content_analysis)에
+   한 문장으로 일괄 적재
+
+배치 백엔드 (AB_BATCH_BACKEND):
+- openai: OpenAI Files + Batches API
+- local: 파일 기반 대체 백엔드 (오프라인 테스트용, OpenAI 호출 없음)
+  LOCAL_BATCH_RESPONSES_DIR/<slug>.json이 있으면 그 내용을 응답으로, 없으면 자리표시 분석을 반환
+
+실행 상태(요청 파일, 배치 ID, 글 스냅샷)는 AB_BATCH_DIR/<run_id>/에 저장되므로
+폴링이 끊겨도 이어서 적재할 수 있습니다.
+
+실행:
+    python scripts/analyze_and_create_ab_batch.py              # 준비 → 제출 → 폴링 → 적재
+    python scripts/analyze_and_create_ab_batch.py status <run_id>
+    python scripts/analyze_and_create_ab_batch.py resume <run_id>  # 폴링 → 적재
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import tempfile
+from datetime import datetime, date
+from decimal import Decimal
+from pathlib import Path
+from typing import Callable, Optional
+
+from openai import OpenAI
+
+from analyze_and_create_ab import (
+    OPENAI_MODEL,
+    AB_SEQUENTIAL_METHOD,
+    UNDERPERFORMING_PERCENTILE,
+    get_db_connection,
+    get_underperforming_articles,
+    get_top_performing_articles,
+    build_analysis_request,
+    merge_improved_sections,
+    metrics_snapshot,
+)
+
+# ============================================
+# 설정
+# ============================================
+
+AB_BATCH_BACKEND = os.environ.get("AB_BATCH_BACKEND", "openai")  # openai | local
+AB_BATCH_DIR = Path(os.environ.get("AB_BATCH_DIR", Path(tempfile.gettempdir()) / "ab_batch_runs"))
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_COMPLETION_WINDOW = "24h"
+BATCH_POLL_SECONDS = float(os.environ.get("AB_BATCH_POLL_SECONDS", "60"))
+BATCH_POLL_TIMEOUT_SECONDS = float(os.environ.get("AB_BATCH_POLL_TIMEOUT_SECONDS", str(24 * 3600)))
+
+# 로컬 대체 백엔드
+LOCAL_BATCH_RESPONSES_DIR = os.environ.get("LOCAL_BATCH_RESPONSES_DIR")
+LOCAL_BATCH_DELAY_SECONDS = float(os.environ.get("LOCAL_BATCH_DELAY_SECONDS", "0"))
+LOCAL_BATCH_MODEL = "local-batch"
+
+# 더 이상 바뀌지 않는 배치 상태 (expired/cancelled도 완료된 요청의 출력 파일은 남음)
+TERMINAL_BATCH_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+def _json_default(value):
+    """DB 조회 값(Decimal, 날짜) JSON 직렬화"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"JSON 직렬화 불가: {type(value).__name__}")
+
+
+# ============================================
+# 배치 백엔드
+# ============================================
+
+class OpenAIBatchBackend:
+    """OpenAI Files + Batches API"""
+
+    name = "openai"
+
+    def __init__(self, client: Optional[OpenAI] = None):
+        self.client = client or OpenAI()
+
+    def upload(self, path: Path) -> str:
+        with open(path, "rb") as f:
+            return self.client.files.create(file=f, purpose="batch").id
+
+    def create(self, input_file_id: str) -> str:
+        batch = self.client.batches.create(
+            input_file_id=input_file_id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=BATCH_COMPLETION_WINDOW,
+        )
+        return batch.id
+
+    def retrieve(self, batch_id: str) -> dict:
+        batch = self.client.batches.retrieve(batch_id)
+        counts = batch.request_counts
+        return {
+            "status": batch.status,
+            "output_file_id": batch.output_file_id,
+            "error_file_id": batch.error_file_id,
+            "total": counts.total if counts else 0,
+            "completed": counts.completed if counts else 0,
+            "failed": counts.failed if counts else 0,
+        }
+
+    def download(self, file_id: str) -> str:
+        return self.client.files.content(file_id).text
+
+
+def placeholder_analysis() -> dict:
+    """로컬 백엔드 기본 응답 - 원본 구조를 유지하는 형식상 유효한 분석"""
+    return {
+        "problems": [{"section": "intro", "issue": "로컬 배치 테스트 응답", "severity": "low"}],
+        "hypothesis": {
+            "target_section": "intro",
+            "description": "로컬 배치 테스트 가설",
+            "expected_lift": 0,
+            "confidence": "low",
+        },
+        "improved_sections": [],
+    }
+
+
+class LocalBatchBackend:
+    """
+    파일 기반 Batch API 대체 백엔드
+
+    root/files/<file_id>.jsonl, root/batches/<batch_id>.json에 상태를 저장하고
+    입력/출력 JSONL은 OpenAI Batch API와 같은 형식을 사용합니다.
+    생성 후 delay_seconds가 지난 뒤 처음 조회할 때 요청을 처리하고 completed가 됩니다.
+    """
+
+    name = "local"
+
+    def __init__(
+        self,
+        root: Path,
+        responder: Optional[Callable[[str, dict], dict]] = None,
+        responses_dir: Optional[str] = LOCAL_BATCH_RESPONSES_DIR,
+        delay_seconds: float = LOCAL_BATCH_DELAY_SECONDS,
+    ):
+        self.root = Path(root)
+        self.responder = responder or self._respond
+        self.responses_dir = Path(responses_dir) if responses_dir else None
+        self.delay_seconds = delay_seconds
+        (self.root / "files").mkdir(parents=True, exist_ok=True)
+        (self.root / "batches").mkdir(parents=True, exist_ok=True)
+
+    def _file_path(self, file_id: str) -> Path:
+        return self.root / "files" / f"{file_id}.jsonl"
+
+    def _batch_path(self, batch_id: str) -> Path:
+        return self.root / "batches" / f"{batch_id}.json"
+
+    def _respond(self, custom_id: str, body: dict) -> dict:
+        """응답 분석 JSON (LOCAL_BATCH_RESPONSES_DIR/<custom_id>.json 우선)"""
+        if self.responses_dir:
+            path = self.responses_dir / f"{custom_id}.json"
+            if path.exists():
+                return json.loads(path.read_text(encoding="utf-8"))
+        return placeholder_analysis()
+
+    def upload(self, path: Path) -> str:
+        file_id = f"file-local-{uuid.uuid4().hex[:12]}"
+        self._file_path(file_id).write_text(Path(path).read_text(encoding="utf-8"), encoding="utf-8")
+        return file_id
+
+    def create(self, input_file_id: str) -> str:
+        batch_id = f"batch-local-{uuid.uuid4().hex[:12]}"
+        total = sum(1 for line in self._file_path(input_file_id).read_text(encoding="utf-8").splitlines() if line.strip())
+        self._batch_path(batch_id).write_text(json.dumps({
+            "status": "in_progress",
+            "input_file_id": input_file_id,
+            "created_at": time.time(),
+            "output_file_id": None,
+            "error_file_id": None,
+            "total": total,
+            "completed": 0,
+            "failed": 0,
+        }), encoding="utf-8")
+        return batch_id
+
+    def retrieve(self, batch_id: str) -> dict:
+        batch = json.loads(self._batch_path(batch_id).read_text(encoding="utf-8"))
+        if batch["status"] == "in_progress" and time.time() - batch["created_at"] >= self.delay_seconds:
+            batch = self._process(batch)
+            self._batch_path(batch_id).write_text(json.dumps(batch), encoding="utf-8")
+        return {key: batch[key] for key in ("status", "output_file_id", "error_file_id", "total", "completed", "failed")}
+
+    def _process(self, batch: dict) -> dict:
+        """입력 요청마다 응답을 만들어 출력/오류 파일 작성"""
+        outputs, errors = [], []
+        for line in self._file_path(batch["input_file_id"]).read_text(encoding="utf-8").splitlines():
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            custom_id = request["custom_id"]
+            try:
+                content = json.dumps(self.responder(custom_id, request["body"]), ensure_ascii=False)
+            except Exception as e:
+                errors.append({
+                    "id": f"batch_req_{uuid.uuid4().hex[:12]}",
+                    "custom_id": custom_id,
+                    "response": None,
+                    "error": {"code": "local_responder_error", "message": str(e)},
+                })
+                continue
+            outputs.append({
+                "id": f"batch_req_{uuid.uuid4().hex[:12]}",
+                "custom_id": custom_id,
+                "response": {
+                    "status_code": 200,
+                    "body": {
+                        "model": LOCAL_BATCH_MODEL,
+                        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}}],
+                    },
+                },
+                "error": None,
+            })
+
+        for key, records in (("output_file_id", outputs), ("error_file_id", errors)):
+            if records:
+                file_id = f"file-local-{uuid.uuid4().hex[:12]}"
+                self._file_path(file_id).write_text(
+                    "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records), encoding="utf-8"
+                )
+                batch[key] = file_id
+
+        batch.update(status="completed", completed=len(outputs), failed=len(errors))
+        return batch
+
+    def download(self, file_id: str) -> str:
+        return self._file_path(file_id).read_text(encoding="utf-8")
+
+
+def get_batch_backend(name: str = AB_BATCH_BACKEND):
+    """배치 백엔드 선택"""
+    if name == "local":
+        return LocalBatchBackend(AB_BATCH_DIR / "_local_backend")
+    if name == "openai":
+        return OpenAIBatchBackend()
+    raise ValueError(f"알 수 없는 배치 백엔드: {name} (openai | local)")
+
+
+# ============================================
+# 실행 상태 (AB_BATCH_DIR/<run_id>/)
+# ============================================
+
+def run_dir(run_id: str) -> Path:
+    return AB_BATCH_DIR / run_id
+
+
+def save_manifest(manifest: dict):
+    path = run_dir(manifest["run_id"]) / "manifest.json"
+    path.write_text(json.dumps(manifest, ensure_ascii=False, indent=2, default=_json_default), encoding="utf-8")
+
+
+def load_manifest(run_id: str) -> dict:
+    path = run_dir(run_id) / "manifest.json"
+    if not path.exists():
+        raise FileNotFoundError(f"배치 실행 기록이 없습니다: {path}")
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+# ============================================
+# 1~2. 요청 파일 작성 / 제출
+# ============================================
+
+def write_request_file(path: Path, articles: list, top_articles: list) -> int:
+    """글마다 Batch API 요청 한 줄 (custom_id = slug)"""
+    with open(path, "w", encoding="utf-8") as f:
+        for article in articles:
+            f.write(json.dumps({
+                "custom_id": article["article_slug"],
+                "method": "POST",
+                "url": BATCH_ENDPOINT,
+                "body": build_analysis_request(article, top_articles),
+            }, ensure_ascii=False, default=_json_default) + "\n")
+    return len(articles)
+
+
+def prepare_and_submit(cursor, backend) -> Optional[dict]:
+    """
+    하위 20% 전체(진행 중인 테스트 제외)의 요청 파일을 만들고 배치 제출
+
+    Returns:
+        dict: 실행 manifest (분석할 글이 없으면 None)
+    """
+    underperforming = get_underperforming_articles(cursor, limit=None)
+
+    cursor.execute("SELECT article_slug FROM ab_tests WHERE status = 'running'")
+    running_tests = {row[0] for row in cursor.fetchall()}
+    targets = [a for a in underperforming if a["article_slug"] not in running_tests]
+
+    print(f"   하위 글 {len(underperforming)}개 중 {len(targets)}개 대상 (진행 중 테스트 {len(underperforming) - len(targets)}개 제외)")
+    if not targets:
+        return None
+
+    top_articles = get_top_performing_articles(cursor)
+
+    run_id = datetime.now().strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+    run_dir(run_id).mkdir(parents=True, exist_ok=True)
+    request_path = run_dir(run_id) / "requests.jsonl"
+    count = write_request_file(request_path, targets, top_articles)
+    print(f"   📄 요청 파일: {request_path} ({count}건, {request_path.stat().st_size / 1024:.0f}KB)")
+
+    input_file_id = backend.upload(request_path)
+    batch_id = backend.create(input_file_id)
+
+    manifest = {
+        "run_id": run_id,
+        "backend": backend.name,
+        "batch_id": batch_id,
+        "input_file_id": input_file_id,
+        "generation_batch_id": str(uuid.uuid4()),  # 이번 배치로 만든 B 버전 표시 (articles.generation_batch_id)
+        "created_at": datetime.now().isoformat(),
+        "articles": {a["article_slug"]: a for a in targets},
+        "ingested": False,
+    }
+    save_manifest(manifest)
+
+    print(f"   🚀 배치 제출: {batch_id} (run_id: {run_id})")
+    return manifest
+
+
+# ============================================
+# 3. 폴링
+# ============================================
+
+def poll_batch(backend, batch_id: str, interval: float = BATCH_POLL_SECONDS,
+               timeout: float = BATCH_POLL_TIMEOUT_SECONDS) -> dict:
+    """배치가 종료 상태가 될 때까지 폴링 (timeout 초과 시 TimeoutError - resume으로 이어서 진행)"""
+    deadline = time.monotonic() + timeout
+    last = None
+
+    while True:
+        batch = backend.retrieve(batch_id)
+        progress = (batch["status"], batch["completed"], batch["failed"])
+        if progress != last:
+            print(f"   ⏳ {batch['status']}: {batch['completed']}/{batch['total']} 완료, 실패 {batch['failed']}")
+            last = progress
+
+        if batch["status"] in TERMINAL_BATCH_STATUSES:
+            return batch
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"배치가 {timeout:.0f}초 안에 끝나지 않았습니다: {batch_id}")
+        time.sleep(interval)
+
+
+# ============================================
+# 4. 결과 적재
+# ============================================
+
+def parse_batch_output(text: str) -> tuple:
+    """
+    배치 출력/오류 JSONL 파싱
+
+    Returns:
+        (analyses, failures): ({slug: {"analysis", "model"}}, {slug: 실패 사유})
+    """
+    analyses, failures = {}, {}
+
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        slug = record.get("custom_id")
+        response = record.get("response") or {}
+
+        if record.get("error") or response.get("status_code") != 200:
+            error = record.get("error") or (response.get("body") or {}).get("error") or {}
+            failures[slug] = error.get("message") or f"HTTP {response.get('status_code')}"
+            continue
+
+        body = response["body"]
+        try:
+            analysis = json.loads(body["choices"][0]["message"]["content"])
+        except (KeyError, IndexError, TypeError, json.JSONDecodeError) as e:
+            failures[slug] = f"응답 파싱 실패: {e}"
+            continue
+
+        analyses[slug] = {"analysis": analysis, "model": body.get("model") or OPENAI_MODEL}
+
+    return analyses, failures
+
+
+def ingest_batch_results(conn, manifest: dict, analyses: dict) -> dict:
+    """
+    B 버전 / A/B 테스트 / 분석 결과를 한 문장(데이터 변경 CTE)으로 일괄 적재
+
+    - 제출 이후 테스트가 시작된 글은 건너뜀
+    - B 버전이 이미 있는 글(UNIQUE(slug, version))은 건너뛰고, 테스트/분석도 만들지 않음
+    - 한 트랜잭션으로 커밋
+
+    Returns:
+        dict: {"created": [slug...], "skipped": [slug...]}
+    """
+    slugs, article_ids, test_ids = [], [], []
+    sections, hypotheses_text, target_sections, expected_lifts = [], [], [], []
+    snapshots, problems, hypotheses, models = [], [], [], []
+
+    for slug, result in analyses.items():
+        article = manifest["articles"].get(slug)
+        if article is None:
+            continue
+        analysis = result["analysis"]
+        hypothesis = analysis.get("hypothesis", {}) or {}
+
+        slugs.append(slug)
+        article_ids.append(str(uuid.uuid4()))
+        test_ids.append(str(uuid.uuid4()))
+        sections.append(json.dumps(merge_improved_sections(article, analysis), ensure_ascii=False))
+        hypotheses_text.append(hypothesis.get("description", ""))
+        target_sections.append(hypothesis.get("target_section", "intro"))
+        expected_lifts.append(hypothesis.get("expected_lift", 10))
+        snapshots.append(json.dumps(metrics_snapshot(article)))
+        problems.append(json.dumps(analysis.get("problems", []), ensure_ascii=False))
+        hypotheses.append(json.dumps([hypothesis], ensure_ascii=False))
+        models.append(result["model"])
+
+    if not slugs:
+        return {"created": [], "skipped": []}
+
+    cursor = conn.cursor()
+    cursor.execute("""
+        WITH input AS (
+            SELECT v.*
+            FROM unnest(
+                %s::TEXT[], %s::UUID[], %s::UUID[], %s::JSONB[], %s::TEXT[], %s::TEXT[],
+                %s::NUMERIC[], %s::JSONB[], %s::JSONB[], %s::JSONB[], %s::TEXT[]
+            ) AS v(slug, article_id, test_id, sections, hypothesis, target_section,
+                   expected_lift, metrics_snapshot, problems, hypotheses, ai_model)
+            WHERE NOT EXISTS (
+                SELECT 1 FROM ab_tests t WHERE t.article_slug = v.slug AND t.status = 'running'
+            )
+        ),
+        new_b AS (
+            INSERT INTO articles (
+                id, slug, version, is_active,
+                title, description, author, category, tags,
+                meta_title, meta_description,
+                sections,
+                sources, medical_reviewer, reviewed_at,
+                image_url, image_alt,
+                status, ai_model, prompt_version, generation_batch_id
+            )
+            SELECT
+                i.article_id, a.slug, 'B', true,
+                a.title, a.description, a.author, a.category, a.tags,
+                a.meta_title, a.meta_description,
+                i.sections,
+                a.sources, a.medical_reviewer, a.reviewed_at,
+                a.image_url, a.image_alt,
+                'published', i.ai_model, 'ab-test-v1', %s::UUID
+            FROM input i
+            JOIN articles a ON a.slug = i.slug AND a.version = 'A'
+            ON CONFLICT (slug, version) DO NOTHING
+            RETURNING slug
+        ),
+        new_tests AS (
+            INSERT INTO ab_tests (
+                id, article_slug,
+                name, hypothesis, target_section,
+                control_version, variant_version, traffic_split,
+                primary_metric, expected_lift,
+                sequential_method,
+                status, started_at
+            )
+            SELECT
+                i.test_id, i.slug,
+                i.slug || ' 개선 테스트', i.hypothesis, i.target_section,
+                'A', 'B', 0.5,
+                'avg_time_on_page', i.expected_lift,
+                %s,
+                'running', NOW()
+            FROM input i
+            JOIN new_b b ON b.slug = i.slug
+            RETURNING article_slug
+        ),
+        new_analysis AS (
+            INSERT INTO content_analysis (
+                article_slug, article_version,
+                trigger_type,
+                metrics_snapshot,
+                problems, hypotheses,
+                recommended_action,
+                ai_model, analysis_prompt_version
+            )
+            SELECT
+                i.slug, 'A',
+                'scheduled',
+                i.metrics_snapshot,
+                i.problems, i.hypotheses,
+                'run_ab_test',
+                i.ai_model, 'v1'
+            FROM input i
+            JOIN new_tests t ON t.article_slug = i.slug
+            RETURNING article_slug
+        )
+        SELECT COALESCE(array_agg(article_slug), '{}') FROM new_analysis
+    """, (
+        slugs, article_ids, test_ids, sections, hypotheses_text, target_sections,
+        expected_lifts, snapshots, problems, hypotheses, models,
+        manifest["generation_batch_id"],
+        AB_SEQUENTIAL_METHOD,
+    ))
+
+    created = list(cursor.fetchone()[0])
+    conn.commit()
+    cursor.close()
+
+    created_set = set(created)
+    return {"created": created, "skipped": [slug for slug in slugs if slug not in created_set]}
+
+
+def collect_and_ingest(conn, backend, manifest: dict) -> dict:
+    """배치 완료 대기 → 출력 다운로드 → 일괄 적재"""
+    if manifest.get("ingested"):
+        print("   ⚠️  이미 적재된 배치입니다.")
+        return manifest.get("result", {})
+
+    batch = poll_batch(backend, manifest["batch_id"])
+
+    text = ""
+    for key in ("output_file_id", "error_file_id"):
+        if batch.get(key):
+            content = backend.download(batch[key])
+            (run_dir(manifest["run_id"]) / f"{key.replace('_file_id', '')}.jsonl").write_text(content, encoding="utf-8")
+            text += content.rstrip("\n") + "\n"
+
+    analyses, failures = parse_batch_output(text)
+    missing = [slug for slug in manifest["articles"] if slug not in analyses and slug not in failures]
+    print(f"   📥 결과: 성공 {len(analyses)}건, 실패 {len(failures)}건, 응답 없음 {len(missing)}건 (배치 상태: {batch['status']})")
+    for slug, reason in list(failures.items())[:5]:
+        print(f"      - {slug}: {reason}")
+
+    ingested = ingest_batch_results(conn, manifest, analyses)
+
+    result = {
+        "batch_status": batch["status"],
+        "created": len(ingested["created"]),
+        "skipped": ingested["skipped"],
+        "failed": failures,
+        "missing": missing,
+    }
+    manifest.update(ingested=True, result=result)
+    save_manifest(manifest)
+    return result
+
+
+# ============================================
+# 실행
+# ============================================
+
+def print_result(result: dict):
+    print("\n" + "=" * 50)
+    print(f"✅ 총 {result['created']}개 A/B 테스트 생성됨")
+    if result["skipped"]:
+        print(f"⏭️  건너뜀: {len(result['skipped'])}개 (B 버전 존재 또는 테스트 진행 중)")
+    if result["failed"] or result["missing"]:
+        print(f"⚠️  분석 실패: {len(result['failed']) + len(result['missing'])}개 글 (다음 실행에서 다시 시도)")
+
+
+def main():
+    """준비 → 제출 → 폴링 → 적재"""
+    print("🚀 AI 성과 분석 배치 시작")
+    print(f"📊 분석 대상: 하위 {UNDERPERFORMING_PERCENTILE}% 글 전체")
+    print(f"🔧 배치 백엔드: {AB_BATCH_BACKEND} (상태 저장: {AB_BATCH_DIR})")
+
+    backend = get_batch_backend()
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    try:
+        print("\n📉 성과 하위 글 추출 중...")
+        manifest = prepare_and_submit(cursor, backend)
+        conn.commit()
+        if manifest is None:
+            print("⚠️  분석할 글이 없습니다. (데이터 부족 또는 모든 글이 테스트 중)")
+            return
+
+        print("\n⏳ 배치 완료 대기 중...")
+        result = collect_and_ingest(conn, backend, manifest)
+        print_result(result)
+
+        print(f"\n🎉 배치 분석 완료! (run_id: {manifest['run_id']})")
+
+    except Exception as e:
+        print(f"❌ 오류 발생: {e}")
+        conn.rollback()
+        raise
+
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def resume(run_id: str):
+    """중단된 실행 이어서 진행 (폴링 → 적재)"""
+    manifest = load_manifest(run_id)
+    backend = get_batch_backend(manifest["backend"])
+    conn = get_db_connection()
+
+    try:
+        print(f"⏳ 배치 {manifest['batch_id']} 완료 대기 중...")
+        print_result(collect_and_ingest(conn, backend, manifest))
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def status(run_id: str):
+    """배치 진행 상태 출력"""
+    manifest = load_manifest(run_id)
+    batch = get_batch_backend(manifest["backend"]).retrieve(manifest["batch_id"])
+    print(f"run_id: {run_id} ({manifest['backend']}, {len(manifest['articles'])}건)")
+    print(f"batch: {manifest['batch_id']} - {batch['status']}, {batch['completed']}/{batch['total']} 완료, 실패 {batch['failed']}")
+    print(f"적재: {'완료' if manifest.get('ingested') else '대기'}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "status":
+        status(sys.argv[2])
+    elif len(sys.argv) > 2 and sys.argv[1] == "resume":
+        resume(sys.argv[2])
+    elif len(sys.argv) > 1:
+        print(f"Unknown command: {' '.join(sys.argv[1:])}")
+        print("Usage: python analyze_and_create_ab_batch.py [status <run_id> | resume <run_id>]")
+    else:
+        main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+article_metrics 적재 벤치마크: 행 단위 UPSERT vs COPY 기반 대량 UPSERT
+
+실행: python scripts/benchmark_metrics_upsert.py [행 수 ...]
+기본: 10,000행, 100,000행
+
+실제 article_metrics를 건드리지 않도록 세션 전용 TEMP 테이블
+article_metrics(LIKE article_metrics INCLUDING ALL)를 만들어 측정합니다.
+TEMP 스키마가 search_path 맨 앞에 있으므로 같은 이름의 임시 테이블이
+원본 테이블을 가립니다.
+
+각 방식마다 두 번 적재합니다:
+- 1회차: 빈 테이블에 INSERT
+- 2회차: 같은 키로 다시 적재 (ON CONFLICT UPDATE)
+"""
+
+import sys
+import time
+import random
+from datetime import date, timedelta
+
+import psycopg2
+
+from fetch_ga_metrics import DB_CONFIG, upsert_metrics_rowwise, upsert_metrics_bulk
+
+DEFAULT_SIZES = [10_000, 100_000]
+
+# 글 수 (행 수 / 글 수 = 날짜 수)
+SLUG_COUNT = 500
+
+
+def generate_rows(n: int, seed: int = 42) -> list:
+    """벤치마크용 합성 행 생성 (slug × date 고유 키)"""
+    rng = random.Random(seed)
+    base_date = date(2024, 1, 1)
+
+    rows = []
+    for i in range(n):
+        slug = f"bench-article-{i % SLUG_COUNT}"
+        day = base_date + timedelta(days=i // SLUG_COUNT)
+        rows.append((
+            slug, "A", day.isoformat(),
+            rng.randint(0, 500), rng.randint(0, 400),
+            round(rng.uniform(5, 300), 2), round(rng.uniform(10, 90), 2),
+            round(rng.uniform(0, 100), 2),
+        ))
+    return rows
+
+
+def prepare_shadow_table(conn):
+    """원본 article_metrics를 가리는 세션 전용 TEMP 테이블 생성"""
+    cursor = conn.cursor()
+    cursor.execute("DROP TABLE IF EXISTS pg_temp.article_metrics")
+    cursor.execute("CREATE TEMP TABLE article_metrics (LIKE public.article_metrics INCLUDING ALL)")
+    conn.commit()
+    cursor.close()
+
+
+def truncate_shadow_table(conn):
+    cursor = conn.cursor()
+    cursor.execute("TRUNCATE pg_temp.article_metrics")
+    conn.commit()
+    cursor.close()
+
+
+def run_case(conn, writer, rows: list) -> list:
+    """빈 테이블 적재 + 재적재 시간 측정"""
+    truncate_shadow_table(conn)
+
+    timings = []
+    for label in ("insert", "update"):
+        started = time.perf_counter()
+        inserted, updated = writer(conn, iter(rows))
+        elapsed = time.perf_counter() - started
+        timings.append((label, elapsed, inserted, updated))
+
+    return timings
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+
+    print("🚀 article_metrics 적재 벤치마크")
+    print(f"🔌 {DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}")
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        prepare_shadow_table(conn)
+
+        print("-" * 72)
+        print(f"{'rows':>8} | {'method':<8} | {'pass':<6} | {'seconds':>9} | {'rows/s':>9} | ins/upd")
+        print("-" * 72)
+
+        for n in sizes:
+            rows = generate_rows(n)
+            results = {}
+
+            for method, writer in (("rowwise", upsert_metrics_rowwise), ("bulk", upsert_metrics_bulk)):
+                for label, elapsed, inserted, updated in run_case(conn, writer, rows):
+                    results[(method, label)] = elapsed
+                    print(f"{n:>8} | {method:<8} | {label:<6} | {elapsed:>9.2f} | "
+                          f"{n / elapsed:>9.0f} | {inserted}/{updated}")
+
+            for label in ("insert", "update"):
+                speedup = results[("rowwise", label)] / max(results[("bulk", label)], 1e-9)
+                print(f"{n:>8} | 속도 향상 ({label}): {speedup:.1f}x")
+            print("-" * 72)
+
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
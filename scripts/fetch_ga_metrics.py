@@ -11,6 +11,8 @@ GA4 Data API에서 글별 성과 데이터를 수집하여 DB에 저장
 """
 
 import os
+import io
+import csv
 import json
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -161,17 +163,71 @@ def calculate_engagement_score(metrics: dict) -> float:
     return round(total_score, 2)
 
 
-def save_to_db(metrics_list: list):
-    """DB에 저장 (upsert)"""
-    conn = psycopg2.connect(**DB_CONFIG)
+# article_metrics 적재 컬럼 (COPY 스테이징 테이블과 순서 동일)
+METRIC_COLUMNS = [
+    "article_slug", "article_version", "date",
+    "pageviews", "unique_visitors",
+    "avg_time_on_page", "bounce_rate",
+    "engagement_score",
+]
+
+
+def to_metric_row(m: dict) -> tuple:
+    """수집 레코드를 METRIC_COLUMNS 순서의 행으로 변환"""
+    return (
+        m["article_slug"],
+        "A",  # 기본 버전
+        m["date"],
+        m["pageviews"],
+        m["unique_visitors"],
+        m["avg_time_on_page"],
+        m["bounce_rate"],
+        calculate_engagement_score(m),
+    )
+
+
+class CsvRowStream(io.TextIOBase):
+    """
+    행 이터레이터를 copy_expert가 읽을 수 있는 CSV 스트림으로 감싸기
+
+    요청된 크기만큼만 CSV로 변환하므로 전체 데이터를 메모리에 올리지 않습니다.
+    각 행 앞에 순번(seq)을 붙여 중복 키는 마지막 행이 이기도록 합니다.
+    """
+
+    def __init__(self, rows):
+        self._rows = enumerate(rows)
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, lineterminator="\n")
+        self._pending = ""
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        while size < 0 or len(self._pending) < size:
+            try:
+                seq, row = next(self._rows)
+            except StopIteration:
+                break
+            self._writer.writerow((seq,) + tuple(row))
+            self._pending += self._buffer.getvalue()
+            self._buffer.seek(0)
+            self._buffer.truncate(0)
+
+        if size < 0:
+            size = len(self._pending)
+        chunk, self._pending = self._pending[:size], self._pending[size:]
+        return chunk
+
+
+def upsert_metrics_rowwise(conn, rows) -> tuple:
+    """행 단위 UPSERT (행마다 DB 왕복 1회) - 벤치마크 비교용"""
     cursor = conn.cursor()
 
     inserted = 0
     updated = 0
 
-    for m in metrics_list:
-        engagement_score = calculate_engagement_score(m)
-
+    for row in rows:
         # UPSERT (ON CONFLICT)
         cursor.execute("""
             INSERT INTO article_metrics (
@@ -194,16 +250,7 @@ def save_to_db(metrics_list: list):
                 engagement_score = EXCLUDED.engagement_score,
                 created_at = NOW()
             RETURNING (xmax = 0) as inserted
-        """, (
-            m["article_slug"],
-            "A",  # 기본 버전
-            m["date"],
-            m["pageviews"],
-            m["unique_visitors"],
-            m["avg_time_on_page"],
-            m["bounce_rate"],
-            engagement_score
-        ))
+        """, row)
 
         result = cursor.fetchone()
         if result and result[0]:
@@ -213,7 +260,45 @@ def save_to_db(metrics_list: list):
 
     conn.commit()
     cursor.close()
-    conn.close()
+
+    return inserted, updated
+
+
+def upsert_metrics_bulk(conn, rows) -> tuple:
+    """
+    대량 UPSERT: COPY로 임시 스테이징 테이블에 적재 후 단일 문장으로 병합
+
+    DB 왕복 횟수가 행 수와 무관하게 일정합니다.
+    병합은 ga4_collector의 bulk_upsert_metrics와 같은 DB 함수 merge_article_metrics_staging()
+    (016_article_metrics_merge_function.sql)을 호출하므로 진행 중인 A/B 테스트의
+    ab_variant_stats 증분 갱신과 적재 직렬화도 같은 규칙을 따릅니다.
+    이 스크립트는 스크롤 지표를 수집하지 않으므로 스크롤 컬럼은 비워 두고(기존 값 유지) 적재합니다.
+    """
+    cursor = conn.cursor()
+    columns = ", ".join(METRIC_COLUMNS)
+
+    cursor.execute("SELECT create_article_metrics_staging()")
+    cursor.copy_expert(
+        f"COPY article_metrics_staging (seq, {columns}) FROM STDIN WITH (FORMAT csv)",
+        CsvRowStream(rows),
+    )
+    cursor.execute("SELECT inserted_count, updated_count FROM merge_article_metrics_staging()")
+
+    inserted, updated = cursor.fetchone()
+    conn.commit()
+    cursor.close()
+
+    return int(inserted), int(updated)
+
+
+def save_to_db(metrics_list: list):
+    """DB에 저장 (COPY 기반 대량 upsert)"""
+    conn = psycopg2.connect(**DB_CONFIG)
+
+    try:
+        inserted, updated = upsert_metrics_bulk(conn, (to_metric_row(m) for m in metrics_list))
+    finally:
+        conn.close()
 
     return inserted, updated
 